@@ -0,0 +1,239 @@
+"""
+Points d'entree de l'API : chaque route recoit les groupes du chemin, les
+parametres de la requete et le corps JSON, et retourne (statut HTTP, objet)
+"""
+
+import re
+from collections.abc import Callable
+from http import HTTPStatus
+
+from config.parametres import API_MAX_MOUVEMENTS_LOT, TAILLE_PAGE
+from database.requetes import (
+    creer_mouvements_lot,
+    est_entier,
+    obtenir_ids_par_code_barre,
+    obtenir_produit,
+    obtenir_statistiques_inventaire,
+    obtenir_statistiques_par_categorie,
+    rechercher_mouvements,
+    soumettre_mouvement,
+    stock_a_la_date,
+)
+
+
+class ErreurHttp(Exception):
+    """Erreur renvoyee au client avec son statut (404, 413, ...)"""
+
+    def __init__(self, statut: HTTPStatus, message: str):
+        super().__init__(message)
+        self.statut = statut
+
+
+def _parametre_entier(requete: dict, nom: str, defaut: int | None = None):
+    valeur = requete.get(nom)
+    if valeur is None or valeur == "":
+        return defaut
+    try:
+        return int(valeur)
+    except ValueError:
+        raise ValueError(f"Parametre {nom} invalide (entier attendu)") from None
+
+
+# ---------- Produits ----------
+def produit_par_code_barre(chemin: dict, requete: dict, corps) -> tuple:
+    produit_id = obtenir_ids_par_code_barre([chemin["code_barre"]]).get(
+        chemin["code_barre"]
+    )
+    produit = obtenir_produit(produit_id) if produit_id else None
+    if produit is None:
+        raise ErreurHttp(HTTPStatus.NOT_FOUND, "Code barre inconnu")
+    return HTTPStatus.OK, produit
+
+
+def produit_par_id(chemin: dict, requete: dict, corps) -> tuple:
+    produit = obtenir_produit(int(chemin["produit_id"]))
+    if produit is None:
+        raise ErreurHttp(HTTPStatus.NOT_FOUND, "Produit introuvable")
+    return HTTPStatus.OK, produit
+
+
+def stock_produit(chemin: dict, requete: dict, corps) -> tuple:
+    """Stock actuel, ou a la fin d'une journee passee avec ?date=YYYY-MM-DD"""
+    produit_id = int(chemin["produit_id"])
+    if requete.get("date"):
+        stock = stock_a_la_date(produit_id, requete["date"])
+    else:
+        produit = obtenir_produit(produit_id)
+        stock = produit["stock_actuel"] if produit else None
+    if stock is None:
+        raise ErreurHttp(HTTPStatus.NOT_FOUND, "Produit introuvable")
+    return HTTPStatus.OK, {
+        "produit_id": produit_id,
+        "date": requete.get("date"),
+        "stock": stock,
+    }
+
+
+# ---------- Mouvements ----------
+def lister_mouvements(chemin: dict, requete: dict, corps) -> tuple:
+    """
+    Page de mouvements, filtres optionnels : produit_id, type, du, au
+    Pagination par cle : limite, curseur (curseur_suivant de la page precedente)
+    """
+    limite = _parametre_entier(requete, "limite", TAILLE_PAGE)
+    if not 1 <= limite <= TAILLE_PAGE * 10:
+        raise ValueError(f"limite doit etre comprise entre 1 et {TAILLE_PAGE * 10}")
+    page = rechercher_mouvements(
+        produit_id=_parametre_entier(requete, "produit_id"),
+        type_mouvement=requete.get("type") or None,
+        date_debut=requete.get("du") or None,
+        date_fin=requete.get("au") or None,
+        limite=limite,
+        curseur=requete.get("curseur") or None,
+    )
+    return HTTPStatus.OK, page
+
+
+# Champs texte d'un mouvement envoye (JSON : tout autre type est refuse)
+CHAMPS_TEXTE_MOUVEMENT = (
+    "code_barre",
+    "type_mouvement",
+    "motif",
+    "utilisateur",
+    "remarques",
+    "date_mouvement",
+)
+
+
+def _valider_types(mouvement: dict, index: int | None = None):
+    """
+    Raises:
+        ValueError: Si un champ texte du mouvement n'est pas une chaine
+    """
+    for champ in CHAMPS_TEXTE_MOUVEMENT:
+        valeur = mouvement.get(champ)
+        if valeur is not None and not isinstance(valeur, str):
+            position = "" if index is None else f" (mouvement {index})"
+            raise ValueError(f"{champ} doit etre une chaine{position}")
+
+
+def _envoyer_mouvement(mouvement: dict) -> tuple:
+    """
+    Un mouvement isole (scanner) passe par la file de groupage : les envois
+    simultanes de nombreux terminaux partagent une meme transaction
+    """
+    _valider_types(mouvement)
+    try:
+        if mouvement.get("produit_id") is not None:
+            produit_id = mouvement["produit_id"]
+        else:
+            code = mouvement["code_barre"]
+            produit_id = obtenir_ids_par_code_barre([code]).get(code, 0)
+        quantite = mouvement["quantite"]
+        type_mouvement = mouvement["type_mouvement"]
+    except KeyError as e:
+        raise ValueError(f"Champ manquant: {e.args[0]}") from None
+    if not est_entier(produit_id) or not est_entier(quantite):
+        raise ValueError("produit_id et quantite doivent etre des entiers")
+    if quantite <= 0:
+        raise ValueError("La quantite doit etre positive")
+
+    mouvement_id = soumettre_mouvement(
+        produit_id,
+        type_mouvement,
+        quantite,
+        mouvement.get("motif", ""),
+        mouvement.get("utilisateur", ""),
+        mouvement.get("remarques", ""),
+    ).result()
+    if mouvement_id is None:
+        return HTTPStatus.BAD_REQUEST, {"erreur": "Mouvement refuse"}
+    return HTTPStatus.CREATED, {"mouvement_id": mouvement_id}
+
+
+def envoyer_mouvements(chemin: dict, requete: dict, corps) -> tuple:
+    """
+    Enregistre un lot de mouvements en une transaction
+    Corps : liste de mouvements (ou {"mouvements": [...]}) au format de
+    creer_mouvements_lot ; le produit peut etre designe par code_barre.
+    Un mouvement seul (objet sans cle "mouvements") est groupe avec les envois
+    simultanes des autres clients et retourne {"mouvement_id": ...}.
+    """
+    if isinstance(corps, dict) and "mouvements" not in corps:
+        return _envoyer_mouvement(corps)
+    mouvements = corps.get("mouvements") if isinstance(corps, dict) else corps
+    if not isinstance(mouvements, list) or not all(
+        isinstance(mouvement, dict) for mouvement in mouvements
+    ):
+        raise ValueError("Le corps doit etre une liste de mouvements")
+    if len(mouvements) > API_MAX_MOUVEMENTS_LOT:
+        raise ErreurHttp(
+            HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+            f"Au plus {API_MAX_MOUVEMENTS_LOT} mouvements par envoi",
+        )
+    for index, mouvement in enumerate(mouvements):
+        _valider_types(mouvement, index)
+
+    codes = {m["code_barre"] for m in mouvements if m.get("code_barre")}
+    ids_par_code = obtenir_ids_par_code_barre(codes) if codes else {}
+    for mouvement in mouvements:
+        code = mouvement.get("code_barre")
+        if code and not mouvement.get("produit_id"):
+            # 0 n'est jamais un produit_id : signale "produit inexistant"
+            mouvement["produit_id"] = ids_par_code.get(code, 0)
+
+    resultat = creer_mouvements_lot(mouvements)
+    if not resultat["inseres"] and resultat["erreurs"]:
+        return HTTPStatus.BAD_REQUEST, resultat
+    return HTTPStatus.CREATED, resultat
+
+
+# ---------- Statistiques ----------
+def statistiques(chemin: dict, requete: dict, corps) -> tuple:
+    return HTTPStatus.OK, obtenir_statistiques_inventaire()
+
+
+def statistiques_categories(chemin: dict, requete: dict, corps) -> tuple:
+    return HTTPStatus.OK, obtenir_statistiques_par_categorie()
+
+
+def sante(chemin: dict, requete: dict, corps) -> tuple:
+    return HTTPStatus.OK, {"statut": "ok"}
+
+
+# (methode, chemin avec groupes nommes, fonction)
+ROUTES: list[tuple[str, re.Pattern, Callable]] = [
+    (methode, re.compile(f"^{motif}$"), fonction)
+    for methode, motif, fonction in [
+        ("GET", r"/sante", sante),
+        ("GET", r"/produits/code-barre/(?P<code_barre>[^/]+)", produit_par_code_barre),
+        ("GET", r"/produits/(?P<produit_id>\d+)", produit_par_id),
+        ("GET", r"/produits/(?P<produit_id>\d+)/stock", stock_produit),
+        ("GET", r"/mouvements", lister_mouvements),
+        ("POST", r"/mouvements", envoyer_mouvements),
+        ("GET", r"/stats", statistiques),
+        ("GET", r"/stats/categories", statistiques_categories),
+    ]
+]
+
+
+def trouver_route(methode: str, chemin: str) -> tuple[Callable, dict]:
+    """
+    Returns:
+        tuple: (fonction, groupes du chemin)
+
+    Raises:
+        ErreurHttp: 404 si aucun chemin ne correspond, 405 si seule la methode
+                    differe
+    """
+    chemin_connu = False
+    for methode_route, motif, fonction in ROUTES:
+        correspondance = motif.match(chemin)
+        if correspondance is None:
+            continue
+        if methode_route == methode:
+            return fonction, correspondance.groupdict()
+        chemin_connu = True
+    if chemin_connu:
+        raise ErreurHttp(HTTPStatus.METHOD_NOT_ALLOWED, "Methode non autorisee")
+    raise ErreurHttp(HTTPStatus.NOT_FOUND, "Ressource inconnue")
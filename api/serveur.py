@@ -0,0 +1,185 @@
+"""
+Serveur HTTP/JSON de l'inventaire (terminaux de caisse, scanners d'entrepot)
+
+    python -m api.serveur --port 8080
+
+Les requetes sont traitees par un pool de threads ; les lectures empruntent
+les connexions du pool de GestionnaireBD et les ecritures passent par la
+connexion d'ecriture unique, comme dans l'application Tk.
+"""
+
+import argparse
+import json
+import sqlite3
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from api.routes import ErreurHttp, trouver_route
+from config.parametres import API_HOTE, API_PORT, API_TAILLE_MAX_CORPS, API_THREADS
+from database.gestionnaire_bd import changer_base, obtenir_gestionnaire
+from database.requetes import activer_caches
+
+
+class GestionnaireRequetes(BaseHTTPRequestHandler):
+    """Traduit une requete HTTP en appel de route et la reponse en JSON"""
+
+    # Connexions keep-alive : chaque reponse porte un Content-Length
+    protocol_version = "HTTP/1.1"
+    server_version = "InventaireAPI/1.0"
+    # Une connexion inactive libere son thread du pool apres ce delai (s)
+    timeout = 30
+    # En-tetes et corps sont envoyes separement : sans TCP_NODELAY, Nagle et
+    # l'acquittement differe du client ajoutent ~40 ms a chaque reponse
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._traiter("GET")
+
+    def do_POST(self):
+        self._traiter("POST")
+
+    def _traiter(self, methode: str):
+        try:
+            # Corps lu avant le routage : apres une erreur (404, 405, ...) la
+            # requete suivante de la connexion keep-alive reste lisible
+            contenu = self._lire_contenu()
+            url = urlsplit(self.path)
+            fonction, chemin = trouver_route(methode, url.path)
+            chemin = {cle: unquote(valeur) for cle, valeur in chemin.items()}
+            requete = dict(parse_qsl(url.query))
+            statut, reponse = fonction(chemin, requete, self._decoder_corps(contenu))
+        except ErreurHttp as e:
+            statut, reponse = e.statut, {"erreur": str(e)}
+        except ValueError as e:
+            # Dates, curseurs ou parametres invalides
+            statut, reponse = HTTPStatus.BAD_REQUEST, {"erreur": str(e)}
+        except (sqlite3.Error, RuntimeError) as e:
+            print(f"Erreur lors du traitement de {methode} {self.path}: {e}")
+            statut = HTTPStatus.SERVICE_UNAVAILABLE
+            reponse = {"erreur": "Base de donnees indisponible"}
+        except Exception:
+            # Le client recoit toujours une reponse, la connexion reste utilisable
+            print(f"Erreur inattendue sur {methode} {self.path}:")
+            traceback.print_exc()
+            statut = HTTPStatus.INTERNAL_SERVER_ERROR
+            reponse = {"erreur": "Erreur interne du serveur"}
+        self._repondre(statut, reponse)
+
+    def _lire_contenu(self) -> bytes:
+        if "Transfer-Encoding" in self.headers:
+            # Corps par morceaux non pris en charge : il ne peut pas etre saute
+            self.close_connection = True
+            raise ErreurHttp(HTTPStatus.LENGTH_REQUIRED, "Content-Length requis")
+        try:
+            longueur = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            longueur = -1
+        if longueur < 0:
+            # Fin du corps inconnue : la connexion ne peut pas etre reutilisee
+            self.close_connection = True
+            raise ValueError("Content-Length invalide")
+        if longueur > API_TAILLE_MAX_CORPS:
+            # Corps non lu : la connexion ne peut pas etre reutilisee
+            self.close_connection = True
+            raise ErreurHttp(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Corps trop volumineux"
+            )
+        return self.rfile.read(longueur) if longueur else b""
+
+    @staticmethod
+    def _decoder_corps(contenu: bytes):
+        if not contenu:
+            return None
+        try:
+            return json.loads(contenu)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            raise ValueError(f"JSON invalide: {e}") from None
+
+    def _repondre(self, statut: HTTPStatus, reponse):
+        contenu = json.dumps(reponse, ensure_ascii=False, default=str).encode("utf-8")
+        self.send_response(statut)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(contenu)))
+        self.end_headers()
+        self.wfile.write(contenu)
+
+    def log_message(self, format, *args):
+        if self.server.journal:
+            super().log_message(format, *args)
+
+
+class ServeurInventaire(HTTPServer):
+    """
+    HTTPServer dont les connexions sont traitees par un pool de threads borne
+    (contrairement a ThreadingHTTPServer qui cree un thread par connexion)
+    """
+
+    def __init__(
+        self,
+        adresse: tuple[str, int],
+        threads: int = API_THREADS,
+        journal: bool = False,
+    ):
+        super().__init__(adresse, GestionnaireRequetes)
+        self.journal = journal
+        self.executeur = ThreadPoolExecutor(
+            max_workers=threads, thread_name_prefix="api"
+        )
+
+    def process_request(self, request, client_address):
+        self.executeur.submit(self._traiter_connexion, request, client_address)
+
+    def _traiter_connexion(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.executeur.shutdown(wait=True)
+
+
+def creer_serveur(
+    hote: str = API_HOTE,
+    port: int = API_PORT,
+    threads: int = API_THREADS,
+    journal: bool = False,
+) -> ServeurInventaire:
+    """Cree le serveur (port 0 = port libre choisi par le systeme)"""
+    obtenir_gestionnaire()  # base ouverte et migree avant la premiere requete
+    # L'application et la CLI ecrivent sur la meme base depuis d'autres
+    # processus : le stock servi doit etre celui de la base, pas d'un cache
+    activer_caches(False)
+    return ServeurInventaire((hote, port), threads, journal)
+
+
+def main(arguments: list[str] | None = None):
+    parseur = argparse.ArgumentParser(description="API HTTP de l'inventaire")
+    parseur.add_argument("--hote", default=API_HOTE)
+    parseur.add_argument("--port", type=int, default=API_PORT)
+    parseur.add_argument("--threads", type=int, default=API_THREADS)
+    parseur.add_argument("--base", help="Fichier de la base (DB_PATH par defaut)")
+    parseur.add_argument("--journal", action="store_true", help="Trace les requetes")
+    args = parseur.parse_args(arguments)
+
+    if args.base:
+        changer_base(args.base)
+    serveur = creer_serveur(args.hote, args.port, args.threads, args.journal)
+    hote, port = serveur.server_address[:2]
+    print(f"API de l'inventaire sur http://{hote}:{port} ({args.threads} threads)")
+    try:
+        serveur.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        serveur.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+Test de charge de l'API HTTP
+
+    python -m benchmarks.charge_api --mouvements 100000 --clients 16 --duree 30
+    python -m benchmarks.charge_api --url http://127.0.0.1:8080 --produits 5000
+
+Sans --url, une base synthetique est generee et le serveur demarre dans ce
+processus sur un port libre. Chaque client garde sa connexion keep-alive et
+enchaine des requetes selon le melange MELANGE (lectures par code barre,
+pages de mouvements, statistiques, envois unitaires et par lots).
+"""
+
+import argparse
+import http.client
+import json
+import random
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from api.serveur import creer_serveur
+from benchmarks.executer import DOSSIER_RESULTATS, revision_git
+from benchmarks.generateur import generer_base, nombre_produits_par_defaut
+from benchmarks.mesures import centile
+from database.gestionnaire_bd import changer_base
+from database.profilage import profileur
+
+# Proportion de chaque type de requete
+MELANGE = {
+    "code_barre": 0.65,
+    "page_mouvements": 0.15,
+    "stats": 0.10,
+    "envoi_mouvement": 0.05,
+    "envoi_lot": 0.05,
+}
+TAILLE_LOT_ENVOI = 20
+
+
+def _requete(alea: random.Random, nombre_produits: int) -> tuple:
+    """Tire une requete : (type, methode, chemin, corps)"""
+    genre = alea.choices(list(MELANGE), weights=list(MELANGE.values()))[0]
+    produit = alea.randint(1, nombre_produits)
+    if genre == "code_barre":
+        return genre, "GET", f"/produits/code-barre/{produit:013d}", None
+    if genre == "page_mouvements":
+        return genre, "GET", f"/mouvements?produit_id={produit}&limite=50", None
+    if genre == "stats":
+        return genre, "GET", "/stats", None
+    if genre == "envoi_mouvement":
+        mouvement = {
+            "code_barre": f"{produit:013d}",
+            "type_mouvement": "ENTREE",
+            "quantite": alea.randint(1, 10),
+            "motif": "Test de charge",
+        }
+        return genre, "POST", "/mouvements", json.dumps(mouvement)
+    lot = [
+        {
+            "code_barre": f"{alea.randint(1, nombre_produits):013d}",
+            "type_mouvement": "ENTREE",
+            "quantite": alea.randint(1, 10),
+            "motif": "Test de charge",
+        }
+        for _ in range(TAILLE_LOT_ENVOI)
+    ]
+    return genre, "POST", "/mouvements", json.dumps(lot)
+
+
+def _client(
+    hote: str,
+    port: int,
+    nombre_produits: int,
+    fin: float,
+    graine: int,
+    durees: dict,
+    erreurs: dict,
+    verrou: threading.Lock,
+):
+    """Enchaine des requetes jusqu'a l'instant fin sur une connexion keep-alive"""
+    alea = random.Random(graine)
+    connexion = http.client.HTTPConnection(hote, port, timeout=30)
+    locales = defaultdict(list)
+    echecs = defaultdict(int)
+    try:
+        while time.perf_counter() < fin:
+            genre, methode, chemin, corps = _requete(alea, nombre_produits)
+            entetes = {"Content-Type": "application/json"} if corps else {}
+            debut = time.perf_counter()
+            try:
+                connexion.request(methode, chemin, body=corps, headers=entetes)
+                reponse = connexion.getresponse()
+                reponse.read()
+            except (OSError, http.client.HTTPException):
+                echecs[genre] += 1
+                connexion.close()
+                connexion = http.client.HTTPConnection(hote, port, timeout=30)
+                continue
+            locales[genre].append((time.perf_counter() - debut) * 1000)
+            if reponse.status >= 400:
+                echecs[genre] += 1
+    finally:
+        connexion.close()
+        with verrou:
+            for genre, valeurs in locales.items():
+                durees[genre].extend(valeurs)
+            for genre, nombre in echecs.items():
+                erreurs[genre] += nombre
+
+
+def charger(
+    hote: str, port: int, nombre_produits: int, clients: int, duree: float, graine=0
+) -> dict:
+    """
+    Lance les clients pendant duree secondes
+
+    Returns:
+        dict: {clients, duree_s, requetes, requetes_par_seconde, erreurs,
+               types: {type: {requetes, par_seconde, erreurs, p50_ms, p95_ms,
+               p99_ms}}}
+    """
+    durees = defaultdict(list)
+    erreurs = defaultdict(int)
+    verrou = threading.Lock()
+    debut = time.perf_counter()
+    fin = debut + duree
+    threads = [
+        threading.Thread(
+            target=_client,
+            args=(hote, port, nombre_produits, fin, graine + i),
+            kwargs={"durees": durees, "erreurs": erreurs, "verrou": verrou},
+        )
+        for i in range(clients)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    ecoule = time.perf_counter() - debut
+
+    types = {}
+    for genre, valeurs in sorted(durees.items()):
+        valeurs.sort()
+        types[genre] = {
+            "requetes": len(valeurs),
+            "par_seconde": round(len(valeurs) / ecoule, 1),
+            "erreurs": erreurs.get(genre, 0),
+            "p50_ms": round(centile(valeurs, 50), 3),
+            "p95_ms": round(centile(valeurs, 95), 3),
+            "p99_ms": round(centile(valeurs, 99), 3),
+        }
+    total = sum(len(valeurs) for valeurs in durees.values())
+    return {
+        "clients": clients,
+        "duree_s": round(ecoule, 3),
+        "requetes": total,
+        "requetes_par_seconde": round(total / ecoule, 1),
+        "erreurs": sum(erreurs.values()),
+        "types": types,
+    }
+
+
+def main(arguments: list[str] | None = None) -> Path:
+    parseur = argparse.ArgumentParser(description="Test de charge de l'API HTTP")
+    parseur.add_argument("--url", help="API deja demarree (sinon serveur local)")
+    parseur.add_argument(
+        "--produits",
+        type=int,
+        help="Nombre de produits (codes barre 1..N) de la base ciblee par --url",
+    )
+    parseur.add_argument("--mouvements", type=int, default=100000)
+    parseur.add_argument("--clients", type=int, default=8)
+    parseur.add_argument("--threads", type=int, default=16, help="Threads du serveur")
+    parseur.add_argument("--duree", type=float, default=20.0, help="Secondes")
+    parseur.add_argument("--graine", type=int, default=0)
+    parseur.add_argument("--sortie", type=Path, help="Fichier JSON des resultats")
+    args = parseur.parse_args(arguments)
+
+    serveur = None
+    with tempfile.TemporaryDirectory(prefix="charge_api_") as dossier:
+        if args.url:
+            url = urlsplit(args.url)
+            hote, port = url.hostname, url.port or 80
+            nombre_produits = args.produits or nombre_produits_par_defaut(
+                args.mouvements
+            )
+        else:
+            profileur.actif = False
+            chemin = Path(dossier) / "charge.db"
+            generation = generer_base(chemin, args.mouvements, graine=args.graine)
+            nombre_produits = generation["produits"]
+            changer_base(chemin)
+            serveur = creer_serveur("127.0.0.1", 0, args.threads)
+            hote, port = serveur.server_address[:2]
+            threading.Thread(target=serveur.serve_forever, daemon=True).start()
+
+        print(
+            f"Charge sur http://{hote}:{port} : {args.clients} clients,"
+            f" {args.duree} s"
+        )
+        try:
+            resultat = charger(
+                hote, port, nombre_produits, args.clients, args.duree, args.graine
+            )
+        finally:
+            if serveur is not None:
+                serveur.shutdown()
+                serveur.server_close()
+
+    print(
+        f"{resultat['requetes']} requetes, {resultat['requetes_par_seconde']} req/s,"
+        f" {resultat['erreurs']} erreurs"
+    )
+    for genre, mesures in resultat["types"].items():
+        print(
+            f"  {genre:<16} {mesures['par_seconde']:>9.1f} req/s"
+            f"  p50 {mesures['p50_ms']:>8.3f} ms  p95 {mesures['p95_ms']:>8.3f} ms"
+            f"  p99 {mesures['p99_ms']:>8.3f} ms  erreurs {mesures['erreurs']}"
+        )
+
+    resultat.update(
+        {
+            "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "revision": revision_git(),
+            "mouvements": None if args.url else args.mouvements,
+            "threads_serveur": None if args.url else args.threads,
+        }
+    )
+    sortie = args.sortie
+    if sortie is None:
+        horodatage = datetime.now().strftime("%Y%m%d_%H%M%S")
+        sortie = DOSSIER_RESULTATS / f"charge_api_{horodatage}.json"
+    sortie.parent.mkdir(parents=True, exist_ok=True)
+    sortie.write_text(json.dumps(resultat, indent=2), encoding="utf-8")
+    print(f"Resultats enregistres dans {sortie}")
+    return sortie
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Compare deux fichiers de resultats de benchmarks/executer.py
+
+    python -m benchmarks.comparer ancien.json nouveau.json --metrique p95_ms
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+# Rapport nouveau / ancien au-dela duquel une mesure est signalee
+SEUIL_REGRESSION = 1.2
+
+
+def charger(chemin) -> dict:
+    """Retourne {(mouvements, fonction): mesures} d'un fichier de resultats"""
+    resultats = json.loads(Path(chemin).read_text(encoding="utf-8"))
+    return {
+        (taille["mouvements"], nom): mesures
+        for taille in resultats["tailles"]
+        for nom, mesures in taille["fonctions"].items()
+    }
+
+
+def comparer(ancien: dict, nouveau: dict, metrique: str = "p50_ms") -> list[dict]:
+    """
+    Rapproche les mesures communes aux deux executions
+
+    Returns:
+        list: [{mouvements, fonction, ancien, nouveau, rapport}] ; rapport > 1
+              signifie plus lent (ou plus gourmand) dans la nouvelle execution
+    """
+    lignes = []
+    for cle in sorted(ancien.keys() & nouveau.keys()):
+        valeur_ancienne = ancien[cle][metrique]
+        valeur_nouvelle = nouveau[cle][metrique]
+        lignes.append(
+            {
+                "mouvements": cle[0],
+                "fonction": cle[1],
+                "ancien": valeur_ancienne,
+                "nouveau": valeur_nouvelle,
+                "rapport": (
+                    round(valeur_nouvelle / valeur_ancienne, 3)
+                    if valeur_ancienne
+                    else None
+                ),
+            }
+        )
+    return lignes
+
+
+def main(arguments: list[str] | None = None):
+    parseur = argparse.ArgumentParser(description="Compare deux benchmarks")
+    parseur.add_argument("ancien", type=Path)
+    parseur.add_argument("nouveau", type=Path)
+    parseur.add_argument(
+        "--metrique",
+        default="p50_ms",
+        help="p50_ms, p95_ms, p99_ms, moyenne_ms, pic_memoire_ko...",
+    )
+    parseur.add_argument("--seuil", type=float, default=SEUIL_REGRESSION)
+    args = parseur.parse_args(arguments)
+
+    lignes = comparer(charger(args.ancien), charger(args.nouveau), args.metrique)
+    regressions = 0
+    for ligne in lignes:
+        rapport = ligne["rapport"]
+        marque = ""
+        if rapport is not None and rapport > args.seuil:
+            marque = "  <-- regression"
+            regressions += 1
+        print(
+            f"{ligne['mouvements']:>10} {ligne['fonction']:<38}"
+            f" {ligne['ancien']:>12.3f} {ligne['nouveau']:>12.3f}"
+            f" {rapport if rapport is not None else '-':>8}{marque}"
+        )
+    print(f"{len(lignes)} mesures comparees, {regressions} au-dela de x{args.seuil}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,358 @@
+"""
+Benchmark de la couche database.requetes sur des bases synthetiques
+
+    python -m benchmarks.executer --tailles 10000 100000 1000000
+
+Pour chaque taille (nombre de mouvements), une base est generee dans un dossier
+temporaire puis chaque fonction publique est chronometree. Les resultats sont
+enregistres en JSON (voir benchmarks/comparer.py pour comparer deux fichiers).
+"""
+
+import argparse
+import itertools
+import json
+import platform
+import random
+import sqlite3
+import subprocess
+import tempfile
+from collections.abc import Callable
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import NamedTuple
+
+from benchmarks.generateur import MOTS, generer_base
+from benchmarks.mesures import mesurer
+from database.gestionnaire_bd import changer_base
+from database.profilage import profileur
+from database.requetes import (
+    compter_produits_stock_faible,
+    creer_mouvement,
+    creer_mouvements_lot,
+    creer_produit,
+    creer_produits_lot,
+    modifier_produit,
+    obtenir_liste_produits,
+    obtenir_mouvements_par_date,
+    obtenir_mouvements_par_type,
+    obtenir_mouvements_produit,
+    obtenir_mouvements_recents,
+    obtenir_page_mouvements,
+    obtenir_page_mouvements_par_date,
+    obtenir_page_mouvements_par_type,
+    obtenir_page_mouvements_produit,
+    obtenir_page_produits,
+    obtenir_produit,
+    obtenir_produits_par_categorie,
+    obtenir_produits_stock_faible,
+    obtenir_statistiques_inventaire,
+    obtenir_statistiques_par_categorie,
+    obtenir_tous_mouvements,
+    obtenir_tous_produits,
+    obtenir_toutes_categories,
+    obtenir_valeur_inventaire,
+    prendre_instantane,
+    rechercher_mouvements,
+    rechercher_produits,
+    stock_a_la_date,
+    verifier_statistiques,
+    vider_caches,
+)
+
+DOSSIER_RESULTATS = Path(__file__).resolve().parent / "resultats"
+TAILLES_PAR_DEFAUT = [10000, 100000]
+# Au-dela, les scenarios lourds (tables entieres en memoire) sont ignores
+LIMITE_LOURDS = 1000000
+REPETITIONS_LOURDS = 3
+TAILLE_LOT_BENCHMARK = 1000
+
+
+class Scenario(NamedTuple):
+    nom: str
+    fonction: Callable[[], object]
+    lourd: bool = False  # charge une table entiere
+
+
+def scenarios(nombre_produits: int, nombre_categories: int, graine: int) -> list:
+    """
+    Construit les appels mesures ; les parametres (produit, terme, dates)
+    varient d'un appel a l'autre selon un generateur reproductible
+
+    Les ecritures sont mesurees en dernier : elles modifient la base.
+    """
+    alea = random.Random(graine)
+    codes = itertools.count(10**12)
+
+    def produit():
+        return alea.randint(1, nombre_produits)
+
+    def jour(recul_max: int = 30) -> str:
+        return (date.today() - timedelta(days=alea.randint(1, recul_max))).isoformat()
+
+    def mouvements_du_jour():
+        jour_choisi = jour()
+        return obtenir_mouvements_par_date(jour_choisi, jour_choisi)
+
+    def nouveau_produit(numero):
+        return {
+            "nom": f"Benchmark {numero}",
+            "prix_unitaire": 9.99,
+            "categorie_id": alea.randint(1, nombre_categories),
+            "code_barre": str(numero),
+            "stock_actuel": 10,
+        }
+
+    debut_mois = (date.today() - timedelta(days=30)).isoformat()
+    aujourd_hui = date.today().isoformat()
+    hier = (date.today() - timedelta(days=1)).isoformat()
+
+    return [
+        # Produits et recherche
+        Scenario("obtenir_produit", lambda: obtenir_produit(produit())),
+        Scenario("rechercher_produits", lambda: rechercher_produits(alea.choice(MOTS))),
+        Scenario(
+            "rechercher_produits_code_barre",
+            lambda: rechercher_produits(f"{produit():013d}"),
+        ),
+        Scenario("obtenir_page_produits", lambda: obtenir_page_produits()),
+        Scenario(
+            "obtenir_page_produits_recherche",
+            lambda: obtenir_page_produits(recherche=alea.choice(MOTS)),
+        ),
+        Scenario("obtenir_liste_produits", obtenir_liste_produits),
+        Scenario(
+            "obtenir_produits_par_categorie",
+            lambda: obtenir_produits_par_categorie(alea.randint(1, nombre_categories)),
+        ),
+        Scenario("obtenir_produits_stock_faible", obtenir_produits_stock_faible),
+        Scenario("compter_produits_stock_faible", compter_produits_stock_faible),
+        Scenario("obtenir_toutes_categories", obtenir_toutes_categories),
+        Scenario("obtenir_tous_produits", obtenir_tous_produits, lourd=True),
+        # Statistiques
+        Scenario("obtenir_valeur_inventaire", obtenir_valeur_inventaire),
+        Scenario("obtenir_statistiques_inventaire", obtenir_statistiques_inventaire),
+        Scenario(
+            "obtenir_statistiques_par_categorie", obtenir_statistiques_par_categorie
+        ),
+        Scenario("verifier_statistiques", verifier_statistiques),
+        # Mouvements
+        Scenario("obtenir_mouvements_recents", obtenir_mouvements_recents),
+        Scenario("obtenir_page_mouvements", lambda: obtenir_page_mouvements()),
+        Scenario(
+            "obtenir_page_mouvements_produit",
+            lambda: obtenir_page_mouvements_produit(produit()),
+        ),
+        Scenario(
+            "obtenir_page_mouvements_par_date",
+            lambda: obtenir_page_mouvements_par_date(debut_mois, aujourd_hui),
+        ),
+        Scenario(
+            "obtenir_page_mouvements_par_type",
+            lambda: obtenir_page_mouvements_par_type(alea.choice(["ENTREE", "SORTIE"])),
+        ),
+        Scenario(
+            "rechercher_mouvements",
+            lambda: rechercher_mouvements(
+                produit_id=produit(), date_debut=jour(365), date_fin=aujourd_hui
+            ),
+        ),
+        Scenario(
+            "obtenir_mouvements_produit",
+            lambda: obtenir_mouvements_produit(produit()),
+        ),
+        Scenario("obtenir_mouvements_par_date", mouvements_du_jour),
+        Scenario(
+            "obtenir_mouvements_par_type",
+            lambda: obtenir_mouvements_par_type("SORTIE"),
+            lourd=True,
+        ),
+        Scenario("obtenir_tous_mouvements", obtenir_tous_mouvements, lourd=True),
+        # Instantanes
+        Scenario("prendre_instantane", lambda: prendre_instantane(hier)),
+        Scenario("stock_a_la_date", lambda: stock_a_la_date(produit(), jour(365))),
+        # Ecritures
+        Scenario(
+            "creer_produit",
+            lambda: creer_produit(
+                "Benchmark", 9.99, None, str(next(codes)), stock_actuel=10
+            ),
+        ),
+        Scenario(
+            "modifier_produit",
+            lambda: modifier_produit(produit(), stock_minimum=alea.randint(0, 20)),
+        ),
+        Scenario(
+            "creer_mouvement",
+            lambda: creer_mouvement(produit(), "ENTREE", 1, "Benchmark"),
+        ),
+        Scenario(
+            "creer_mouvements_lot",
+            lambda: creer_mouvements_lot(
+                {"produit_id": produit(), "type_mouvement": "ENTREE", "quantite": 1}
+                for _ in range(TAILLE_LOT_BENCHMARK)
+            ),
+        ),
+        Scenario(
+            "creer_produits_lot",
+            lambda: creer_produits_lot(
+                nouveau_produit(next(codes)) for _ in range(TAILLE_LOT_BENCHMARK)
+            ),
+        ),
+    ]
+
+
+def executer_taille(
+    nombre_mouvements: int,
+    dossier: Path,
+    repetitions: int,
+    graine: int,
+    avec_cache: bool = False,
+    lourds: bool = False,
+    filtre: str | None = None,
+) -> dict:
+    """
+    Genere une base de la taille donnee puis mesure chaque scenario
+
+    Returns:
+        dict: {mouvements, generation, fonctions: {nom: mesures}}
+    """
+    chemin = dossier / f"benchmark_{nombre_mouvements}_{graine}.db"
+    for fichier in dossier.glob(f"{chemin.name}*"):
+        fichier.unlink()
+
+    print(f"Generation de {nombre_mouvements} mouvements dans {chemin}...")
+    generation = generer_base(chemin, nombre_mouvements, graine=graine)
+    print(f"  base generee en {generation['duree_s']} s")
+
+    gestionnaire = changer_base(chemin)
+    vider_caches()
+    profileur.reinitialiser()
+    preparer = None if avec_cache else vider_caches
+
+    fonctions = {}
+    for scenario in scenarios(generation["produits"], generation["categories"], graine):
+        if filtre and filtre not in scenario.nom:
+            continue
+        nombre = repetitions
+        if scenario.lourd:
+            if nombre_mouvements > LIMITE_LOURDS and not lourds:
+                print(f"  {scenario.nom}: ignore (scenario lourd, voir --lourds)")
+                continue
+            nombre = min(repetitions, REPETITIONS_LOURDS)
+        mesures = mesurer(scenario.fonction, nombre, preparer)
+        fonctions[scenario.nom] = mesures
+        print(
+            f"  {scenario.nom:<38} p50 {mesures['p50_ms']:>10.3f} ms"
+            f"  p95 {mesures['p95_ms']:>10.3f} ms"
+            f"  p99 {mesures['p99_ms']:>10.3f} ms"
+            f"  pic {mesures['pic_memoire_ko']:>10.1f} Ko"
+        )
+
+    gestionnaire.fermer()
+    resultat = {
+        "mouvements": nombre_mouvements,
+        "generation": generation,
+        "fonctions": fonctions,
+    }
+    if profileur.actif:
+        resultat["profil"] = profileur.resume(limite=None)
+    return resultat
+
+
+def revision_git() -> str | None:
+    """Commit courant du depot (pour comparer les versions), None si inconnu"""
+    try:
+        sortie = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=Path(__file__).resolve().parent,
+            check=True,
+        )
+        return sortie.stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(arguments: list[str] | None = None) -> Path:
+    parseur = argparse.ArgumentParser(
+        description="Benchmark des requetes sur des bases synthetiques"
+    )
+    parseur.add_argument(
+        "--tailles",
+        type=int,
+        nargs="+",
+        default=TAILLES_PAR_DEFAUT,
+        help="Nombres de mouvements generes (ex: 10000 1000000 10000000)",
+    )
+    parseur.add_argument("--repetitions", type=int, default=50)
+    parseur.add_argument("--graine", type=int, default=0)
+    parseur.add_argument(
+        "--dossier", type=Path, help="Dossier des bases generees (temporaire sinon)"
+    )
+    parseur.add_argument("--sortie", type=Path, help="Fichier JSON des resultats")
+    parseur.add_argument(
+        "--avec-cache",
+        action="store_true",
+        help="Garde les caches entre les appels (vides avant chaque appel sinon)",
+    )
+    parseur.add_argument(
+        "--lourds",
+        action="store_true",
+        help=f"Mesure les scenarios lourds au-dela de {LIMITE_LOURDS} mouvements",
+    )
+    parseur.add_argument(
+        "--profilage",
+        action="store_true",
+        help="Profile les requetes SQL (agregats ajoutes aux resultats)",
+    )
+    parseur.add_argument(
+        "--filtre", help="Ne mesure que les scenarios dont le nom contient ce texte"
+    )
+    args = parseur.parse_args(arguments)
+    # Par defaut, mesures sans l'instrumentation des connexions
+    profileur.actif = args.profilage
+
+    resultats = {
+        "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "revision": revision_git(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "plateforme": platform.platform(),
+        "parametres": {
+            "repetitions": args.repetitions,
+            "graine": args.graine,
+            "avec_cache": args.avec_cache,
+        },
+        "tailles": [],
+    }
+
+    with tempfile.TemporaryDirectory(prefix="benchmark_inventaire_") as temporaire:
+        dossier = args.dossier or Path(temporaire)
+        dossier.mkdir(parents=True, exist_ok=True)
+        for taille in args.tailles:
+            resultats["tailles"].append(
+                executer_taille(
+                    taille,
+                    dossier,
+                    args.repetitions,
+                    args.graine,
+                    args.avec_cache,
+                    args.lourds,
+                    args.filtre,
+                )
+            )
+
+    sortie = args.sortie
+    if sortie is None:
+        horodatage = datetime.now().strftime("%Y%m%d_%H%M%S")
+        nom = f"{horodatage}_{resultats['revision'] or 'inconnue'}.json"
+        sortie = DOSSIER_RESULTATS / nom
+    sortie.parent.mkdir(parents=True, exist_ok=True)
+    sortie.write_text(json.dumps(resultats, indent=2), encoding="utf-8")
+    print(f"Resultats enregistres dans {sortie}")
+    return sortie
+
+
+if __name__ == "__main__":
+    main()
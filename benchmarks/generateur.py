@@ -0,0 +1,188 @@
+import random
+import time
+from datetime import datetime, timedelta
+
+from database.gestionnaire_bd import GestionnaireBD
+
+# Vocabulaire des noms de produits (recherche plein texte)
+MOTS = [
+    "cable",
+    "vis",
+    "ecrou",
+    "boulon",
+    "clavier",
+    "souris",
+    "ecran",
+    "lampe",
+    "papier",
+    "stylo",
+    "carton",
+    "ruban",
+    "colle",
+    "batterie",
+    "chargeur",
+    "filtre",
+    "tuyau",
+    "joint",
+    "gant",
+    "casque",
+]
+ADJECTIFS = ["standard", "renforce", "compact", "pro", "eco", "noir", "blanc", "xl"]
+FOURNISSEURS = [f"Fournisseur {lettre}" for lettre in "ABCDEFGHIJ"]
+MOTIFS = {"ENTREE": "Reception commande", "SORTIE": "Vente"}
+UTILISATEURS = ["admin", "caisse1", "caisse2", "magasin"]
+
+
+def nombre_produits_par_defaut(nombre_mouvements: int) -> int:
+    """Environ 100 mouvements par produit, au moins 100 produits"""
+    return max(100, nombre_mouvements // 100)
+
+
+def generer_base(
+    chemin,
+    nombre_mouvements: int,
+    nombre_produits: int | None = None,
+    nombre_categories: int = 50,
+    jours: int = 730,
+    graine: int = 0,
+    taille_lot: int = 50000,
+) -> dict:
+    """
+    Cree une base synthetique : categories, catalogue et historique de
+    mouvements etales sur les derniers jours (du plus ancien au plus recent)
+
+    Les mouvements sont inseres par lots directement en SQL, les stocks des
+    produits sont ensuite fixes au cumul de leurs mouvements (jamais negatif).
+    Les triggers du schema (plein texte, statistiques) restent actifs.
+
+    Args:
+        chemin: Fichier de la base a creer (ne doit pas contenir de donnees)
+        nombre_mouvements (int): Nombre de mouvements a generer
+        nombre_produits (int): Taille du catalogue, ~1 produit pour 100
+                               mouvements par defaut
+        nombre_categories (int): Nombre de categories
+        jours (int): Profondeur de l'historique en jours
+        graine (int): Graine du generateur aleatoire (bases reproductibles)
+        taille_lot (int): Lignes inserees par transaction
+
+    Returns:
+        dict: {categories, produits, mouvements, jours, duree_s}
+    """
+    if nombre_produits is None:
+        nombre_produits = nombre_produits_par_defaut(nombre_mouvements)
+    alea = random.Random(graine)
+    debut = time.perf_counter()
+
+    gestionnaire = GestionnaireBD(chemin, profilage=False)
+    gestionnaire.connecter()
+    gestionnaire.initialiser_tables()
+    maintenant = datetime.now()
+    date_ajout = (maintenant - timedelta(days=jours)).strftime("%Y-%m-%d %H:%M:%S")
+
+    try:
+        with gestionnaire.ecriture() as connexion:
+            cur = connexion.cursor()
+            cur.execute("BEGIN TRANSACTION")
+            cur.executemany(
+                """
+                INSERT INTO categories (nom, description, date_creation)
+                VALUES (?, ?, ?)
+            """,
+                (
+                    (f"Categorie {i:03d}", f"Categorie synthetique {i}", date_ajout)
+                    for i in range(1, nombre_categories + 1)
+                ),
+            )
+            cur.executemany(
+                """
+                INSERT INTO produits (nom, categorie_id, code_barre, prix_unitaire,
+                                      stock_actuel, stock_minimum, fournisseur,
+                                      description, date_ajout)
+                VALUES (?, ?, ?, ?, 0, ?, ?, ?, ?)
+            """,
+                (
+                    _produit(alea, i, nombre_categories, date_ajout)
+                    for i in range(1, nombre_produits + 1)
+                ),
+            )
+            connexion.commit()
+
+            stocks = [0] * (nombre_produits + 1)
+            requete = """
+                INSERT INTO mouvements_stock (produit_id, type_mouvement, quantite,
+                                              motif, utilisateur, date_mouvement)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """
+            mouvements = _mouvements(
+                alea, nombre_mouvements, nombre_produits, jours, maintenant, stocks
+            )
+            restants = nombre_mouvements
+            while restants > 0:
+                lot = min(taille_lot, restants)
+                cur.execute("BEGIN TRANSACTION")
+                cur.executemany(requete, (next(mouvements) for _ in range(lot)))
+                connexion.commit()
+                restants -= lot
+
+            cur.execute("BEGIN TRANSACTION")
+            cur.executemany(
+                "UPDATE produits SET stock_actuel = ? WHERE produit_id = ?",
+                ((stocks[i], i) for i in range(1, nombre_produits + 1)),
+            )
+            connexion.commit()
+    finally:
+        gestionnaire.fermer()
+
+    return {
+        "categories": nombre_categories,
+        "produits": nombre_produits,
+        "mouvements": nombre_mouvements,
+        "jours": jours,
+        "duree_s": round(time.perf_counter() - debut, 3),
+    }
+
+
+def _produit(alea: random.Random, numero: int, nombre_categories: int, date_ajout):
+    nom = f"{alea.choice(MOTS).capitalize()} {alea.choice(ADJECTIFS)} {numero}"
+    return (
+        nom,
+        alea.randint(1, nombre_categories),
+        f"{numero:013d}",
+        round(alea.uniform(0.5, 500), 2),
+        alea.randint(0, 20),
+        alea.choice(FOURNISSEURS),
+        f"{nom} - article synthetique",
+        date_ajout,
+    )
+
+
+def _mouvements(
+    alea: random.Random,
+    nombre: int,
+    nombre_produits: int,
+    jours: int,
+    maintenant: datetime,
+    stocks: list[int],
+):
+    """Genere les lignes de mouvements dans l'ordre chronologique"""
+    debut = maintenant - timedelta(days=jours)
+    pas = jours * 86400 / max(nombre, 1)
+    for i in range(nombre):
+        produit_id = alea.randint(1, nombre_produits)
+        quantite = alea.randint(1, 50)
+        # Sortie seulement si le stock la couvre
+        if stocks[produit_id] >= quantite and alea.random() < 0.45:
+            type_mouvement = "SORTIE"
+            stocks[produit_id] -= quantite
+        else:
+            type_mouvement = "ENTREE"
+            stocks[produit_id] += quantite
+        date_mouvement = debut + timedelta(seconds=i * pas)
+        yield (
+            produit_id,
+            type_mouvement,
+            quantite,
+            MOTIFS[type_mouvement],
+            alea.choice(UTILISATEURS),
+            date_mouvement.strftime("%Y-%m-%d %H:%M:%S"),
+        )
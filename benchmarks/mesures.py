@@ -0,0 +1,70 @@
+import time
+import tracemalloc
+from collections.abc import Callable
+
+
+def centile(valeurs_triees: list[float], rang: float) -> float:
+    """
+    Centile par interpolation lineaire (meme convention que numpy)
+
+    Args:
+        valeurs_triees (list): Valeurs triees par ordre croissant, non vide
+        rang (float): Centile voulu, entre 0 et 100
+    """
+    position = (len(valeurs_triees) - 1) * rang / 100
+    bas = int(position)
+    haut = min(bas + 1, len(valeurs_triees) - 1)
+    fraction = position - bas
+    return valeurs_triees[bas] + (valeurs_triees[haut] - valeurs_triees[bas]) * fraction
+
+
+def mesurer(
+    fonction: Callable[[], object],
+    repetitions: int,
+    preparer: Callable[[], None] | None = None,
+) -> dict:
+    """
+    Mesure la latence et le pic memoire d'une fonction sans argument
+
+    Un premier appel sous tracemalloc donne le pic memoire (allocations Python
+    seulement, le cache de pages SQLite n'est pas compte) ; les appels chronometres
+    suivent, sans tracemalloc qui les ralentirait.
+
+    Args:
+        fonction (Callable): Appel a mesurer
+        repetitions (int): Nombre d'appels chronometres
+        preparer (Callable): Appele avant chaque appel, hors chronometre
+                             (ex: vider les caches)
+
+    Returns:
+        dict: {repetitions, min_ms, moyenne_ms, p50_ms, p95_ms, p99_ms, max_ms,
+               pic_memoire_ko}
+    """
+    if preparer:
+        preparer()
+    tracemalloc.start()
+    try:
+        fonction()
+        _, pic = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    durees = []
+    for _ in range(max(1, repetitions)):
+        if preparer:
+            preparer()
+        debut = time.perf_counter()
+        fonction()
+        durees.append((time.perf_counter() - debut) * 1000)
+
+    durees.sort()
+    return {
+        "repetitions": len(durees),
+        "min_ms": round(durees[0], 4),
+        "moyenne_ms": round(sum(durees) / len(durees), 4),
+        "p50_ms": round(centile(durees, 50), 4),
+        "p95_ms": round(centile(durees, 95), 4),
+        "p99_ms": round(centile(durees, 99), 4),
+        "max_ms": round(durees[-1], 4),
+        "pic_memoire_ko": round(pic / 1024, 1),
+    }
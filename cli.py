@@ -0,0 +1,452 @@
+"""
+Interface en ligne de commande, sans interface graphique (serveurs, taches
+planifiees). Les resultats sont ecrits sur la sortie standard en JSON Lines
+(un objet par ligne) ; les messages de la couche base de donnees vont sur la
+sortie d'erreur.
+
+    python cli.py produits lister --stock-faible
+    python cli.py mouvements lister --du 2024-01-01 --au 2024-01-31
+    python cli.py import mouvements livraisons.csv
+    python cli.py stats verifier
+
+Code de sortie : 0 si succes, 1 si l'operation a echoue, 2 si la commande est
+invalide.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+from collections.abc import Iterable
+from contextlib import redirect_stdout
+
+from config.parametres import MOIS_CONSERVES, TAILLE_LOT_IMPORT
+from database.archivage import archiver_mouvements
+from database.exportation import (
+    exporter_mouvements,
+    exporter_produits,
+    exporter_produits_stock_faible,
+)
+from database.gestionnaire_bd import changer_base
+from database.importation import importer_mouvements, importer_produits
+from database.profilage import resumer_journal
+from database.requetes import (
+    creer_categorie,
+    creer_mouvement,
+    creer_produit,
+    derniere_date_close,
+    iterer_mouvements,
+    iterer_produits,
+    modifier_categorie,
+    modifier_produit,
+    obtenir_categorie,
+    obtenir_mouvements_recents,
+    obtenir_produit,
+    obtenir_statistiques_inventaire,
+    obtenir_statistiques_par_categorie,
+    obtenir_toutes_categories,
+    prendre_instantane,
+    prendre_instantane_si_necessaire,
+    rechercher_produits,
+    recalculer_statistiques,
+    stock_a_la_date,
+    supprimer_categorie,
+    supprimer_produit,
+    verifier_statistiques,
+)
+
+# Options de produit : (option, champ de creer_produit / modifier_produit, type)
+OPTIONS_PRODUIT = [
+    ("--nom", "nom", str),
+    ("--prix", "prix_unitaire", float),
+    ("--categorie-id", "categorie_id", int),
+    ("--code-barre", "code_barre", str),
+    ("--stock", "stock_actuel", int),
+    ("--stock-minimum", "stock_minimum", int),
+    ("--fournisseur", "fournisseur", str),
+    ("--description", "description", str),
+]
+
+
+class EchecCommande(Exception):
+    """Operation refusee ou en echec (code de sortie 1)"""
+
+
+def _verifier(resultat, message: str):
+    """Leve EchecCommande si une fonction d'ecriture signale un echec"""
+    if resultat is None or resultat is False:
+        raise EchecCommande(message)
+    return resultat
+
+
+def _champs_produit(args) -> dict:
+    return {
+        champ: getattr(args, champ)
+        for _, champ, _ in OPTIONS_PRODUIT
+        if getattr(args, champ) is not None
+    }
+
+
+# ---------- Produits ----------
+def produits_lister(args) -> Iterable[dict]:
+    if args.recherche:
+        return rechercher_produits(args.recherche, limite=args.limite)
+    return iterer_produits(stock_faible=args.stock_faible)
+
+
+def produits_obtenir(args) -> dict:
+    return _verifier(obtenir_produit(args.produit_id), "Produit introuvable")
+
+
+def produits_creer(args) -> dict:
+    champs = _champs_produit(args)
+    if "nom" not in champs or "prix_unitaire" not in champs:
+        raise EchecCommande("--nom et --prix sont obligatoires")
+    produit_id = creer_produit(**champs)
+    return {"produit_id": _verifier(produit_id, "Creation du produit refusee")}
+
+
+def produits_modifier(args) -> dict:
+    champs = _champs_produit(args)
+    if not champs:
+        raise EchecCommande("Aucun champ a modifier")
+    if "stock_actuel" in champs and args.version_attendue is None:
+        raise EchecCommande(
+            "--stock exige --version (ou enregistrer un mouvement de stock)"
+        )
+    _verifier(
+        modifier_produit(args.produit_id, args.version_attendue, **champs),
+        "Modification refusee (produit introuvable ou modifie entre-temps)",
+    )
+    return {"produit_id": args.produit_id, "modifie": True}
+
+
+def produits_supprimer(args) -> dict:
+    _verifier(supprimer_produit(args.produit_id), "Produit introuvable")
+    return {"produit_id": args.produit_id, "supprime": True}
+
+
+def produits_stock(args) -> dict:
+    stock = _verifier(stock_a_la_date(args.produit_id, args.date), "Stock inconnu")
+    return {"produit_id": args.produit_id, "date": args.date, "stock": stock}
+
+
+# ---------- Categories ----------
+def categories_lister(args) -> list[dict]:
+    return obtenir_toutes_categories()
+
+
+def categories_obtenir(args) -> dict:
+    # sqlite3.Row : converti pour etre ecrit comme un seul objet JSON
+    categorie = obtenir_categorie(args.categorie_id)
+    categorie = dict(categorie) if categorie is not None else None
+    return _verifier(categorie, "Categorie introuvable")
+
+
+def categories_creer(args) -> dict:
+    categorie_id = creer_categorie(args.nom, args.description or "")
+    return {"categorie_id": _verifier(categorie_id, "Creation de categorie refusee")}
+
+
+def categories_modifier(args) -> dict:
+    _verifier(
+        modifier_categorie(args.categorie_id, args.nom, args.description),
+        "Modification refusee",
+    )
+    return {"categorie_id": args.categorie_id, "modifie": True}
+
+
+def categories_supprimer(args) -> dict:
+    _verifier(supprimer_categorie(args.categorie_id), "Categorie introuvable")
+    return {"categorie_id": args.categorie_id, "supprime": True}
+
+
+# ---------- Mouvements ----------
+def mouvements_lister(args) -> Iterable[dict]:
+    if args.recents:
+        return obtenir_mouvements_recents(args.recents)
+    return iterer_mouvements(
+        produit_id=args.produit_id,
+        type_mouvement=args.type,
+        date_debut=args.du,
+        date_fin=args.au,
+    )
+
+
+def mouvements_creer(args) -> dict:
+    mouvement_id = creer_mouvement(
+        args.produit_id,
+        args.type,
+        args.quantite,
+        args.motif,
+        args.utilisateur,
+        args.remarques,
+    )
+    return {"mouvement_id": _verifier(mouvement_id, "Mouvement refuse")}
+
+
+# ---------- Statistiques et rapports ----------
+def stats_resume(args) -> dict:
+    return obtenir_statistiques_inventaire()
+
+
+def stats_categories(args) -> list[dict]:
+    return obtenir_statistiques_par_categorie()
+
+
+def stats_verifier(args) -> dict:
+    resultat = verifier_statistiques()
+    if not resultat["coherent"]:
+        # Ecrit le rapport avant de signaler l'echec
+        _ecrire([resultat])
+        raise EchecCommande("Statistiques materialisees incoherentes")
+    return resultat
+
+
+def stats_recalculer(args) -> dict:
+    return _verifier(recalculer_statistiques(), "Recalcul impossible")
+
+
+def alertes(args) -> Iterable[dict]:
+    return iterer_produits(stock_faible=True)
+
+
+def exporter(args) -> dict:
+    if args.quoi == "produits":
+        nombre = exporter_produits(args.fichier, args.format)
+    elif args.quoi == "alertes":
+        nombre = exporter_produits_stock_faible(args.fichier, args.format)
+    else:
+        nombre = exporter_mouvements(
+            args.fichier,
+            args.format,
+            produit_id=args.produit_id,
+            type_mouvement=args.type,
+            date_debut=args.du,
+            date_fin=args.au,
+        )
+    return {"fichier": str(args.fichier), "lignes": nombre}
+
+
+def importer(args) -> dict:
+    fonction = importer_produits if args.quoi == "produits" else importer_mouvements
+    options = {"delimiteur": args.delimiteur} if args.delimiteur else {}
+
+    def progression(rapport):
+        print(
+            f"{rapport['lignes']} lignes lues, {rapport['importees']} importees",
+            file=sys.stderr,
+        )
+
+    return fonction(
+        args.fichier,
+        args.format,
+        taille_lot=args.taille_lot,
+        progression=progression,
+        **options,
+    )
+
+
+# ---------- Maintenance ----------
+def archiver(args) -> dict:
+    return _verifier(archiver_mouvements(args.mois), "Archivage impossible")
+
+
+def instantane(args) -> dict:
+    if args.si_necessaire:
+        return {"date_instantane": prendre_instantane_si_necessaire()}
+    date_instantane = args.date or derniere_date_close("quotidien")
+    nombre = _verifier(prendre_instantane(date_instantane), "Instantane impossible")
+    return {"date_instantane": date_instantane, "produits": nombre}
+
+
+def profilage(args) -> list[dict]:
+    return resumer_journal(args.fichier) if args.fichier else resumer_journal()
+
+
+# ---------- Analyse des arguments ----------
+def _entier_positif(texte: str) -> int:
+    """Type argparse des tailles (limite, lot) : entier superieur ou egal a 1"""
+    try:
+        valeur = int(texte)
+    except ValueError:
+        valeur = 0
+    if valeur < 1:
+        raise argparse.ArgumentTypeError(f"entier >= 1 attendu : {texte!r}")
+    return valeur
+
+
+def _ajouter_options_produit(parseur):
+    for option, champ, type_option in OPTIONS_PRODUIT:
+        parseur.add_argument(option, dest=champ, type=type_option)
+
+
+def _ajouter_filtres_mouvements(parseur):
+    parseur.add_argument("--produit-id", type=int)
+    parseur.add_argument("--type", choices=["ENTREE", "SORTIE"])
+    parseur.add_argument("--du", help="Date de debut incluse (YYYY-MM-DD)")
+    parseur.add_argument("--au", help="Date de fin incluse (YYYY-MM-DD)")
+
+
+def creer_parseur() -> argparse.ArgumentParser:
+    parseur = argparse.ArgumentParser(
+        prog="cli.py", description="Gestion d'inventaire en ligne de commande"
+    )
+    parseur.add_argument("--base", help="Fichier de la base (DB_PATH par defaut)")
+    commandes = parseur.add_subparsers(dest="commande", required=True)
+
+    # produits
+    produits = commandes.add_parser("produits", help="Catalogue des produits")
+    actions = produits.add_subparsers(dest="action", required=True)
+    p = actions.add_parser("lister", help="Tous les produits, tries par nom")
+    p.add_argument("--recherche", help="Code barre ou texte (plein texte)")
+    p.add_argument("--limite", type=_entier_positif, default=200)
+    p.add_argument("--stock-faible", action="store_true")
+    p.set_defaults(fonction=produits_lister)
+    p = actions.add_parser("obtenir")
+    p.add_argument("produit_id", type=int)
+    p.set_defaults(fonction=produits_obtenir)
+    p = actions.add_parser("creer", help="--nom et --prix obligatoires")
+    _ajouter_options_produit(p)
+    p.set_defaults(fonction=produits_creer)
+    p = actions.add_parser("modifier")
+    p.add_argument("produit_id", type=int)
+    _ajouter_options_produit(p)
+    p.add_argument(
+        "--version",
+        dest="version_attendue",
+        type=int,
+        help="Refuse la modification si le produit n'est plus a cette version",
+    )
+    p.set_defaults(fonction=produits_modifier)
+    p = actions.add_parser("supprimer")
+    p.add_argument("produit_id", type=int)
+    p.set_defaults(fonction=produits_supprimer)
+    p = actions.add_parser("stock", help="Stock d'un produit a la fin d'un jour")
+    p.add_argument("produit_id", type=int)
+    p.add_argument("date", help="YYYY-MM-DD")
+    p.set_defaults(fonction=produits_stock)
+
+    # categories
+    categories = commandes.add_parser("categories", help="Categories de produits")
+    actions = categories.add_subparsers(dest="action", required=True)
+    actions.add_parser("lister").set_defaults(fonction=categories_lister)
+    p = actions.add_parser("obtenir")
+    p.add_argument("categorie_id", type=int)
+    p.set_defaults(fonction=categories_obtenir)
+    p = actions.add_parser("creer")
+    p.add_argument("nom")
+    p.add_argument("--description")
+    p.set_defaults(fonction=categories_creer)
+    p = actions.add_parser("modifier")
+    p.add_argument("categorie_id", type=int)
+    p.add_argument("--nom")
+    p.add_argument("--description")
+    p.set_defaults(fonction=categories_modifier)
+    p = actions.add_parser("supprimer")
+    p.add_argument("categorie_id", type=int)
+    p.set_defaults(fonction=categories_supprimer)
+
+    # mouvements
+    mouvements = commandes.add_parser("mouvements", help="Mouvements de stock")
+    actions = mouvements.add_subparsers(dest="action", required=True)
+    p = actions.add_parser("lister", help="Historique (archives comprises)")
+    _ajouter_filtres_mouvements(p)
+    p.add_argument("--recents", type=_entier_positif, help="Seulement les N derniers")
+    p.set_defaults(fonction=mouvements_lister)
+    p = actions.add_parser("creer")
+    p.add_argument("produit_id", type=int)
+    p.add_argument("type", choices=["ENTREE", "SORTIE"])
+    p.add_argument("quantite", type=int)
+    p.add_argument("--motif", default="")
+    p.add_argument("--utilisateur", default="")
+    p.add_argument("--remarques", default="")
+    p.set_defaults(fonction=mouvements_creer)
+
+    # statistiques et rapports
+    stats = commandes.add_parser("stats", help="Statistiques de l'inventaire")
+    actions = stats.add_subparsers(dest="action")
+    stats.set_defaults(fonction=stats_resume)
+    actions.add_parser("resume").set_defaults(fonction=stats_resume)
+    actions.add_parser("categories").set_defaults(fonction=stats_categories)
+    actions.add_parser(
+        "verifier", help="Compare les agregats a un recalcul complet"
+    ).set_defaults(fonction=stats_verifier)
+    actions.add_parser("recalculer").set_defaults(fonction=stats_recalculer)
+    commandes.add_parser(
+        "alertes", help="Produits sous leur stock minimum"
+    ).set_defaults(fonction=alertes)
+
+    p = commandes.add_parser("export", help="Export CSV, JSONL ou colonnes")
+    p.add_argument("quoi", choices=["produits", "alertes", "mouvements"])
+    p.add_argument("fichier")
+    p.add_argument("--format", help="csv, jsonl ou colonnes (selon l'extension)")
+    _ajouter_filtres_mouvements(p)
+    p.set_defaults(fonction=exporter)
+
+    p = commandes.add_parser("import", help="Import CSV ou JSONL par lots")
+    p.add_argument("quoi", choices=["produits", "mouvements"])
+    p.add_argument("fichier")
+    p.add_argument("--format", help="csv ou jsonl (selon l'extension)")
+    p.add_argument("--delimiteur")
+    p.add_argument("--taille-lot", type=_entier_positif, default=TAILLE_LOT_IMPORT)
+    p.set_defaults(fonction=importer)
+
+    # maintenance
+    p = commandes.add_parser("archiver", help="Archive les anciens mouvements")
+    p.add_argument("--mois", type=int, default=MOIS_CONSERVES)
+    p.set_defaults(fonction=archiver)
+    p = commandes.add_parser("instantane", help="Instantane du stock")
+    groupe = p.add_mutually_exclusive_group()
+    groupe.add_argument("--date", help="Journee terminee (hier par defaut)")
+    groupe.add_argument("--si-necessaire", action="store_true")
+    p.set_defaults(fonction=instantane)
+    p = commandes.add_parser("profilage", help="Resume du journal des requetes lentes")
+    p.add_argument("fichier", nargs="?")
+    p.set_defaults(fonction=profilage)
+    return parseur
+
+
+# ---------- Sortie ----------
+_sortie = sys.stdout
+
+
+def _ecrire(lignes: Iterable[dict]) -> int:
+    nombre = 0
+    for ligne in lignes:
+        _sortie.write(json.dumps(ligne, ensure_ascii=False, default=str) + "\n")
+        nombre += 1
+    _sortie.flush()
+    return nombre
+
+
+def main(arguments: list[str] | None = None) -> int:
+    args = creer_parseur().parse_args(arguments)
+    # Les print() de la couche base de donnees ne polluent pas le JSON
+    with redirect_stdout(sys.stderr):
+        try:
+            if args.base:
+                changer_base(args.base)
+            resultat = args.fonction(args)
+            if isinstance(resultat, dict):
+                resultat = [resultat]
+            _ecrire(resultat)
+            return 0
+        except (EchecCommande, ValueError) as e:
+            print(f"Erreur: {e}")
+            return 1
+        except sqlite3.Error as e:
+            # Levee aussi pendant l'ecriture, par les generateurs iterer_*
+            _sortie.flush()
+            print(f"Erreur de base de donnees: {e}")
+            return 1
+        except BrokenPipeError:
+            # Sortie fermee par le programme suivant (ex: | head) : evite une
+            # seconde erreur quand Python videra stdout a la sortie
+            os.dup2(os.open(os.devnull, os.O_WRONLY), _sortie.fileno())
+            return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,82 @@
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-DB_PATH = BASE_DIR / "inventaire.db"
+# Fichier de la base, remplacable par la variable d'environnement INVENTAIRE_DB
+# (benchmarks, base de test)
+DB_PATH = Path(os.environ.get("INVENTAIRE_DB", BASE_DIR / "inventaire.db"))
 COULEUR_PRINCIPALE = "#4CAF50"
+
+# Nombre maximal de connexions de lecture ouvertes simultanement
+TAILLE_POOL_LECTURE = 4
+# Delai maximal (secondes) d'attente d'une connexion libre dans le pool
+DELAI_ATTENTE_POOL = 30.0
+
+# Profil de performance applique a chaque connexion SQLite (PRAGMA)
+PROFIL_PERFORMANCE = {
+    "journal_mode": "WAL",  # lecteurs et ecrivain ne se bloquent plus
+    "synchronous": "NORMAL",  # en WAL, pas de fsync a chaque commit
+    "cache_size": -64000,  # valeur negative = taille en Kio (~64 Mo)
+    "mmap_size": 268435456,  # 256 Mo de lecture par memoire mappee
+    "temp_store": "MEMORY",  # tris et tables temporaires en memoire
+    "busy_timeout": 5000,  # attente (ms) si la base est verrouillee
+}
+
+# Nombre de lignes par page pour les requetes paginees
+TAILLE_PAGE = 200
+
+# Import en flux : lignes ecrites par transaction et erreurs gardees au rapport
+TAILLE_LOT_IMPORT = 5000
+MAX_ERREURS_RAPPORT = 1000
+
+# Export en colonnes : nombre de lignes par groupe compresse
+TAILLE_GROUPE_COLONNES = 50000
+
+# Frequence des instantanes de stock : "quotidien" ou "mensuel"
+INTERVALLE_INSTANTANES = "quotidien"
+
+# Archivage : mois de mouvements gardes dans la base principale, et dossier
+# des fichiers d'archive (un fichier SQLite par annee)
+MOIS_CONSERVES = 12
+DOSSIER_ARCHIVES = BASE_DIR / "archives"
+
+# Cache des lectures frequentes : nombre d'entrees et duree de vie (secondes)
+TAILLE_CACHE = 1024
+DUREE_CACHE = 60.0
+
+# Flux de changements : nombre de derniers changements gardes en memoire
+TAILLE_JOURNAL_CHANGEMENTS = 10000
+
+# Profilage des requetes SQL (duree, histogrammes, plan des requetes lentes),
+# inactif par defaut : active par la variable d'environnement
+# INVENTAIRE_PROFILAGE=1 (chaque instruction est alors chronometree)
+PROFILAGE_ACTIF = os.environ.get("INVENTAIRE_PROFILAGE", "0") == "1"
+# Duree (ms) a partir de laquelle une requete est journalisee avec son plan
+SEUIL_REQUETE_LENTE_MS = 100.0
+FICHIER_REQUETES_LENTES = BASE_DIR / "requetes_lentes.jsonl"
+# Valeurs des parametres SQL dans ce journal (donnees metier) : seulement si
+# INVENTAIRE_PROFILAGE_PARAMETRES=1
+PROFILAGE_PARAMETRES = os.environ.get("INVENTAIRE_PROFILAGE_PARAMETRES", "0") == "1"
+
+# API HTTP (api/serveur.py) : adresse d'ecoute, threads de traitement (une
+# connexion keep-alive occupe un thread), taille maximale d'un corps de requete
+# et nombre maximal de mouvements par envoi
+API_HOTE = "127.0.0.1"
+API_PORT = 8080
+API_THREADS = 16
+API_TAILLE_MAX_CORPS = 10 * 1024 * 1024
+API_MAX_MOUVEMENTS_LOT = 10000
+
+# Groupage des mouvements (soumettre_mouvement) : attente maximale (ms) apres
+# une premiere demande et nombre maximal de mouvements par transaction. Avec 0,
+# seules les demandes arrivees pendant l'ecriture precedente sont regroupees :
+# une attente ne profite qu'a des producteurs qui n'attendent pas leur resultat
+DELAI_GROUPAGE_MS = 0
+TAILLE_MAX_GROUPAGE = 500
+
+# Ecritures concurrentes (autres processus sur la meme base : API, CLI) :
+# tentatives d'une transaction refusee car la base est verrouillee, et delai
+# (ms) avant la deuxieme tentative, double a chaque nouvel essai
+TENTATIVES_ECRITURE = 5
+DELAI_NOUVELLE_TENTATIVE_MS = 20
@@ -0,0 +1,143 @@
+import sqlite3
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from config.parametres import DOSSIER_ARCHIVES, MOIS_CONSERVES
+from database.gestionnaire_bd import connexion_ecriture
+from database.requetes.archives import PREFIXE_ARCHIVE, attacher_archive
+from database.requetes.instantanes import prendre_instantane
+
+
+def date_limite_archivage(mois_conserves: int = MOIS_CONSERVES) -> str:
+    """
+    Retourne le premier jour du plus ancien mois conserve dans la base principale
+
+    Args:
+        mois_conserves (int): Nombre de mois gardes, mois en cours compris
+
+    Returns:
+        str: Date limite (format: YYYY-MM-DD), les mouvements anterieurs
+             sont archivables
+    """
+    if mois_conserves < 1:
+        raise ValueError("Au moins un mois doit etre conserve")
+    aujourd_hui = date.today()
+    mois = aujourd_hui.year * 12 + aujourd_hui.month - 1 - (mois_conserves - 1)
+    return date(mois // 12, mois % 12 + 1, 1).isoformat()
+
+
+def archiver_mouvements(
+    mois_conserves: int = MOIS_CONSERVES, dossier=DOSSIER_ARCHIVES
+) -> dict | None:
+    """
+    Deplace les mouvements anterieurs aux mois conserves vers des fichiers
+    d'archive SQLite (un par annee, mouvements_AAAA.db dans dossier)
+
+    Un instantane du stock est pris a la veille de la date limite : les calculs
+    de stock recents n'ont plus besoin de l'historique archive. Les requetes de
+    database.requetes.mouvements consultent les archives uniquement quand la
+    plage de dates demandee les recoupe.
+
+    Chaque annee est traitee dans sa propre transaction (copie puis suppression)
+    et peut etre rejouee sans doublon en cas d'interruption.
+
+    Args:
+        mois_conserves (int): Nombre de mois gardes dans la base principale
+        dossier: Dossier des fichiers d'archive
+
+    Returns:
+        dict: {date_limite, mouvements_archives, archives} ou None si erreur
+    """
+    date_limite = date_limite_archivage(mois_conserves)
+    veille = datetime.strptime(date_limite, "%Y-%m-%d") - timedelta(days=1)
+    if prendre_instantane(veille.strftime("%Y-%m-%d")) is None:
+        return None
+
+    resultat = {"date_limite": date_limite, "mouvements_archives": 0, "archives": []}
+    with connexion_ecriture() as connexion:
+        try:
+            cur = connexion.cursor()
+            cur.execute(
+                "SELECT MIN(date_mouvement) as premiere FROM main.mouvements_stock"
+            )
+            premiere = cur.fetchone()["premiere"]
+            if premiere is None or premiere >= date_limite:
+                return resultat
+
+            for annee in range(int(premiere[:4]), int(date_limite[:4]) + 1):
+                debut = f"{annee}-01-01"
+                fin = min(f"{annee + 1}-01-01", date_limite)
+                if debut >= fin:
+                    continue
+                nom = f"{PREFIXE_ARCHIVE}{annee}"
+                chemin = Path(dossier).resolve() / f"mouvements_{annee}.db"
+                nombre = _archiver_periode(connexion, nom, chemin, debut, fin)
+                if nombre:
+                    resultat["mouvements_archives"] += nombre
+                    resultat["archives"].append(nom)
+            return resultat
+
+        except sqlite3.Error as e:
+            print(f"Erreur lors de l'archivage des mouvements: {e}")
+            if connexion.in_transaction:
+                connexion.rollback()
+            return None
+
+
+def _archiver_periode(
+    connexion: sqlite3.Connection, nom: str, chemin: Path, debut: str, fin: str
+) -> int:
+    """Deplace les mouvements de [debut, fin) vers l'archive nom et les compte"""
+    cur = connexion.cursor()
+    cur.execute(
+        """
+        SELECT COUNT(*) as nombre FROM main.mouvements_stock
+        WHERE date_mouvement >= ? AND date_mouvement < ?
+    """,
+        (debut, fin),
+    )
+    if not cur.fetchone()["nombre"]:
+        return 0
+
+    attacher_archive(connexion, nom, chemin, creer=True)
+    try:
+        cur.execute("BEGIN TRANSACTION")
+        # Copie d'abord : une interruption laisse au pire un doublon ignore
+        cur.execute(
+            f"""
+            INSERT OR IGNORE INTO {nom}.mouvements_stock
+            SELECT * FROM main.mouvements_stock
+            WHERE date_mouvement >= ? AND date_mouvement < ?
+        """,
+            (debut, fin),
+        )
+        cur.execute(
+            """
+            DELETE FROM main.mouvements_stock
+            WHERE date_mouvement >= ? AND date_mouvement < ?
+        """,
+            (debut, fin),
+        )
+        nombre = cur.rowcount
+        cur.execute(
+            f"""
+            INSERT INTO archives_mouvements (nom, chemin, date_debut, date_fin,
+                                             nombre_mouvements, date_archivage)
+            SELECT ?, ?, MIN(date_mouvement), MAX(date_mouvement), COUNT(*), ?
+            FROM {nom}.mouvements_stock
+            WHERE true
+            ON CONFLICT(nom) DO UPDATE SET
+                chemin = excluded.chemin,
+                date_debut = excluded.date_debut,
+                date_fin = excluded.date_fin,
+                nombre_mouvements = excluded.nombre_mouvements,
+                date_archivage = excluded.date_archivage
+        """,
+            (nom, str(chemin), datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+        )
+        connexion.commit()
+    finally:
+        if connexion.in_transaction:
+            connexion.rollback()
+        connexion.execute(f"DETACH DATABASE {nom}")
+    return nombre
@@ -0,0 +1,163 @@
+import threading
+from collections import deque
+from collections.abc import Callable, Iterable
+from itertools import islice
+from typing import NamedTuple
+
+from config.parametres import TAILLE_JOURNAL_CHANGEMENTS
+
+# Entites publiees par les fonctions d'ecriture de database.requetes
+CATEGORIE = "categorie"
+PRODUIT = "produit"
+MOUVEMENT = "mouvement"
+
+# Operations
+CREATION = "creation"
+MODIFICATION = "modification"
+SUPPRESSION = "suppression"
+
+
+class Changement(NamedTuple):
+    """Un changement du flux : une ligne d'une entite creee, modifiee ou supprimee"""
+
+    version: int  # strictement croissante, unique pour chaque changement
+    entite: str
+    id: int
+    operation: str
+    champs: tuple | None = None  # champs modifies, None si inconnus ou tous
+
+
+_abonnes = []
+_version = 0
+# Derniers changements, pour les consommateurs qui relisent le flux plus tard
+_journal = deque(maxlen=TAILLE_JOURNAL_CHANGEMENTS)
+_verrou = threading.Lock()
+
+
+def abonner(fonction: Callable[[list[Changement]], None]) -> Callable[[], None]:
+    """
+    Abonne une fonction au flux de changements
+
+    La fonction est appelee avec la liste des changements d'une ecriture, dans
+    le thread qui a fait l'ecriture et juste apres le commit : elle doit etre
+    rapide et ne pas toucher aux widgets Tk (les vues utilisent plutot
+    SuiviChangements).
+
+    Returns:
+        Callable: Fonction de desabonnement
+    """
+    with _verrou:
+        _abonnes.append(fonction)
+    return lambda: desabonner(fonction)
+
+
+def desabonner(fonction):
+    with _verrou:
+        if fonction in _abonnes:
+            _abonnes.remove(fonction)
+
+
+def version_actuelle() -> int:
+    """Version du dernier changement publie (0 si aucun)"""
+    return _version
+
+
+def publier(
+    entite: str,
+    operation: str,
+    ids: Iterable[int],
+    champs: Iterable[str] | None = None,
+) -> int:
+    """
+    Publie les changements d'une ecriture validee (un par id)
+
+    Args:
+        entite (str): CATEGORIE, PRODUIT ou MOUVEMENT
+        operation (str): CREATION, MODIFICATION ou SUPPRESSION
+        ids (Iterable[int]): Identifiants concernes
+        champs (Iterable[str]): Champs modifies (MODIFICATION), None si inconnus
+
+    Returns:
+        int: Version du dernier changement publie
+    """
+    global _version
+    champs = tuple(champs) if champs is not None else None
+    with _verrou:
+        changements = []
+        for id_ligne in ids:
+            _version += 1
+            changements.append(
+                Changement(_version, entite, id_ligne, operation, champs)
+            )
+        _journal.extend(changements)
+        abonnes = list(_abonnes)
+        version = _version
+
+    if changements:
+        for fonction in abonnes:
+            try:
+                fonction(changements)
+            except Exception as e:
+                print(f"Erreur dans un abonne aux changements: {e}")
+    return version
+
+
+def reinitialiser_journal():
+    """
+    Signale des changements non publies (ecritures d'un autre processus) :
+    chaque SuiviChangements recevra None a son prochain recuperer() et
+    rechargera tout
+    """
+    global _version
+    with _verrou:
+        _version += 1
+        _journal.clear()
+
+
+def changements_depuis(version: int) -> list[Changement] | None:
+    """
+    Retourne les changements publies apres une version donnee
+
+    Args:
+        version (int): Derniere version deja traitee par l'appelant
+
+    Returns:
+        list: Changements de version > version, dans l'ordre ; None si certains
+              sont sortis du journal (l'appelant doit tout recharger)
+    """
+    with _verrou:
+        if version >= _version:
+            return []
+        if not _journal or _journal[0].version > version + 1:
+            return None
+        # Les versions du journal sont consecutives
+        debut = version + 1 - _journal[0].version
+        return list(islice(_journal, debut, None))
+
+
+class SuiviChangements:
+    """
+    Position d'un consommateur dans le flux de changements
+
+    Permet a une vue cachee de ne recharger que ce qui a change depuis son
+    dernier affichage.
+    """
+
+    def __init__(self, *entites: str):
+        self.entites = set(entites)
+        self.version = version_actuelle()
+
+    def recuperer(self) -> list[Changement] | None:
+        """
+        Returns:
+            list: Changements des entites suivies depuis le dernier appel ;
+                  None si le journal a deborde ou a ete reinitialise
+                  (tout recharger)
+        """
+        changements = changements_depuis(self.version)
+        if changements is None:
+            self.version = version_actuelle()
+            return None
+        if changements:
+            self.version = changements[-1].version
+        return [c for c in changements if c.entite in self.entites]
@@ -0,0 +1,187 @@
+import csv
+import json
+import zipfile
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+from config.parametres import TAILLE_GROUPE_COLONNES
+from database.requetes.mouvements import iterer_mouvements
+from database.requetes.produits import iterer_produits
+
+# Extensions reconnues pour le format colonnes compresse
+EXTENSIONS_COLONNES = ("zip", "colonnes")
+VERSION_FORMAT_COLONNES = 1
+
+
+def exporter_csv(lignes: Iterable[dict], chemin) -> int:
+    """
+    Ecrit des lignes dans un fichier CSV au fil de l'eau
+    Les colonnes sont celles de la premiere ligne.
+
+    Args:
+        lignes (Iterable[dict]): Lignes a ecrire
+        chemin: Fichier de destination
+
+    Returns:
+        int: Nombre de lignes ecrites
+    """
+    nombre = 0
+    with open(chemin, "w", newline="", encoding="utf-8") as fichier:
+        ecrivain = None
+        for ligne in lignes:
+            if ecrivain is None:
+                ecrivain = csv.DictWriter(fichier, fieldnames=list(ligne))
+                ecrivain.writeheader()
+            ecrivain.writerow(ligne)
+            nombre += 1
+    return nombre
+
+
+def exporter_jsonl(lignes: Iterable[dict], chemin) -> int:
+    """
+    Ecrit des lignes dans un fichier JSON Lines (un objet par ligne)
+
+    Args:
+        lignes (Iterable[dict]): Lignes a ecrire
+        chemin: Fichier de destination
+
+    Returns:
+        int: Nombre de lignes ecrites
+    """
+    nombre = 0
+    with open(chemin, "w", encoding="utf-8") as fichier:
+        for ligne in lignes:
+            fichier.write(json.dumps(ligne, ensure_ascii=False) + "\n")
+            nombre += 1
+    return nombre
+
+
+def exporter_colonnes(
+    lignes: Iterable[dict], chemin, taille_groupe: int = TAILLE_GROUPE_COLONNES
+) -> int:
+    """
+    Ecrit des lignes dans un fichier en colonnes compresse (facon Parquet)
+
+    Le fichier est une archive ZIP (DEFLATE) contenant, pour chaque groupe de
+    taille_groupe lignes, un membre JSON par colonne (groupe_00000/nom.json,
+    tableau des valeurs), plus un schema.json decrivant les colonnes et les
+    groupes. Un lecteur peut ainsi ne decompresser que les colonnes utiles ;
+    la memoire utilisee est bornee par la taille d'un groupe.
+
+    Args:
+        lignes (Iterable[dict]): Lignes a ecrire
+        chemin: Fichier de destination
+        taille_groupe (int): Nombre de lignes par groupe
+
+    Returns:
+        int: Nombre de lignes ecrites
+    """
+    colonnes = None
+    groupes = []
+    valeurs = {}
+
+    def ecrire_groupe(archive):
+        numero = len(groupes)
+        for colonne in colonnes:
+            archive.writestr(
+                f"groupe_{numero:05d}/{colonne}.json",
+                json.dumps(valeurs[colonne], ensure_ascii=False),
+            )
+            valeurs[colonne] = []
+        groupes.append(taille)
+
+    nombre = 0
+    taille = 0
+    with zipfile.ZipFile(chemin, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for ligne in lignes:
+            if colonnes is None:
+                colonnes = list(ligne)
+                valeurs = {colonne: [] for colonne in colonnes}
+            for colonne in colonnes:
+                valeurs[colonne].append(ligne.get(colonne))
+            taille += 1
+            nombre += 1
+            if taille == taille_groupe:
+                ecrire_groupe(archive)
+                taille = 0
+        if taille:
+            ecrire_groupe(archive)
+
+        schema = {
+            "version": VERSION_FORMAT_COLONNES,
+            "colonnes": colonnes or [],
+            "groupes": groupes,
+            "lignes": nombre,
+        }
+        archive.writestr("schema.json", json.dumps(schema))
+    return nombre
+
+
+def lire_colonnes(chemin, colonnes: list[str] | None = None) -> Iterator[dict]:
+    """
+    Relit un fichier ecrit par exporter_colonnes(), groupe par groupe
+
+    Args:
+        chemin: Fichier en colonnes
+        colonnes (list): Colonnes a lire (toutes si None)
+
+    Yields:
+        dict: {colonne: liste des valeurs} pour chaque groupe
+    """
+    with zipfile.ZipFile(chemin) as archive:
+        schema = json.loads(archive.read("schema.json"))
+        colonnes = colonnes or schema["colonnes"]
+        for numero in range(len(schema["groupes"])):
+            yield {
+                colonne: json.loads(archive.read(f"groupe_{numero:05d}/{colonne}.json"))
+                for colonne in colonnes
+            }
+
+
+def exporter(lignes: Iterable[dict], chemin, format_fichier: str | None = None) -> int:
+    """
+    Exporte des lignes au format choisi ('csv', 'jsonl' ou 'colonnes'),
+    deduit de l'extension du fichier si non precise
+
+    Args:
+        lignes (Iterable[dict]): Lignes a ecrire
+        chemin: Fichier de destination
+        format_fichier (str): 'csv', 'jsonl', 'colonnes' ou None
+
+    Returns:
+        int: Nombre de lignes ecrites
+    """
+    format_fichier = (format_fichier or Path(chemin).suffix.lstrip(".")).lower()
+    if format_fichier == "csv":
+        return exporter_csv(lignes, chemin)
+    if format_fichier in ("jsonl", "ndjson"):
+        return exporter_jsonl(lignes, chemin)
+    if format_fichier in EXTENSIONS_COLONNES:
+        return exporter_colonnes(lignes, chemin)
+    raise ValueError(f"Format d'export non supporte: {format_fichier}")
+
+
+def exporter_produits(chemin, format_fichier: str | None = None) -> int:
+    """Exporte tous les produits (voir exporter())"""
+    return exporter(iterer_produits(), chemin, format_fichier)
+
+
+def exporter_produits_stock_faible(chemin, format_fichier: str | None = None) -> int:
+    """Exporte le rapport des produits sous leur stock minimum (voir exporter())"""
+    return exporter(iterer_produits(stock_faible=True), chemin, format_fichier)
+
+
+def exporter_mouvements(chemin, format_fichier: str | None = None, **filtres) -> int:
+    """
+    Exporte les mouvements (voir exporter())
+
+    Args:
+        chemin: Fichier de destination
+        format_fichier (str): 'csv', 'jsonl', 'colonnes' ou None
+        **filtres: produit_id, type_mouvement, date_debut, date_fin
+                   (voir iterer_mouvements)
+
+    Returns:
+        int: Nombre de lignes ecrites
+    """
+    return exporter(iterer_mouvements(**filtres), chemin, format_fichier)
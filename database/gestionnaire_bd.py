@@ -1,32 +1,114 @@
+import queue
+import random
 import sqlite3
+import threading
+import time
+from collections.abc import Callable
+from contextlib import contextmanager
 from pathlib import Path
 
 from config.parametres import DB_PATH  # importer le chemin défini
-from database.schema import TOUTES_LES_TABLES
+from config.parametres import (
+    DELAI_ATTENTE_POOL,
+    DELAI_NOUVELLE_TENTATIVE_MS,
+    PROFIL_PERFORMANCE,
+    TAILLE_POOL_LECTURE,
+    TENTATIVES_ECRITURE,
+)
+from database.profilage import ConnexionProfilee, profileur
+from database.schema import MIGRATIONS, TOUTES_LES_TABLES
 
 
 class GestionnaireBD:
-    """Classe pour gerer la connexion a la bd"""
+    """
+    Classe pour gerer les connexions a la bd
+
+    Une connexion unique sert aux ecritures (serialisees par un verrou) et un
+    pool de connexions de lecture permet aux threads de lire en parallele.
+    """
 
-    def __init__(self, db_path=DB_PATH):
+    def __init__(
+        self,
+        db_path=DB_PATH,
+        taille_pool: int = TAILLE_POOL_LECTURE,
+        profil: dict | None = None,
+        profilage: bool | None = None,
+    ):
         self.db_path = db_path
         Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
         self.connexion = None
+        self.taille_pool = max(1, taille_pool)
+        self.profil = PROFIL_PERFORMANCE if profil is None else profil
+        # Connexions instrumentees (database.profilage), selon PROFILAGE_ACTIF
+        self.profilage = profileur.actif if profilage is None else profilage
+
+        self._verrou_ecriture = threading.RLock()
+        self._profondeur_ecriture = 0
+        self._verrou_pool = threading.Lock()
+        self._pool_lecture = queue.LifoQueue()
+        self._connexions_lecture = []
+        self._local = threading.local()
+
+    def _ouvrir_connexion(self) -> sqlite3.Connection:
+        """
+        Ouvre une nouvelle connexion configuree (Row, foreign keys, profil)
+
+        Returns:
+            sqlite3.Connection: Objet de connexion
+        """
+        connexion = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            factory=ConnexionProfilee if self.profilage else sqlite3.Connection,
+        )
+        connexion.row_factory = sqlite3.Row  # permet l'acces au colonnes par nom
+        # active les contraintes des foreign keys
+        connexion.execute("PRAGMA foreign_keys = ON")
+        self._appliquer_profil(connexion)
+        return connexion
+
+    def _appliquer_profil(self, connexion: sqlite3.Connection):
+        """Applique les PRAGMA du profil de performance a une connexion"""
+        for pragma, valeur in self.profil.items():
+            connexion.execute(f"PRAGMA {pragma} = {valeur}").fetchall()
+
+    def rapport_pragmas(self) -> dict:
+        """
+        Lit la valeur effective des PRAGMA du profil sur la connexion d'ecriture
+
+        Returns:
+            dict: {pragma: valeur} tel que rapporte par SQLite
+        """
+        connexion = self.obtenir_connexion()
+        rapport = {}
+        with self._verrou_ecriture:
+            for pragma in self.profil:
+                ligne = connexion.execute(f"PRAGMA {pragma}").fetchone()
+                rapport[pragma] = ligne[0] if ligne else None
+        return rapport
+
+    def version_donnees(self) -> int:
+        """
+        PRAGMA data_version de la connexion d'ecriture : change a chaque
+        ecriture validee par une autre connexion (un autre processus : API,
+        CLI), mais pas apres les ecritures de ce gestionnaire
+
+        Returns:
+            int: Valeur a comparer a une lecture precedente
+        """
+        connexion = self.obtenir_connexion()
+        with self._verrou_ecriture:
+            return connexion.execute("PRAGMA data_version").fetchone()[0]
 
     def connecter(self) -> sqlite3.Connection:
         """
-        Etablit la connextion a la bd
+        Etablit la connextion d'ecriture a la bd
 
         Returns:
             sqlite3.COnnection: Objet de connection
         """
         try:
-            self.connexion = sqlite3.connect(self.db_path)
-            self.connexion.row_factory = (
-                sqlite3.Row
-            )  # permet l'acces au colonnes par nom
-            # active les contraintes des foreign keys
-            self.connexion.execute("PRAGMA foreign_keys = ON")
+            self.connexion = self._ouvrir_connexion()
             print(f"Connextion etablie a {self.db_path}")
             return self.connexion
         except sqlite3.Error as e:
@@ -35,41 +117,227 @@ class GestionnaireBD:
 
     def initialiser_tables(self):
         """
-        Cree toutes le tables si elles n'existent pas
+        Cree toutes le tables si elles n'existent pas puis applique les
+        migrations en attente
         Doit etre appele apres connecter()
         """
         if not self.connexion:
             raise Exception("pas de connexion active. Appeler connecter() dabord")
 
-        try:
+        with self._verrou_ecriture:
+            try:
+                cur = self.connexion.cursor()
+
+                for requete_table in TOUTES_LES_TABLES.values():
+                    cur.execute(requete_table)
+
+                self.connexion.commit()
+                print("toutes les tables ont ete crees avec succes")
+
+            except sqlite3.Error as e:
+                print(f"Erreur lors de la creation des tables: {e}")
+                self.connexion.rollback()
+                raise
+
+            self.appliquer_migrations()
+
+    def version_schema(self) -> int:
+        """Retourne la version du schema (PRAGMA user_version)"""
+        return self.obtenir_connexion().execute("PRAGMA user_version").fetchone()[0]
+
+    def appliquer_migrations(self) -> int:
+        """
+        Applique dans l'ordre les migrations dont la version depasse user_version
+        Chaque migration est executee dans sa propre transaction.
+
+        Returns:
+            int: Version du schema apres migration
+        """
+        with self._verrou_ecriture:
+            version = self.version_schema()
             cur = self.connexion.cursor()
 
-            for requete_table in TOUTES_LES_TABLES.values():
-                cur.execute(requete_table)
+            for numero, description, requetes in MIGRATIONS:
+                if numero <= version:
+                    continue
+                try:
+                    cur.execute("BEGIN")
+                    for requete in requetes:
+                        cur.execute(requete)
+                    cur.execute(f"PRAGMA user_version = {int(numero)}")
+                    self.connexion.commit()
+                    version = numero
+                    print(f"Migration {numero} appliquee: {description}")
+                except sqlite3.Error as e:
+                    print(f"Erreur lors de la migration {numero}: {e}")
+                    self.connexion.rollback()
+                    raise
 
-            self.connexion.commit()
-            print("toutes les tables ont ete crees avec succes")
+            return version
 
-        except sqlite3.Error as e:
-            print(f"Erreur lors de la creation des tables: {e}")
-            self.connexion.rollback()
-            raise
+    @contextmanager
+    def lecture(self):
+        """
+        Emprunte une connexion de lecture pour le thread courant
+
+        La connexion reste attachee au thread jusqu'a la sortie du bloc : les
+        appels imbriques d'un meme thread reutilisent la meme connexion.
+
+        Yields:
+            sqlite3.Connection: Connexion de lecture
+        """
+        if not self.connexion:
+            raise RuntimeError("Pas de connexion active a la base de donnees")
+
+        connexion = getattr(self._local, "lecture", None)
+        if connexion is not None:
+            self._local.profondeur += 1
+            try:
+                yield connexion
+            finally:
+                self._local.profondeur -= 1
+            return
+
+        connexion = self._emprunter_lecture()
+        self._local.lecture = connexion
+        self._local.profondeur = 1
+        try:
+            yield connexion
+        finally:
+            self._local.lecture = None
+            self._local.profondeur = 0
+            _terminer_mesures(connexion)
+            if connexion.in_transaction:
+                connexion.rollback()
+            self._pool_lecture.put(connexion)
+
+    def _emprunter_lecture(self) -> sqlite3.Connection:
+        """Retourne une connexion libre du pool, en ouvre une si possible"""
+        try:
+            return self._pool_lecture.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._verrou_pool:
+            if len(self._connexions_lecture) < self.taille_pool:
+                connexion = self._ouvrir_connexion()
+                self._connexions_lecture.append(connexion)
+                return connexion
+
+        try:
+            return self._pool_lecture.get(timeout=DELAI_ATTENTE_POOL)
+        except queue.Empty:
+            raise RuntimeError("Aucune connexion de lecture disponible") from None
+
+    @contextmanager
+    def ecriture(self):
+        """
+        Donne un acces exclusif a la connexion d'ecriture
+
+        Les ecritures de tous les threads sont serialisees par un verrou ; une
+        transaction laissee ouverte (exception, ou erreur d'integrite sans
+        rollback) est annulee a la sortie du bloc le plus externe.
+
+        Yields:
+            sqlite3.Connection: Connexion d'ecriture
+        """
+        if not self.connexion:
+            raise RuntimeError("Pas de connexion active a la base de donnees")
+
+        with self._verrou_ecriture:
+            self._profondeur_ecriture += 1
+            try:
+                yield self.connexion
+            finally:
+                self._profondeur_ecriture -= 1
+                if not self._profondeur_ecriture:
+                    _terminer_mesures(self.connexion)
+                    if self.connexion.in_transaction:
+                        self.connexion.rollback()
 
     def fermer(self):
-        """Ferme la connexion a la bd"""
+        """Ferme toutes les connexions a la bd"""
+        with self._verrou_pool:
+            for connexion in self._connexions_lecture:
+                connexion.close()
+            self._connexions_lecture = []
+            self._pool_lecture = queue.LifoQueue()
+
         if self.connexion:
-            self.connexion.close()
+            with self._verrou_ecriture:
+                self.connexion.close()
+                self.connexion = None
             print("Connexion fermee")
 
     def obtenir_connexion(self) -> sqlite3.Connection:
-        """Retourne la connexin active"""
+        """Retourne la connexin d'ecriture active"""
         if not self.connexion:
             raise RuntimeError("Pas de connexion active a la base de donnees")
         return self.connexion
 
 
+def base_verrouillee(erreur: sqlite3.Error) -> bool:
+    """Indique si l'erreur vient d'un verrou tenu par une autre connexion"""
+    code = getattr(erreur, "sqlite_errorcode", None)
+    if code is not None:
+        # SQLITE_BUSY (5) et SQLITE_LOCKED (6), codes etendus compris
+        return code & 0xFF in (5, 6)
+    return isinstance(erreur, sqlite3.OperationalError) and (
+        "locked" in str(erreur) or "busy" in str(erreur)
+    )
+
+
+def executer_transaction(
+    connexion: sqlite3.Connection,
+    fonction: Callable[[sqlite3.Cursor], object],
+    tentatives: int = TENTATIVES_ECRITURE,
+):
+    """
+    Execute fonction(curseur) dans une transaction validee a la fin
+
+    La transaction commence par BEGIN IMMEDIATE : le verrou d'ecriture est pris
+    avant toute lecture, les valeurs lues par fonction (stock, version) ne
+    peuvent donc pas changer avant le commit. Si un autre processus tient la
+    base au-dela du busy_timeout, la transaction est annulee et recommencee.
+
+    Args:
+        connexion (sqlite3.Connection): Connexion d'ecriture (hors transaction)
+        fonction (Callable): Corps de la transaction, peut etre rappele
+        tentatives (int): Nombre maximal d'essais
+
+    Returns:
+        Valeur retournee par fonction
+
+    Raises:
+        sqlite3.Error: Erreur de fonction ou du commit (transaction annulee),
+                       ou base encore verrouillee a la derniere tentative
+    """
+    for tentative in range(1, tentatives + 1):
+        try:
+            cur = connexion.cursor()
+            cur.execute("BEGIN IMMEDIATE")
+            resultat = fonction(cur)
+            connexion.commit()
+            return resultat
+        except sqlite3.Error as e:
+            if connexion.in_transaction:
+                connexion.rollback()
+            if tentative == tentatives or not base_verrouillee(e):
+                raise
+        # Attente croissante et aleatoire : les processus en conflit se decalent
+        delai = DELAI_NOUVELLE_TENTATIVE_MS / 1000 * 2 ** (tentative - 1)
+        time.sleep(delai * random.uniform(0.5, 1.5))
+
+
+def _terminer_mesures(connexion: sqlite3.Connection):
+    """Enregistre les mesures en cours d'une connexion profilee rendue"""
+    if isinstance(connexion, ConnexionProfilee):
+        connexion.terminer_mesures()
+
+
 # Instance globale du gestionnaire (singleton pattern)
 _gestionnaire = None
+_verrou_gestionnaire = threading.Lock()
 
 
 def obtenir_gestionnaire() -> GestionnaireBD:
@@ -81,17 +349,64 @@ def obtenir_gestionnaire() -> GestionnaireBD:
     """
     global _gestionnaire
     if _gestionnaire is None:
-        _gestionnaire = GestionnaireBD()
-        _gestionnaire.connecter()
-        _gestionnaire.initialiser_tables()
+        with _verrou_gestionnaire:
+            if _gestionnaire is None:
+                gestionnaire = GestionnaireBD()
+                gestionnaire.connecter()
+                gestionnaire.initialiser_tables()
+                _gestionnaire = gestionnaire
+    return _gestionnaire
+
+
+def changer_base(db_path) -> GestionnaireBD:
+    """
+    Remplace le gestionnaire global par un gestionnaire sur une autre base
+    (creee et migree si besoin) ; les connexions de l'ancien sont fermees.
+    Les caches de database.requetes sont a vider par l'appelant.
+
+    Args:
+        db_path: Chemin du fichier de la nouvelle base
+
+    Returns:
+        GestionnaireBD: Nouveau gestionnaire global
+    """
+    global _gestionnaire
+    with _verrou_gestionnaire:
+        if _gestionnaire is not None:
+            _gestionnaire.fermer()
+        gestionnaire = GestionnaireBD(db_path)
+        gestionnaire.connecter()
+        gestionnaire.initialiser_tables()
+        _gestionnaire = gestionnaire
     return _gestionnaire
 
 
 def obtenir_connexion() -> sqlite3.Connection:
     """
-    Fonction pour obtenir rapidement la connexion
+    Fonction pour obtenir rapidement la connexion d'ecriture
+    Note: sans verrou, a reserver au thread principal
 
     Returns:
         sqlite3.Connection: Connexion active
     """
     return obtenir_gestionnaire().obtenir_connexion()
+
+
+def connexion_lecture():
+    """
+    Raccourci vers GestionnaireBD.lecture()
+
+    Returns:
+        Gestionnaire de contexte fournissant une connexion de lecture
+    """
+    return obtenir_gestionnaire().lecture()
+
+
+def connexion_ecriture():
+    """
+    Raccourci vers GestionnaireBD.ecriture()
+
+    Returns:
+        Gestionnaire de contexte fournissant la connexion d'ecriture
+    """
+    return obtenir_gestionnaire().ecriture()
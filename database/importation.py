@@ -0,0 +1,292 @@
+import csv
+import json
+import time
+from collections.abc import Callable, Iterable, Iterator
+from itertools import islice
+from pathlib import Path
+from typing import NamedTuple
+
+from config.parametres import MAX_ERREURS_RAPPORT, TAILLE_LOT_IMPORT
+from database.requetes.categories import creer_categorie, obtenir_toutes_categories
+from database.requetes.mouvements import creer_mouvements_lot
+from database.requetes.produits import creer_produits_lot, obtenir_ids_par_code_barre
+
+
+class LigneInvalide(NamedTuple):
+    """Ligne illisible d'un fichier, signalee dans le rapport d'import"""
+
+    erreur: str
+
+
+def lire_csv(chemin, delimiteur: str = ",") -> Iterator[dict]:
+    """
+    Lit un fichier CSV ligne par ligne (memoire constante)
+
+    Args:
+        chemin: Chemin du fichier, premiere ligne = noms des colonnes
+        delimiteur (str): Separateur de colonnes
+
+    Yields:
+        dict: Une ligne {colonne: valeur}
+    """
+    with open(chemin, newline="", encoding="utf-8-sig") as fichier:
+        yield from csv.DictReader(fichier, delimiter=delimiteur)
+
+
+def lire_jsonl(chemin) -> Iterator[dict]:
+    """
+    Lit un fichier JSON Lines (un objet JSON par ligne) ligne par ligne
+
+    Args:
+        chemin: Chemin du fichier
+
+    Yields:
+        Un objet par ligne non vide, LigneInvalide si la ligne n'est pas du JSON
+    """
+    with open(chemin, encoding="utf-8") as fichier:
+        for ligne in fichier:
+            if ligne.strip():
+                try:
+                    yield json.loads(ligne)
+                except json.JSONDecodeError as e:
+                    yield LigneInvalide(f"JSON invalide: {e}")
+
+
+def _entiers_csv(lignes: Iterable[dict], champs: tuple) -> Iterator[dict]:
+    """
+    Convertit en int les colonnes entieres d'un CSV (ou tout est texte) ;
+    une valeur non entiere reste telle quelle et sera refusee a la validation
+    """
+    for ligne in lignes:
+        for champ in champs:
+            valeur = (ligne.get(champ) or "").strip()
+            if valeur.lstrip("-").isdecimal():
+                ligne[champ] = int(valeur)
+        yield ligne
+
+
+def lire_fichier(
+    chemin, format_fichier: str | None = None, entiers: tuple = (), **options
+) -> Iterator[dict]:
+    """
+    Choisit le lecteur selon le format ('csv' ou 'jsonl'), deduit de
+    l'extension si non precise
+
+    Args:
+        chemin: Chemin du fichier
+        format_fichier (str): 'csv', 'jsonl' ou None
+        entiers (tuple): Colonnes CSV a convertir en int (deja typees en JSONL)
+        **options: Options du lecteur (ex: delimiteur pour le CSV)
+
+    Yields:
+        dict: Lignes du fichier (LigneInvalide pour une ligne JSONL illisible)
+    """
+    format_fichier = (format_fichier or Path(chemin).suffix.lstrip(".")).lower()
+    if format_fichier == "csv":
+        return _entiers_csv(lire_csv(chemin, **options), entiers)
+    if format_fichier in ("jsonl", "ndjson"):
+        return lire_jsonl(chemin)
+    raise ValueError(f"Format d'import non supporte: {format_fichier}")
+
+
+def _par_lots(lignes: Iterable[dict], taille: int) -> Iterator[list[dict]]:
+    iterateur = iter(lignes)
+    while lot := list(islice(iterateur, taille)):
+        yield lot
+
+
+class _Rapport:
+    """Compteurs d'un import, avec un nombre borne d'erreurs conservees"""
+
+    def __init__(self):
+        self.debut = time.perf_counter()
+        self.lignes = 0
+        self.importees = 0
+        self.nombre_erreurs = 0
+        self.erreurs = []
+
+    def ajouter_lot(self, taille: int, inseres: int, erreurs: list[dict]):
+        premiere_ligne = self.lignes + 1
+        self.lignes += taille
+        self.importees += inseres
+        self.nombre_erreurs += len(erreurs)
+        for erreur in erreurs:
+            if len(self.erreurs) >= MAX_ERREURS_RAPPORT:
+                break
+            self.erreurs.append(
+                {"ligne": premiere_ligne + erreur["index"], "erreur": erreur["erreur"]}
+            )
+
+    def en_dict(self) -> dict:
+        duree = time.perf_counter() - self.debut
+        return {
+            "lignes": self.lignes,
+            "importees": self.importees,
+            "nombre_erreurs": self.nombre_erreurs,
+            "erreurs": list(self.erreurs),
+            "duree": round(duree, 3),
+            "lignes_par_seconde": round(self.lignes / duree, 1) if duree else 0.0,
+        }
+
+
+def _fusionner_erreurs(refus: list[dict], resultat: dict, indices: list[int]) -> dict:
+    """
+    Resultat d'un lot dont seules certaines lignes ont ete ecrites
+
+    Args:
+        refus (list): Erreurs {index, erreur} des lignes ecartees avant l'ecriture
+        resultat (dict): Resultat de l'ecriture des autres lignes
+        indices (list): Position dans le lot de chaque ligne ecrite
+
+    Returns:
+        dict: resultat dont les erreurs portent les positions dans le lot
+    """
+    erreurs = refus + [
+        {"index": indices[erreur["index"]], "erreur": erreur["erreur"]}
+        for erreur in resultat["erreurs"]
+    ]
+    erreurs.sort(key=lambda erreur: erreur["index"])
+    return {**resultat, "erreurs": erreurs}
+
+
+def _importer(
+    lignes: Iterable,
+    ecrire_lot: Callable[[list[dict]], dict],
+    taille_lot: int,
+    progression: Callable[[dict], None] | None,
+) -> dict:
+    rapport = _Rapport()
+    for lot in _par_lots(lignes, taille_lot):
+        # Lignes illisibles ou qui ne sont pas des objets : signalees, le lot
+        # continue sans elles
+        objets = []
+        indices = []
+        refus = []
+        for index, ligne in enumerate(lot):
+            if isinstance(ligne, dict):
+                objets.append(ligne)
+                indices.append(index)
+            elif isinstance(ligne, LigneInvalide):
+                refus.append({"index": index, "erreur": ligne.erreur})
+            else:
+                refus.append({"index": index, "erreur": "la ligne doit etre un objet"})
+        resultat = {"inseres": 0, "erreurs": []}
+        if objets:
+            resultat = ecrire_lot(objets)
+        resultat = _fusionner_erreurs(refus, resultat, indices)
+        rapport.ajouter_lot(len(lot), resultat["inseres"], resultat["erreurs"])
+        if progression:
+            progression(rapport.en_dict())
+    return rapport.en_dict()
+
+
+def importer_produits(
+    chemin,
+    format_fichier: str | None = None,
+    taille_lot: int = TAILLE_LOT_IMPORT,
+    progression: Callable[[dict], None] | None = None,
+    **options,
+) -> dict:
+    """
+    Importe des produits depuis un fichier CSV ou JSONL, par lots transactionnels
+    Colonnes reconnues: celles de creer_produit, plus 'categorie' (nom de la
+    categorie, creee si elle n'existe pas) a la place de categorie_id.
+
+    Args:
+        chemin: Chemin du fichier
+        format_fichier (str): 'csv' ou 'jsonl' (deduit de l'extension si None)
+        taille_lot (int): Nombre de lignes ecrites par transaction
+        progression: Appelee apres chaque lot avec le rapport intermediaire
+        **options: Options du lecteur (ex: delimiteur=';')
+
+    Returns:
+        dict: {lignes, importees, nombre_erreurs, erreurs, duree,
+               lignes_par_seconde} ; erreurs = [{ligne, erreur}] (bornee)
+    """
+    categories = {c["nom"]: c["categorie_id"] for c in obtenir_toutes_categories()}
+
+    def resoudre_categories(lot: list[dict]) -> dict:
+        produits = []
+        indices = []  # position dans le lot de chaque produit envoye
+        refus = []
+        for index, produit in enumerate(lot):
+            nom_categorie = produit.pop("categorie", None) or ""
+            if not isinstance(nom_categorie, str):
+                refus.append(
+                    {"index": index, "erreur": "categorie doit etre une chaine"}
+                )
+                continue
+            nom_categorie = nom_categorie.strip()
+            if nom_categorie and not produit.get("categorie_id"):
+                if nom_categorie not in categories:
+                    # None si la creation a echoue : lignes refusees
+                    categories[nom_categorie] = creer_categorie(nom_categorie)
+                if categories[nom_categorie] is None:
+                    refus.append(
+                        {
+                            "index": index,
+                            "erreur": f"categorie '{nom_categorie}' non creee",
+                        }
+                    )
+                    continue
+                produit["categorie_id"] = categories[nom_categorie]
+            produits.append(produit)
+            indices.append(index)
+
+        return _fusionner_erreurs(refus, creer_produits_lot(produits), indices)
+
+    lignes = lire_fichier(chemin, format_fichier, **options)
+    return _importer(lignes, resoudre_categories, taille_lot, progression)
+
+
+def importer_mouvements(
+    chemin,
+    format_fichier: str | None = None,
+    taille_lot: int = TAILLE_LOT_IMPORT,
+    progression: Callable[[dict], None] | None = None,
+    **options,
+) -> dict:
+    """
+    Importe des mouvements depuis un fichier CSV ou JSONL, par lots transactionnels
+    Colonnes reconnues: celles de creer_mouvements_lot ; le produit peut etre
+    designe par produit_id ou par code_barre.
+
+    Args:
+        chemin: Chemin du fichier
+        format_fichier (str): 'csv' ou 'jsonl' (deduit de l'extension si None)
+        taille_lot (int): Nombre de lignes ecrites par transaction
+        progression: Appelee apres chaque lot avec le rapport intermediaire
+        **options: Options du lecteur (ex: delimiteur=';')
+
+    Returns:
+        dict: {lignes, importees, nombre_erreurs, erreurs, duree,
+               lignes_par_seconde} ; erreurs = [{ligne, erreur}] (bornee)
+    """
+
+    def resoudre_produits(lot: list[dict]) -> dict:
+        mouvements = []
+        indices = []  # position dans le lot de chaque mouvement envoye
+        refus = []
+        for index, mouvement in enumerate(lot):
+            code = mouvement.get("code_barre")
+            if code is not None and not isinstance(code, str):
+                refus.append(
+                    {"index": index, "erreur": "code_barre doit etre une chaine"}
+                )
+                continue
+            mouvements.append(mouvement)
+            indices.append(index)
+
+        codes = {m["code_barre"] for m in mouvements if m.get("code_barre")}
+        ids_par_code = obtenir_ids_par_code_barre(codes) if codes else {}
+        for mouvement in mouvements:
+            code = mouvement.get("code_barre")
+            if code and not mouvement.get("produit_id"):
+                # 0 n'est jamais un produit_id : signale "produit inexistant"
+                mouvement["produit_id"] = ids_par_code.get(code, 0)
+        return _fusionner_erreurs(refus, creer_mouvements_lot(mouvements), indices)
+
+    lignes = lire_fichier(
+        chemin, format_fichier, ("produit_id", "quantite"), **options
+    )
+    return _importer(lignes, resoudre_produits, taille_lot, progression)
@@ -0,0 +1,71 @@
+import base64
+import json
+
+
+def encoder_curseur(*valeurs) -> str:
+    """
+    Encode la cle de la derniere ligne d'une page en jeton opaque
+
+    Args:
+        *valeurs: Valeurs de la cle de tri (ex: date_mouvement, mouvement_id)
+
+    Returns:
+        str: Jeton de continuation a repasser pour obtenir la page suivante
+    """
+    brut = json.dumps(list(valeurs), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(brut).decode("ascii")
+
+
+def decoder_curseur(curseur: str, nombre_valeurs: int) -> list:
+    """
+    Decode un jeton produit par encoder_curseur()
+
+    Args:
+        curseur (str): Jeton de continuation
+        nombre_valeurs (int): Nombre de valeurs attendues dans la cle
+
+    Returns:
+        list: Valeurs de la cle de tri
+
+    Raises:
+        ValueError: Si le jeton est invalide
+    """
+    try:
+        valeurs = json.loads(base64.urlsafe_b64decode(curseur.encode("ascii")))
+    except (ValueError, UnicodeError, AttributeError):
+        raise ValueError("Curseur de pagination invalide") from None
+    if not isinstance(valeurs, list) or len(valeurs) != nombre_valeurs:
+        raise ValueError("Curseur de pagination invalide")
+    return valeurs
+
+
+def verifier_limite(limite: int, nom: str = "limite"):
+    """
+    Verifie une taille de page ou de lot recue d'un appelant
+
+    Raises:
+        ValueError: Si la limite n'est pas un entier superieur ou egal a 1
+    """
+    if isinstance(limite, bool) or not isinstance(limite, int) or limite < 1:
+        raise ValueError(f"{nom} doit etre un entier superieur ou egal a 1")
+
+
+def paginer(
+    lignes: list[dict], limite: int, *cles: str
+) -> tuple[list[dict], str | None]:
+    """
+    Coupe le resultat d'une requete executee avec LIMIT limite + 1
+
+    Args:
+        lignes (list): Lignes retournees par la requete (au plus limite + 1)
+        limite (int): Taille de la page demandee
+        *cles (str): Colonnes formant la cle de tri de la pagination
+
+    Returns:
+        tuple: (lignes de la page, curseur de la page suivante ou None)
+    """
+    if len(lignes) <= limite:
+        return lignes, None
+    lignes = lignes[:limite]
+    dernier = lignes[-1]
+    return lignes, encoder_curseur(*(dernier[cle] for cle in cles))
@@ -0,0 +1,422 @@
+"""
+Profilage des requetes SQL
+
+Les connexions ouvertes par GestionnaireBD avec le profilage actif sont des
+ConnexionProfilee : chaque instruction est chronometree (execution et lecture
+des lignes), agregee par SQL normalise (constantes remplacees par ?) et, au-dela
+de SEUIL_REQUETE_LENTE_MS, journalisee avec son EXPLAIN QUERY PLAN.
+
+Resume du journal des requetes lentes :
+
+    python -m database.profilage [fichier]
+"""
+
+import json
+import re
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+
+from config.parametres import (
+    FICHIER_REQUETES_LENTES,
+    PROFILAGE_ACTIF,
+    PROFILAGE_PARAMETRES,
+    SEUIL_REQUETE_LENTE_MS,
+)
+
+# Bornes superieures (ms) des classes de l'histogramme de latence
+BORNES_HISTOGRAMME_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000)
+# Instructions dont le plan est capture quand elles sont lentes
+INSTRUCTIONS_EXPLICABLES = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "REPLACE")
+
+_COMMENTAIRES = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_CHAINES = re.compile(r"'(?:[^']|'')*'")
+_NOMBRES = re.compile(r"\b\d+(?:\.\d+)?\b")
+_LISTES = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_ESPACES = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def normaliser_sql(sql: str) -> str:
+    """
+    Reduit une instruction a sa forme generique : sans commentaires ni espaces
+    superflus, constantes remplacees par ? et listes de ? reduites a (?, ...)
+    """
+    sql = _COMMENTAIRES.sub(" ", sql)
+    sql = _CHAINES.sub("?", sql)
+    sql = _NOMBRES.sub("?", sql)
+    sql = _ESPACES.sub(" ", sql).strip()
+    return _LISTES.sub("(?, ...)", sql)
+
+
+def _masquer(parametres):
+    """Remplace les valeurs des parametres par ? (garde leur nombre et noms)"""
+    if isinstance(parametres, dict):
+        return {nom: "?" for nom in parametres}
+    return ["?"] * len(parametres or ())
+
+
+def _classe_histogramme(duree_ms: float) -> int:
+    for indice, borne in enumerate(BORNES_HISTOGRAMME_MS):
+        if duree_ms <= borne:
+            return indice
+    return len(BORNES_HISTOGRAMME_MS)
+
+
+def _libelles_histogramme() -> list[str]:
+    libelles = [f"<={borne}ms" for borne in BORNES_HISTOGRAMME_MS]
+    return libelles + [f">{BORNES_HISTOGRAMME_MS[-1]}ms"]
+
+
+class Profileur:
+    """
+    Agregats par SQL normalise et journal des requetes lentes
+
+    Partage par toutes les connexions (donc tous les threads), d'ou le verrou.
+    """
+
+    def __init__(
+        self,
+        actif: bool = PROFILAGE_ACTIF,
+        seuil_ms: float = SEUIL_REQUETE_LENTE_MS,
+        fichier=FICHIER_REQUETES_LENTES,
+        journaliser_parametres: bool = PROFILAGE_PARAMETRES,
+    ):
+        self.actif = actif
+        # Sinon seul le nombre de parametres est journalise
+        self.journaliser_parametres = journaliser_parametres
+        self.seuil_ms = seuil_ms
+        self.fichier = Path(fichier) if fichier else None
+        self._verrou = threading.Lock()
+        self._verrou_fichier = threading.Lock()
+        self.reinitialiser()
+
+    def reinitialiser(self):
+        """Efface les agregats (le journal des requetes lentes est conserve)"""
+        with self._verrou:
+            self._requetes = {}
+            self.depuis = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    def enregistrer(
+        self,
+        connexion: sqlite3.Connection,
+        sql: str,
+        parametres,
+        duree_ms: float,
+    ):
+        """Ajoute une instruction terminee aux agregats, la journalise si lente"""
+        normalise = normaliser_sql(sql)
+        lente = duree_ms >= self.seuil_ms
+        with self._verrou:
+            requete = self._requetes.get(normalise)
+            if requete is None:
+                requete = self._requetes[normalise] = {
+                    "nombre": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "lentes": 0,
+                    "histogramme": [0] * (len(BORNES_HISTOGRAMME_MS) + 1),
+                    "plan": None,
+                }
+            requete["nombre"] += 1
+            requete["total_ms"] += duree_ms
+            requete["max_ms"] = max(requete["max_ms"], duree_ms)
+            requete["histogramme"][_classe_histogramme(duree_ms)] += 1
+            if lente:
+                requete["lentes"] += 1
+            plan = requete["plan"]
+
+        if not lente:
+            return
+        if plan is None:
+            plan = expliquer(connexion, sql, parametres)
+            with self._verrou:
+                requete["plan"] = plan
+        self._journaliser(normalise, sql, parametres, duree_ms, plan)
+
+    def _journaliser(self, normalise, sql, parametres, duree_ms, plan):
+        if self.fichier is None:
+            return
+        entree = {
+            "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "duree_ms": round(duree_ms, 3),
+            "sql": normalise,
+            "parametres": (
+                parametres if self.journaliser_parametres else _masquer(parametres)
+            ),
+            "plan": plan,
+        }
+        try:
+            ligne = json.dumps(entree, ensure_ascii=False, default=str)
+            with self._verrou_fichier:
+                self.fichier.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.fichier, "a", encoding="utf-8") as fichier:
+                    fichier.write(ligne + "\n")
+        except OSError as e:
+            print(f"Erreur lors de l'ecriture du journal des requetes lentes: {e}")
+
+    def resume(self, tri: str = "total_ms", limite: int | None = 20) -> list[dict]:
+        """
+        Args:
+            tri (str): Cle de tri decroissant (total_ms, nombre, max_ms, ...)
+            limite (int): Nombre de requetes retournees, None pour toutes
+
+        Returns:
+            list: [{sql, nombre, total_ms, moyenne_ms, p50_ms, p95_ms, max_ms,
+                   lentes, histogramme, plan}] ; p50/p95 sont les bornes de la
+                   classe d'histogramme qui les contient
+        """
+        with self._verrou:
+            copies = [
+                (sql, dict(r, histogramme=list(r["histogramme"])))
+                for sql, r in self._requetes.items()
+            ]
+        lignes = []
+        for sql, requete in copies:
+            histogramme = requete["histogramme"]
+            lignes.append(
+                {
+                    "sql": sql,
+                    "nombre": requete["nombre"],
+                    "total_ms": round(requete["total_ms"], 3),
+                    "moyenne_ms": round(requete["total_ms"] / requete["nombre"], 3),
+                    "p50_ms": _centile_histogramme(histogramme, 50, requete["max_ms"]),
+                    "p95_ms": _centile_histogramme(histogramme, 95, requete["max_ms"]),
+                    "max_ms": round(requete["max_ms"], 3),
+                    "lentes": requete["lentes"],
+                    "histogramme": dict(zip(_libelles_histogramme(), histogramme)),
+                    "plan": requete["plan"],
+                }
+            )
+        lignes.sort(key=lambda ligne: ligne[tri], reverse=True)
+        return lignes if limite is None else lignes[:limite]
+
+    def formater_resume(self, tri: str = "total_ms", limite: int | None = 20) -> str:
+        """Resume lisible (interface, ligne de commande)"""
+        lignes = self.resume(tri, limite)
+        if not self.actif:
+            entete = "Profilage inactif (PROFILAGE_ACTIF, INVENTAIRE_PROFILAGE)"
+        else:
+            entete = f"Requetes profilees depuis {self.depuis}"
+        texte = [
+            entete,
+            f"Seuil des requetes lentes : {self.seuil_ms} ms",
+            "",
+            f"{'nombre':>8} {'total ms':>10} {'moy ms':>8} {'p95 ms':>8} "
+            f"{'max ms':>9} {'lentes':>6}  sql",
+        ]
+        for ligne in lignes:
+            texte.append(
+                f"{ligne['nombre']:>8} {ligne['total_ms']:>10.1f} "
+                f"{ligne['moyenne_ms']:>8.3f} {ligne['p95_ms']:>8} "
+                f"{ligne['max_ms']:>9.3f} {ligne['lentes']:>6}  {ligne['sql']}"
+            )
+            for etape in ligne["plan"] or []:
+                texte.append(f"{'':>55}  | {etape}")
+        return "\n".join(texte)
+
+
+def _centile_histogramme(histogramme: list[int], rang: float, max_ms: float):
+    """Borne superieure de la classe contenant le centile (max pour la derniere)"""
+    cible = sum(histogramme) * rang / 100
+    cumul = 0
+    for indice, nombre in enumerate(histogramme):
+        cumul += nombre
+        if nombre and cumul >= cible:
+            if indice < len(BORNES_HISTOGRAMME_MS):
+                return min(BORNES_HISTOGRAMME_MS[indice], round(max_ms, 3))
+            break
+    return round(max_ms, 3)
+
+
+def expliquer(connexion: sqlite3.Connection, sql: str, parametres=()) -> list[str]:
+    """
+    Retourne les etapes de EXPLAIN QUERY PLAN d'une instruction (liste vide si
+    l'instruction n'est pas une requete ou si le plan ne peut etre obtenu)
+    """
+    if not sql.lstrip().upper().startswith(INSTRUCTIONS_EXPLICABLES):
+        return []
+    try:
+        # Curseur de base : le plan n'est pas lui-meme profile
+        cur = sqlite3.Cursor(connexion)
+        cur.execute(f"EXPLAIN QUERY PLAN {sql}", parametres)
+        return [row[3] for row in cur.fetchall()]
+    except sqlite3.Error as e:
+        return [f"plan indisponible: {e}"]
+
+
+class CurseurProfile(sqlite3.Cursor):
+    """
+    Curseur qui chronometre chaque instruction, lecture des lignes comprise
+    La mesure est enregistree quand toutes les lignes sont lues, a la
+    prochaine instruction, ou au plus tard quand la connexion est rendue.
+    """
+
+    _mesure = None  # [sql, parametres, duree en secondes]
+
+    def execute(self, sql, parametres=()):
+        self._terminer()
+        debut = time.perf_counter()
+        try:
+            return super().execute(sql, parametres)
+        finally:
+            self._commencer(sql, parametres, time.perf_counter() - debut)
+
+    def executemany(self, sql, sequence_parametres):
+        self._terminer()
+        # Seuls les premiers parametres servent a expliquer le plan
+        sequence_parametres = iter(sequence_parametres)
+        premiers = next(sequence_parametres, None)
+        debut = time.perf_counter()
+        try:
+            if premiers is None:
+                return super().executemany(sql, [])
+            return super().executemany(sql, _prefixer(premiers, sequence_parametres))
+        finally:
+            self._commencer(sql, premiers or (), time.perf_counter() - debut)
+
+    def executescript(self, script):
+        self._terminer()
+        debut = time.perf_counter()
+        try:
+            return super().executescript(script)
+        finally:
+            self._commencer(script, (), time.perf_counter() - debut)
+            self._terminer()
+
+    def fetchone(self):
+        debut = time.perf_counter()
+        ligne = super().fetchone()
+        self._ajouter(time.perf_counter() - debut)
+        if ligne is None:
+            self._terminer()
+        return ligne
+
+    def fetchmany(self, size=None):
+        debut = time.perf_counter()
+        lignes = super().fetchmany(self.arraysize if size is None else size)
+        self._ajouter(time.perf_counter() - debut)
+        if not lignes:
+            self._terminer()
+        return lignes
+
+    def fetchall(self):
+        debut = time.perf_counter()
+        lignes = super().fetchall()
+        self._ajouter(time.perf_counter() - debut)
+        self._terminer()
+        return lignes
+
+    def __next__(self):
+        debut = time.perf_counter()
+        try:
+            ligne = super().__next__()
+        except StopIteration:
+            self._ajouter(time.perf_counter() - debut)
+            self._terminer()
+            raise
+        self._ajouter(time.perf_counter() - debut)
+        return ligne
+
+    def close(self):
+        self._terminer()
+        super().close()
+
+    def _commencer(self, sql, parametres, duree):
+        if not self.connection.profileur.actif:
+            return
+        self._mesure = [sql, parametres, duree]
+        self.connection.mesures_en_cours.add(self)
+
+    def _ajouter(self, duree):
+        if self._mesure is not None:
+            self._mesure[2] += duree
+
+    def _terminer(self):
+        mesure = self._mesure
+        if mesure is None:
+            return
+        self._mesure = None
+        self.connection.mesures_en_cours.discard(self)
+        sql, parametres, duree = mesure
+        self.connection.profileur.enregistrer(
+            self.connection, sql, parametres, duree * 1000
+        )
+
+
+def _prefixer(premier, suite):
+    yield premier
+    yield from suite
+
+
+class ConnexionProfilee(sqlite3.Connection):
+    """Connexion dont les curseurs (execute() compris) sont des CurseurProfile"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.profileur = profileur
+        self.mesures_en_cours = set()
+
+    def cursor(self, factory=CurseurProfile):
+        return super().cursor(factory)
+
+    def execute(self, sql, parametres=()):
+        return self.cursor().execute(sql, parametres)
+
+    def executemany(self, sql, sequence_parametres):
+        return self.cursor().executemany(sql, sequence_parametres)
+
+    def terminer_mesures(self):
+        """Enregistre les instructions dont les lignes n'ont pas toutes ete lues"""
+        for curseur in list(self.mesures_en_cours):
+            curseur._terminer()
+
+
+def resumer_journal(chemin=FICHIER_REQUETES_LENTES) -> list[dict]:
+    """
+    Agrege le journal des requetes lentes par SQL normalise
+
+    Returns:
+        list: [{sql, nombre, total_ms, max_ms, derniere, plan}] par temps
+              total decroissant
+    """
+    requetes = {}
+    try:
+        with open(chemin, encoding="utf-8") as fichier:
+            for ligne in fichier:
+                try:
+                    entree = json.loads(ligne)
+                except json.JSONDecodeError:
+                    continue
+                requete = requetes.setdefault(
+                    entree["sql"],
+                    {"sql": entree["sql"], "nombre": 0, "total_ms": 0.0, "max_ms": 0.0},
+                )
+                requete["nombre"] += 1
+                requete["total_ms"] = round(requete["total_ms"] + entree["duree_ms"], 3)
+                requete["max_ms"] = max(requete["max_ms"], entree["duree_ms"])
+                requete["derniere"] = entree["date"]
+                requete["plan"] = entree.get("plan")
+    except OSError as e:
+        print(f"Erreur lors de la lecture du journal des requetes lentes: {e}")
+        return []
+    return sorted(requetes.values(), key=lambda r: r["total_ms"], reverse=True)
+
+
+# Profileur partage par toutes les connexions profilees
+profileur = Profileur()
+
+
+if __name__ == "__main__":
+    chemin = sys.argv[1] if len(sys.argv) > 1 else FICHIER_REQUETES_LENTES
+    for requete in resumer_journal(chemin):
+        print(
+            f"{requete['nombre']:>6} x  total {requete['total_ms']:>10.1f} ms"
+            f"  max {requete['max_ms']:>9.1f} ms  {requete['sql']}"
+        )
+        for etape in requete["plan"] or []:
+            print(f"{'':>10}| {etape}")
@@ -1,4 +1,8 @@
+from .archives import *
+from .cache import *
 from .categories import *
+from .groupage import *
+from .instantanes import *
 from .mouvements import *
 from .produits import *
 from .stats import *
@@ -0,0 +1,169 @@
+import sqlite3
+from collections.abc import Iterator
+from pathlib import Path
+
+from database.gestionnaire_bd import connexion_lecture
+from database.schema import TABLES_ARCHIVE
+
+# SQLite limite par defaut a 10 le nombre de bases attachees a une connexion
+MAX_ARCHIVES_ATTACHEES = 10
+# Archives interrogees par une meme requete : une place reste libre pour
+# l'archive ecrite par l'archivage
+ARCHIVES_PAR_REQUETE = MAX_ARCHIVES_ATTACHEES - 1
+PREFIXE_ARCHIVE = "archive_"
+
+
+def obtenir_archives() -> list[dict]:
+    """
+    Recupere le registre des fichiers d'archive de mouvements
+
+    Returns:
+        list: [{nom, chemin, date_debut, date_fin, nombre_mouvements,
+               date_archivage}] du plus ancien au plus recent
+    """
+    with connexion_lecture() as connexion:
+        try:
+            cur = connexion.cursor()
+            cur.execute("SELECT * FROM archives_mouvements ORDER BY date_debut")
+            return [dict(row) for row in cur.fetchall()]
+        except sqlite3.Error as e:
+            print(f"Erreur lors de la recuperation des archives: {e}")
+            return []
+
+
+def _bases_attachees(connexion: sqlite3.Connection) -> set[str]:
+    cur = connexion.execute("PRAGMA database_list")
+    return {
+        row["name"] for row in cur.fetchall() if row["name"].startswith(PREFIXE_ARCHIVE)
+    }
+
+
+def attacher_archive(
+    connexion: sqlite3.Connection,
+    nom: str,
+    chemin,
+    creer: bool = False,
+    gardees: set[str] = frozenset(),
+):
+    """
+    Attache un fichier d'archive a la connexion s'il ne l'est pas deja
+    (a appeler hors transaction). Si la limite de SQLite est atteinte, les
+    archives attachees qui ne sont pas dans gardees sont detachees.
+
+    Args:
+        connexion: Connexion de lecture ou d'ecriture
+        nom (str): Nom d'attache (schema SQL) de l'archive
+        chemin: Fichier de l'archive
+        creer (bool): Cree le fichier et ses tables s'il n'existe pas
+        gardees (set): Archives a ne pas detacher
+    """
+    attachees = _bases_attachees(connexion)
+    if nom in attachees:
+        return
+    if len(attachees) >= MAX_ARCHIVES_ATTACHEES - 1:
+        for ancienne in attachees - set(gardees):
+            connexion.execute(f"DETACH DATABASE {ancienne}")
+
+    if creer:
+        Path(chemin).parent.mkdir(parents=True, exist_ok=True)
+    connexion.execute(f"ATTACH DATABASE ? AS {nom}", (str(chemin),))
+    if creer:
+        for requete in TABLES_ARCHIVE:
+            connexion.execute(requete.format(schema=nom))
+
+
+def groupes_archives(
+    connexion: sqlite3.Connection,
+    borne_inf: str | None = None,
+    borne_sup: str | None = None,
+) -> list[list[sqlite3.Row]]:
+    """
+    Retourne les archives recoupant la plage [borne_inf, borne_sup) (toutes si
+    elle est ouverte), par groupes d'au plus ARCHIVES_PAR_REQUETE archives :
+    un groupe peut etre attache en entier sans depasser la limite de SQLite
+
+    Args:
+        connexion: Connexion sur laquelle les requetes seront executees
+        borne_inf (str): Borne inferieure incluse ou None
+        borne_sup (str): Borne superieure exclue ou None
+
+    Returns:
+        list: Groupes de lignes {nom, chemin}, les plus recentes d'abord ;
+              toujours au moins un groupe (vide sans archive)
+    """
+    cur = connexion.execute(
+        """
+        SELECT nom, chemin FROM archives_mouvements
+        WHERE (? IS NULL OR date_fin >= ?) AND (? IS NULL OR date_debut < ?)
+        ORDER BY date_debut DESC
+    """,
+        (borne_inf, borne_inf, borne_sup, borne_sup),
+    )
+    archives = []
+    for archive in cur.fetchall():
+        if Path(archive["chemin"]).exists():
+            archives.append(archive)
+        else:
+            print(f"Archive introuvable, ignoree: {archive['chemin']}")
+    taille = ARCHIVES_PAR_REQUETE
+    return [archives[i : i + taille] for i in range(0, len(archives), taille)] or [[]]
+
+
+def requete_groupe(
+    connexion: sqlite3.Connection,
+    groupe: list[sqlite3.Row],
+    requete: str,
+    valeurs: list,
+    principale: bool = True,
+) -> tuple[str, list]:
+    """
+    Attache les archives d'un groupe (les autres archives attachees peuvent
+    etre detachees, a appeler hors transaction) et repete la requete sur leurs
+    tables, reunies par UNION ALL
+
+    Args:
+        connexion: Connexion sur laquelle la requete sera executee
+        groupe (list): Archives du groupe (voir groupes_archives)
+        requete (str): SELECT ou {mouvements} designe la table des mouvements
+        valeurs (list): Parametres de la requete
+        principale (bool): Inclut aussi la table principale
+
+    Returns:
+        tuple: (requete composee, parametres repetes pour chaque table) ; un
+               ORDER BY ajoute ensuite porte sur les colonnes du resultat
+    """
+    tables = ["mouvements_stock"] if principale else []
+    noms = {archive["nom"] for archive in groupe}
+    for archive in groupe:
+        attacher_archive(connexion, archive["nom"], archive["chemin"], gardees=noms)
+        tables.append(f"{archive['nom']}.mouvements_stock")
+    composee = " UNION ALL ".join(requete.format(mouvements=t) for t in tables)
+    return composee, list(valeurs) * len(tables)
+
+
+def requetes_mouvements(
+    connexion: sqlite3.Connection,
+    requete: str,
+    valeurs: list,
+    borne_inf: str | None = None,
+    borne_sup: str | None = None,
+) -> Iterator[tuple[str, list]]:
+    """
+    Repete une requete sur la table principale et les archives concernees, une
+    requete composee par groupe d'archives (la premiere inclut la table
+    principale). Les archives d'un groupe sont attachees quand il est produit :
+    le resultat du groupe precedent doit etre lu avant de passer au suivant.
+
+    Args:
+        connexion: Connexion sur laquelle les requetes seront executees
+        requete (str): SELECT ou {mouvements} designe la table des mouvements
+        valeurs (list): Parametres de la requete
+        borne_inf (str): Borne inferieure incluse de date_mouvement ou None
+        borne_sup (str): Borne superieure exclue de date_mouvement ou None
+
+    Yields:
+        tuple: (requete composee, parametres) de chaque groupe
+    """
+    groupes = groupes_archives(connexion, borne_inf, borne_sup)
+    for numero, groupe in enumerate(groupes):
+        yield requete_groupe(connexion, groupe, requete, valeurs, numero == 0)
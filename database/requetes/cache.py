@@ -0,0 +1,196 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from config.parametres import DUREE_CACHE, TAILLE_CACHE
+from database.evenements import (
+    CATEGORIE,
+    MODIFICATION,
+    PRODUIT,
+    abonner,
+    reinitialiser_journal,
+)
+from database.gestionnaire_bd import obtenir_gestionnaire
+
+# Marqueur d'une cle absente du cache (None peut etre une valeur valide)
+ABSENT = object()
+
+
+class CacheLRU:
+    """
+    Cache memoire borne en taille (eviction LRU) et en duree de vie (TTL)
+
+    Partage entre le thread Tk et les threads de requetes, d'ou le verrou.
+    Les valeurs sont copiees a l'entree et a la sortie : un appelant qui
+    modifie le dict recu ne modifie pas le cache. Avec immuable=True, les
+    valeurs (tuples, MappingProxyType, ...) sont rendues telles quelles : une
+    copie profonde d'une grande liste couterait presque autant que la requete.
+    """
+
+    def __init__(
+        self,
+        nom: str,
+        taille_max: int = TAILLE_CACHE,
+        duree: float = DUREE_CACHE,
+        immuable: bool = False,
+    ):
+        self.nom = nom
+        self.immuable = immuable
+        self.taille_max = taille_max
+        self.duree = duree
+        self._entrees = OrderedDict()
+        self._verrou = threading.Lock()
+        # Desactive (activer_caches) : chaque lecture va a la base
+        self.actif = True
+        # Incrementee a chaque invalidation (voir placer())
+        self.generation = 0
+        self.succes = 0
+        self.echecs = 0
+        self.evictions = 0
+
+    def obtenir(self, cle):
+        """Retourne la valeur en cache, ou ABSENT si absente ou expiree"""
+        if not self.actif:
+            return ABSENT
+        with self._verrou:
+            entree = self._entrees.get(cle)
+            if entree is None or entree[0] < time.monotonic():
+                if entree is not None:
+                    del self._entrees[cle]
+                self.echecs += 1
+                return ABSENT
+            self._entrees.move_to_end(cle)
+            self.succes += 1
+            return entree[1] if self.immuable else copy.deepcopy(entree[1])
+
+    def placer(self, cle, valeur, generation: int | None = None):
+        """
+        Met une valeur en cache. Avec generation (lue avant la requete), la
+        valeur est ignoree si une invalidation a eu lieu entre-temps : elle
+        peut avoir ete lue avant l'ecriture qui l'a invalidee.
+        """
+        if not self.actif:
+            return
+        with self._verrou:
+            if generation is not None and generation != self.generation:
+                return
+            expiration = time.monotonic() + self.duree
+            if not self.immuable:
+                valeur = copy.deepcopy(valeur)
+            self._entrees[cle] = (expiration, valeur)
+            self._entrees.move_to_end(cle)
+            while len(self._entrees) > self.taille_max:
+                self._entrees.popitem(last=False)
+                self.evictions += 1
+
+    def invalider(self, *cles):
+        """Retire les cles donnees, ou tout le cache si aucune n'est donnee"""
+        with self._verrou:
+            self.generation += 1
+            if not cles:
+                self._entrees.clear()
+            for cle in cles:
+                self._entrees.pop(cle, None)
+
+    def invalider_si(self, condition):
+        """Retire les entrees dont la valeur verifie condition(valeur)"""
+        with self._verrou:
+            self.generation += 1
+            for cle in [c for c, (_, v) in self._entrees.items() if condition(v)]:
+                del self._entrees[cle]
+
+    def statistiques(self) -> dict:
+        with self._verrou:
+            total = self.succes + self.echecs
+            return {
+                "taille": len(self._entrees),
+                "taille_max": self.taille_max,
+                "succes": self.succes,
+                "echecs": self.echecs,
+                "evictions": self.evictions,
+                "taux_succes": round(self.succes / total, 3) if total else 0.0,
+            }
+
+
+# Caches des requetes de lecture frequentes
+cache_categories = CacheLRU("categories", taille_max=1)
+cache_produits = CacheLRU("produits")
+cache_liste_produits = CacheLRU("liste_produits", taille_max=1, immuable=True)
+CACHES = (cache_categories, cache_produits, cache_liste_produits)
+
+# Champs presents dans obtenir_liste_produits()
+CHAMPS_LISTE_PRODUITS = {"nom", "code_barre"}
+
+
+def _invalider_caches(changements):
+    """Abonne au flux : retire les entrees touchees par une ecriture"""
+    produits = set()
+    liste_modifiee = False
+    for changement in changements:
+        if changement.entite == CATEGORIE:
+            cache_categories.invalider()
+        elif changement.entite == PRODUIT:
+            produits.add(changement.id)
+            if (
+                changement.operation != MODIFICATION
+                or changement.champs is None
+                or CHAMPS_LISTE_PRODUITS.intersection(changement.champs)
+            ):
+                liste_modifiee = True
+    if produits:
+        cache_produits.invalider(*produits)
+    if liste_modifiee:
+        cache_liste_produits.invalider()
+
+
+abonner(_invalider_caches)
+
+
+def statistiques_caches() -> dict:
+    """
+    Returns:
+        dict: {nom du cache: {taille, taille_max, succes, echecs, evictions,
+               taux_succes}}
+    """
+    return {cache.nom: cache.statistiques() for cache in CACHES}
+
+
+def activer_caches(actif: bool):
+    """
+    Active ou desactive tous les caches. Les invalidations ne voient que les
+    ecritures de ce processus : un processus dont la base est aussi modifiee
+    par d'autres (serveur API) les desactive pour toujours lire la base.
+    """
+    for cache in CACHES:
+        cache.actif = actif
+        cache.invalider()
+
+
+def vider_caches():
+    """Vide tous les caches (ex: apres une modification hors de l'application)"""
+    for cache in CACHES:
+        cache.invalider()
+
+
+# Derniere valeur de data_version vue par verifier_ecritures_externes()
+_version_donnees = None
+
+
+def verifier_ecritures_externes() -> bool:
+    """
+    Detecte les ecritures d'autres processus (API, CLI) depuis l'appel
+    precedent ; si il y en a eu, vide les caches et reinitialise le journal
+    des changements pour que les vues rechargent tout
+
+    Returns:
+        bool: True si la base a ete modifiee par un autre processus
+    """
+    global _version_donnees
+    version = obtenir_gestionnaire().version_donnees()
+    modifiee = _version_donnees is not None and version != _version_donnees
+    _version_donnees = version
+    if modifiee:
+        vider_caches()
+        reinitialiser_journal()
+    return modifiee
@@ -1,7 +1,16 @@
 import sqlite3
 from datetime import datetime
 
-from database.gestionnaire_bd import obtenir_connexion
+from database.evenements import (
+    CATEGORIE,
+    CREATION,
+    MODIFICATION,
+    PRODUIT,
+    SUPPRESSION,
+    publier,
+)
+from database.gestionnaire_bd import connexion_ecriture, connexion_lecture
+from database.requetes.cache import ABSENT, cache_categories
 
 
 def creer_categorie(nom: str, description: str = "") -> int | None:
@@ -15,48 +24,55 @@ def creer_categorie(nom: str, description: str = "") -> int | None:
     Returns:
         int: ID de la categorie cree ou None sis erreur
     """
-    connexion = obtenir_connexion()
+    with connexion_ecriture() as connexion:
 
-    try:
-        cur = connexion.cursor()
-        date_actuelle = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            cur = connexion.cursor()
+            date_actuelle = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-        cur.execute(
-            """
-            INSERT INTO categories (nom, description, date_creation)
-            VALUES (?, ?, ?)
-        """,
-            (nom, description, date_actuelle),
-        )
+            cur.execute(
+                """
+                INSERT INTO categories (nom, description, date_creation)
+                VALUES (?, ?, ?)
+            """,
+                (nom, description, date_actuelle),
+            )
 
-        connexion.commit()
-        return cur.lastrowid
+            connexion.commit()
+            publier(CATEGORIE, CREATION, [cur.lastrowid])
+            return cur.lastrowid
 
-    except sqlite3.IntegrityError:
-        print(f"Erreur: la categorie '{nom}' existe deja")
-        return None
-    except sqlite3.Error as e:
-        print(f"Erreur lors de la creation de la categorie: {e}")
-        connexion.rollback()
-        return None
+        except sqlite3.IntegrityError:
+            print(f"Erreur: la categorie '{nom}' existe deja")
+            return None
+        except sqlite3.Error as e:
+            print(f"Erreur lors de la creation de la categorie: {e}")
+            connexion.rollback()
+            return None
 
 
 def obtenir_toutes_categories() -> list[dict]:
     """
-    REcupere toutes les categories
+    REcupere toutes les categories (mises en cache)
 
     Returns:
         list: Liste des dicts {categorie_id, nom, description, date_creation}
     """
-    connexion = obtenir_connexion()
-    try:
-        cur = connexion.cursor()
-        cur.execute("SELECT * FROM categories ORDER BY nom")
-        categories = [dict(row) for row in cur.fetchall()]
+    categories = cache_categories.obtenir("toutes")
+    if categories is not ABSENT:
         return categories
-    except sqlite3.Error as e:
-        print(f"Erreur lors de la recuperation des categories: {e}")
-        return []
+
+    generation = cache_categories.generation
+    with connexion_lecture() as connexion:
+        try:
+            cur = connexion.cursor()
+            cur.execute("SELECT * FROM categories ORDER BY nom")
+            categories = [dict(row) for row in cur.fetchall()]
+            cache_categories.placer("toutes", categories, generation)
+            return categories
+        except sqlite3.Error as e:
+            print(f"Erreur lors de la recuperation des categories: {e}")
+            return []
 
 
 def obtenir_categorie(categorie_id: int):
@@ -69,16 +85,16 @@ def obtenir_categorie(categorie_id: int):
     Returns:
         tuple: Donnees de la categorie ou None
     """
-    connexion = obtenir_connexion()
-    try:
-        curseur = connexion.cursor()
-        curseur.execute(
-            "SELECT * FROM categories WHERE categorie_id = ?", (categorie_id,)
-        )
-        return curseur.fetchone()
-    except sqlite3.Error as e:
-        print(f"Erreur lors de la recuperation de la categorie: {e}")
-        return None
+    with connexion_lecture() as connexion:
+        try:
+            curseur = connexion.cursor()
+            curseur.execute(
+                "SELECT * FROM categories WHERE categorie_id = ?", (categorie_id,)
+            )
+            return curseur.fetchone()
+        except sqlite3.Error as e:
+            print(f"Erreur lors de la recuperation de la categorie: {e}")
+            return None
 
 
 def modifier_categorie(
@@ -95,39 +111,51 @@ def modifier_categorie(
     Returns:
         bool: True si modification reussie, False sinon
     """
-    connexion = obtenir_connexion()
-    try:
-        curseur = connexion.cursor()
+    with connexion_ecriture() as connexion:
+        try:
+            curseur = connexion.cursor()
 
-        # Construire la requete dynamiquement selon les champs fournis
-        champs_a_modifier = []
-        valeurs = []
+            # Construire la requete dynamiquement selon les champs fournis
+            champs_a_modifier = []
+            valeurs = []
 
-        if nom is not None:
-            champs_a_modifier.append("nom = ?")
-            valeurs.append(nom)
+            if nom is not None:
+                champs_a_modifier.append("nom = ?")
+                valeurs.append(nom)
 
-        if description is not None:
-            champs_a_modifier.append("description = ?")
-            valeurs.append(description)
+            if description is not None:
+                champs_a_modifier.append("description = ?")
+                valeurs.append(description)
 
-        if not champs_a_modifier:
-            return False
+            if not champs_a_modifier:
+                return False
 
-        valeurs.append(categorie_id)
-        requete = f"""
-            UPDATE categories SET {', '.join(champs_a_modifier)}
-            WHERE categorie_id = ?
-        """
+            valeurs.append(categorie_id)
+            requete = f"""
+                UPDATE categories SET {', '.join(champs_a_modifier)}
+                WHERE categorie_id = ?
+            """
+
+            curseur.execute(requete, valeurs)
+            produits = _produits_de_categorie(connexion, categorie_id) if nom else []
+            connexion.commit()
+            if curseur.rowcount > 0:
+                publier(CATEGORIE, MODIFICATION, [categorie_id])
+                # nom_categorie change dans les lignes de ces produits
+                publier(PRODUIT, MODIFICATION, produits, ["nom_categorie"])
+            return curseur.rowcount > 0
+
+        except sqlite3.Error as e:
+            print(f"Erreur lors de la modification de la categorie: {e}")
+            connexion.rollback()
+            return False
 
-        curseur.execute(requete, valeurs)
-        connexion.commit()
-        return curseur.rowcount > 0
 
-    except sqlite3.Error as e:
-        print(f"Erreur lors de la modification de la categorie: {e}")
-        connexion.rollback()
-        return False
+def _produits_de_categorie(connexion, categorie_id: int) -> list[int]:
+    cur = connexion.execute(
+        "SELECT produit_id FROM produits WHERE categorie_id = ?", (categorie_id,)
+    )
+    return [row["produit_id"] for row in cur.fetchall()]
 
 
 def supprimer_categorie(categorie_id: int):
@@ -141,15 +169,19 @@ def supprimer_categorie(categorie_id: int):
     Returns:
         bool: True si suppression reussie, False sinon
     """
-    connexion = obtenir_connexion()
-    try:
-        curseur = connexion.cursor()
-        curseur.execute(
-            "DELETE FROM categories WHERE categorie_id = ?", (categorie_id,)
-        )
-        connexion.commit()
-        return curseur.rowcount > 0
-    except sqlite3.Error as e:
-        print(f"Erreur lors de la suppression de la categorie: {e}")
-        connexion.rollback()
-        return False
+    with connexion_ecriture() as connexion:
+        try:
+            curseur = connexion.cursor()
+            produits = _produits_de_categorie(connexion, categorie_id)
+            curseur.execute(
+                "DELETE FROM categories WHERE categorie_id = ?", (categorie_id,)
+            )
+            connexion.commit()
+            if curseur.rowcount > 0:
+                publier(CATEGORIE, SUPPRESSION, [categorie_id])
+                publier(PRODUIT, MODIFICATION, produits, ["categorie_id"])
+            return curseur.rowcount > 0
+        except sqlite3.Error as e:
+            print(f"Erreur lors de la suppression de la categorie: {e}")
+            connexion.rollback()
+            return False
@@ -0,0 +1,234 @@
+import atexit
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime
+
+from config.parametres import DELAI_GROUPAGE_MS, TAILLE_MAX_GROUPAGE
+from database.evenements import CREATION, MODIFICATION, MOUVEMENT, PRODUIT, publier
+from database.gestionnaire_bd import connexion_ecriture, executer_transaction
+from database.requetes.mouvements import _inserer_mouvement
+
+# Marque d'arret deposee dans la file
+_ARRET = object()
+
+
+class FileMouvements:
+    """
+    Regroupe les mouvements soumis par de nombreux appelants (scanners, API)
+    en une transaction commune, ecrite par un thread dedie
+
+    Le thread attend une premiere demande, puis accumule les suivantes pendant
+    au plus delai_ms ou jusqu'a taille_max demandes, et les ecrit en un seul
+    commit ; les demandes arrivees pendant ce commit forment le groupe suivant.
+    Chaque mouvement a son propre SAVEPOINT : un mouvement en erreur (produit
+    inexistant, stock insuffisant, ...) est annule seul, comme avec
+    creer_mouvement.
+    """
+
+    def __init__(
+        self,
+        delai_ms: float = DELAI_GROUPAGE_MS,
+        taille_max: int = TAILLE_MAX_GROUPAGE,
+    ):
+        self.delai = max(0.0, delai_ms) / 1000
+        self.taille_max = max(1, taille_max)
+        self._file = queue.Queue()
+        self._verrou = threading.Lock()
+        self._thread = None
+        self._arretee = False
+        # Nombre de transactions et de mouvements ecrits (suivi du groupage)
+        self.transactions = 0
+        self.mouvements = 0
+
+    def soumettre(
+        self,
+        produit_id: int,
+        type_mouvement: str,
+        quantite: int,
+        motif: str = "",
+        utilisateur: str = "",
+        remarques: str = "",
+    ) -> Future:
+        """
+        Ajoute un mouvement a la file (memes arguments que creer_mouvement)
+
+        Returns:
+            Future: Resolu avec l'ID du mouvement cree, ou None si erreur
+        """
+        future = Future()
+        if type_mouvement not in ["ENTREE", "SORTIE"]:
+            print("Erreur: Type de mouvement invalide (doit etre 'ENTREE' ou 'SORTIE')")
+            future.set_result(None)
+            return future
+
+        # Date de la demande, et non de l'ecriture du groupe
+        date_actuelle = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        ligne = (
+            produit_id,
+            type_mouvement,
+            quantite,
+            motif,
+            utilisateur,
+            date_actuelle,
+            remarques,
+        )
+        with self._verrou:
+            if self._arretee:
+                raise RuntimeError("La file de mouvements est arretee")
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._boucle, name="groupage-mouvements", daemon=True
+                )
+                self._thread.start()
+            self._file.put((ligne, future))
+        return future
+
+    def arreter(self, delai: float | None = None):
+        """Ecrit les demandes en attente puis arrete le thread d'ecriture"""
+        with self._verrou:
+            if self._arretee:
+                return
+            self._arretee = True
+            thread = self._thread
+            self._file.put(_ARRET)
+        if thread is not None:
+            thread.join(delai)
+
+    # ---------- Thread d'ecriture ----------
+    def _boucle(self):
+        arret = False
+        while not arret:
+            demande = self._file.get()
+            if demande is _ARRET:
+                return
+            groupe = [demande]
+            echeance = time.monotonic() + self.delai
+            while len(groupe) < self.taille_max:
+                try:
+                    # Les demandes deja en file sont prises sans attendre
+                    demande = self._file.get(
+                        timeout=max(0.0, echeance - time.monotonic())
+                    )
+                except queue.Empty:
+                    break
+                if demande is _ARRET:
+                    arret = True
+                    break
+                groupe.append(demande)
+
+            try:
+                self._ecrire(groupe)
+            except Exception as e:
+                # Connexion fermee, ... : aucun appelant ne doit rester bloque
+                for _, future in groupe:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _ecrire(self, groupe: list):
+        """Ecrit un groupe de demandes en une transaction"""
+        # Demandes annulees par leur appelant avant l'ecriture : ignorees
+        groupe = [
+            (ligne, future)
+            for ligne, future in groupe
+            if future.set_running_or_notify_cancel()
+        ]
+        if not groupe:
+            return
+
+        def ecrire(cur: sqlite3.Cursor) -> list:
+            resultats = []
+            for ligne, future in groupe:
+                cur.execute("SAVEPOINT mouvement")
+                try:
+                    mouvement_id = _inserer_mouvement(cur, ligne)
+                    cur.execute("RELEASE mouvement")
+                except sqlite3.Error as e:
+                    # Produit inexistant, stock insuffisant, ...
+                    print(f"Erreur lors de la creation du mouvement: {e}")
+                    cur.execute("ROLLBACK TO mouvement")
+                    cur.execute("RELEASE mouvement")
+                    mouvement_id = None
+                resultats.append((ligne[0], mouvement_id, future))
+            return resultats
+
+        with connexion_ecriture() as connexion:
+            try:
+                resultats = executer_transaction(connexion, ecrire)
+            except sqlite3.Error as e:
+                print(f"Erreur lors de l'ecriture du groupe de mouvements: {e}")
+                connexion.rollback()
+                for _, future in groupe:
+                    future.set_result(None)
+                return
+
+        self.transactions += 1
+        ecrits = [
+            (produit_id, mouvement_id)
+            for produit_id, mouvement_id, _ in resultats
+            if mouvement_id is not None
+        ]
+        self.mouvements += len(ecrits)
+        if ecrits:
+            publier(MOUVEMENT, CREATION, [mouvement_id for _, mouvement_id in ecrits])
+            publier(
+                PRODUIT,
+                MODIFICATION,
+                dict.fromkeys(produit_id for produit_id, _ in ecrits),
+                ["stock_actuel"],
+            )
+        # Futures resolus apres la publication : l'appelant voit des caches a jour
+        for _, mouvement_id, future in resultats:
+            future.set_result(mouvement_id)
+
+
+# Instance globale, creee a la premiere soumission
+_file_mouvements = None
+_verrou_file = threading.Lock()
+
+
+def obtenir_file_mouvements() -> FileMouvements:
+    """Retourne la file de groupage globale (la cree si besoin)"""
+    global _file_mouvements
+    with _verrou_file:
+        if _file_mouvements is None:
+            _file_mouvements = FileMouvements()
+        return _file_mouvements
+
+
+def soumettre_mouvement(
+    produit_id: int,
+    type_mouvement: str,
+    quantite: int,
+    motif: str = "",
+    utilisateur: str = "",
+    remarques: str = "",
+) -> Future:
+    """
+    Version groupee de creer_mouvement : le mouvement est ecrit par le thread
+    de la file globale avec les autres demandes recues au meme moment
+
+    Exemple:
+        mouvement_id = soumettre_mouvement(12, "SORTIE", 1, "Vente").result()
+
+    Returns:
+        Future: Resolu avec l'ID du mouvement cree, ou None si erreur
+    """
+    return obtenir_file_mouvements().soumettre(
+        produit_id, type_mouvement, quantite, motif, utilisateur, remarques
+    )
+
+
+def arreter_file_mouvements():
+    """Ecrit les mouvements en attente et arrete la file globale"""
+    global _file_mouvements
+    with _verrou_file:
+        file_mouvements, _file_mouvements = _file_mouvements, None
+    if file_mouvements is not None:
+        file_mouvements.arreter()
+
+
+# Les mouvements encore en file sont ecrits avant la fin du programme
+atexit.register(arreter_file_mouvements)
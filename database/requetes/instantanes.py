@@ -0,0 +1,268 @@
+import sqlite3
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+from config.parametres import INTERVALLE_INSTANTANES
+from database.gestionnaire_bd import connexion_ecriture, connexion_lecture
+from database.requetes.archives import (
+    groupes_archives,
+    requete_groupe,
+    requetes_mouvements,
+)
+
+# Effet d'un mouvement sur le stock
+DELTA_MOUVEMENT = (
+    "CASE m.type_mouvement WHEN 'ENTREE' THEN m.quantite ELSE -m.quantite END"
+)
+INTERVALLES_INSTANTANES = ("quotidien", "mensuel")
+# Mouvements posterieurs a une date, a sommer par produit
+SELECT_DELTAS = f"""
+    SELECT m.produit_id, {DELTA_MOUVEMENT} as delta
+    FROM {{mouvements}} m
+    WHERE m.date_mouvement >= ?
+"""
+
+
+def _lendemain(jour: str) -> str:
+    """
+    Valide une date YYYY-MM-DD et retourne le lendemain (meme format),
+    borne exclue de la journee dans les comparaisons avec date_mouvement
+
+    Raises:
+        ValueError: Si la date n'est pas au format YYYY-MM-DD
+    """
+    lendemain = datetime.strptime(jour, "%Y-%m-%d") + timedelta(days=1)
+    return lendemain.strftime("%Y-%m-%d")
+
+
+def derniere_date_close(intervalle: str = INTERVALLE_INSTANTANES) -> str:
+    """
+    Retourne la derniere journee terminee pour l'intervalle donne : hier en
+    'quotidien', le dernier jour du mois precedent en 'mensuel'
+
+    Raises:
+        ValueError: Si l'intervalle est inconnu
+    """
+    aujourd_hui = date.today()
+    if intervalle == "quotidien":
+        jour = aujourd_hui - timedelta(days=1)
+    elif intervalle == "mensuel":
+        jour = aujourd_hui.replace(day=1) - timedelta(days=1)
+    else:
+        raise ValueError(
+            f"Intervalle d'instantane invalide (doit etre {INTERVALLES_INSTANTANES})"
+        )
+    return jour.isoformat()
+
+
+def prendre_instantane(date_instantane: str | None = None) -> int | None:
+    """
+    Enregistre le stock de chaque produit a la fin d'une journee terminee
+    Le stock est deduit du stock actuel en retirant les mouvements posterieurs,
+    d'ou un cout faible pour la veille.
+
+    Args:
+        date_instantane (str): Journee (format: YYYY-MM-DD), hier par defaut
+
+    Returns:
+        int: Nombre de produits enregistres ou None si erreur
+
+    Raises:
+        ValueError: Si la date est invalide ou n'est pas encore terminee
+    """
+    date_instantane = date_instantane or derniere_date_close("quotidien")
+    lendemain = _lendemain(date_instantane)
+    if lendemain > date.today().isoformat():
+        raise ValueError("Seule une journee terminee peut etre photographiee")
+
+    with connexion_ecriture() as connexion:
+        try:
+            cur = connexion.cursor()
+            groupes = groupes_archives(connexion, borne_inf=lendemain)
+            # Archives des groupes suivants (date ancienne, plus d'archives que
+            # de bases attachables) : sommes lues d'abord, elles ne changent pas
+            anciens = defaultdict(int)
+            for groupe in groupes[1:]:
+                requete, valeurs = requete_groupe(
+                    connexion, groupe, SELECT_DELTAS, [lendemain], principale=False
+                )
+                cur.execute(
+                    f"""
+                    SELECT produit_id, SUM(delta) as delta FROM ({requete})
+                    GROUP BY produit_id
+                """,
+                    valeurs,
+                )
+                for row in cur.fetchall():
+                    anciens[row["produit_id"]] += row["delta"]
+
+            # Archives attachees avant d'ouvrir la transaction
+            posterieurs, valeurs = requete_groupe(
+                connexion, groupes[0], SELECT_DELTAS, [lendemain]
+            )
+            cur.execute("BEGIN TRANSACTION")
+            cur.execute(
+                f"""
+                INSERT OR REPLACE INTO instantanes_stock
+                    (produit_id, date_instantane, stock)
+                SELECT p.produit_id, ?, p.stock_actuel - COALESCE(d.delta, 0)
+                FROM produits p
+                LEFT JOIN (
+                    SELECT produit_id, SUM(delta) as delta
+                    FROM ({posterieurs})
+                    GROUP BY produit_id
+                ) d ON d.produit_id = p.produit_id
+            """,
+                [date_instantane] + valeurs,
+            )
+            nombre = cur.rowcount
+            cur.executemany(
+                """
+                UPDATE instantanes_stock SET stock = stock - ?
+                WHERE produit_id = ? AND date_instantane = ?
+            """,
+                [
+                    (delta, produit_id, date_instantane)
+                    for produit_id, delta in anciens.items()
+                    if delta
+                ],
+            )
+            connexion.commit()
+            return nombre
+
+        except sqlite3.Error as e:
+            print(f"Erreur lors de la prise de l'instantane de stock: {e}")
+            connexion.rollback()
+            return None
+
+
+def date_dernier_instantane() -> str | None:
+    """
+    Returns:
+        str: Date du plus recent instantane (YYYY-MM-DD) ou None
+    """
+    with connexion_lecture() as connexion:
+        try:
+            cur = connexion.cursor()
+            cur.execute(
+                "SELECT MAX(date_instantane) as derniere FROM instantanes_stock"
+            )
+            return cur.fetchone()["derniere"]
+        except sqlite3.Error as e:
+            print(f"Erreur lors de la lecture des instantanes: {e}")
+            return None
+
+
+def prendre_instantane_si_necessaire(
+    intervalle: str = INTERVALLE_INSTANTANES,
+) -> str | None:
+    """
+    Prend l'instantane de la derniere periode terminee s'il manque
+    (a appeler au demarrage ou periodiquement)
+
+    Args:
+        intervalle (str): 'quotidien' ou 'mensuel'
+
+    Returns:
+        str: Date de l'instantane pris, None si deja a jour ou en cas d'erreur
+    """
+    cible = derniere_date_close(intervalle)
+    derniere = date_dernier_instantane()
+    if derniere is not None and derniere >= cible:
+        return None
+    if prendre_instantane(cible) is None:
+        return None
+    return cible
+
+
+def _delta_mouvements(
+    connexion, produit_id: int, borne_inf: str, borne_sup: str | None
+) -> int:
+    """Somme des mouvements d'un produit sur [borne_inf, borne_sup)"""
+    conditions = "WHERE m.produit_id = ? AND m.date_mouvement >= ?"
+    valeurs = [produit_id, borne_inf]
+    if borne_sup is not None:
+        conditions += " AND m.date_mouvement < ?"
+        valeurs.append(borne_sup)
+    delta = 0
+    # Une somme par groupe d'archives (limite des bases attachees)
+    for requete, parametres in requetes_mouvements(
+        connexion,
+        f"SELECT {DELTA_MOUVEMENT} as delta FROM {{mouvements}} m {conditions}",
+        valeurs,
+        borne_inf,
+        borne_sup,
+    ):
+        cur = connexion.execute(
+            f"SELECT COALESCE(SUM(delta), 0) as delta FROM ({requete})", parametres
+        )
+        delta += cur.fetchone()["delta"]
+    return delta
+
+
+def stock_a_la_date(produit_id: int, date_stock: str) -> int | None:
+    """
+    Calcule le stock d'un produit a la fin d'une journee passee
+    Part de l'instantane le plus proche avant cette date et ne rejoue que les
+    mouvements intermediaires ; sans instantane anterieur, remonte depuis
+    l'instantane suivant (ou le stock actuel).
+
+    Args:
+        produit_id (int): ID du produit
+        date_stock (str): Journee (format: YYYY-MM-DD)
+
+    Returns:
+        int: Stock en fin de journee, None si produit introuvable ou erreur
+
+    Raises:
+        ValueError: Si la date n'est pas au format YYYY-MM-DD
+    """
+    lendemain = _lendemain(date_stock)
+
+    with connexion_lecture() as connexion:
+        try:
+            cur = connexion.cursor()
+            cur.execute(
+                """
+                SELECT date_instantane, stock FROM instantanes_stock
+                WHERE produit_id = ? AND date_instantane <= ?
+                ORDER BY date_instantane DESC
+                LIMIT 1
+            """,
+                (produit_id, date_stock),
+            )
+            precedent = cur.fetchone()
+            if precedent is not None:
+                # Rejoue vers l'avant : ]instantane, date_stock]
+                debut = _lendemain(precedent["date_instantane"])
+                delta = _delta_mouvements(connexion, produit_id, debut, lendemain)
+                return precedent["stock"] + delta
+
+            cur.execute(
+                """
+                SELECT date_instantane, stock FROM instantanes_stock
+                WHERE produit_id = ? AND date_instantane > ?
+                ORDER BY date_instantane
+                LIMIT 1
+            """,
+                (produit_id, date_stock),
+            )
+            suivant = cur.fetchone()
+            if suivant is not None:
+                depart, borne = suivant["stock"], _lendemain(suivant["date_instantane"])
+            else:
+                cur.execute(
+                    "SELECT stock_actuel FROM produits WHERE produit_id = ?",
+                    (produit_id,),
+                )
+                produit = cur.fetchone()
+                if produit is None:
+                    return None
+                depart, borne = produit["stock_actuel"], None
+
+            # Rejoue vers l'arriere : ]date_stock, depart]
+            return depart - _delta_mouvements(connexion, produit_id, lendemain, borne)
+
+        except sqlite3.Error as e:
+            print(f"Erreur lors du calcul du stock a la date: {e}")
+            return None
@@ -1,7 +1,158 @@
+import heapq
+import itertools
 import sqlite3
-from datetime import datetime
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from datetime import datetime, timedelta
+from operator import itemgetter
 
-from database.gestionnaire_bd import obtenir_connexion
+from config.parametres import TAILLE_PAGE
+from database.evenements import CREATION, MODIFICATION, MOUVEMENT, PRODUIT, publier
+from database.gestionnaire_bd import (
+    connexion_ecriture,
+    connexion_lecture,
+    executer_transaction,
+)
+from database.pagination import decoder_curseur, paginer, verifier_limite
+from database.requetes.archives import (
+    groupes_archives,
+    requete_groupe,
+    requetes_mouvements,
+)
+
+
+# Requete de base repetee sur la table principale et les archives concernees
+SELECT_MOUVEMENTS = """
+    SELECT m.*, p.nom as nom_produit
+    FROM {mouvements} m
+    JOIN produits p ON m.produit_id = p.produit_id
+"""
+ORDRE_MOUVEMENTS = "ORDER BY date_mouvement DESC, mouvement_id DESC"
+CLE_ORDRE_MOUVEMENTS = itemgetter("date_mouvement", "mouvement_id")
+
+
+def _lire_mouvements(
+    connexion: sqlite3.Connection,
+    requete: str,
+    valeurs: list,
+    bornes: tuple = (None, None),
+    limite: int | None = None,
+) -> list[dict]:
+    """
+    Execute une requete de mouvements sur chaque groupe de tables (voir
+    requetes_mouvements) et fusionne les resultats dans l'ordre ORDRE_MOUVEMENTS
+
+    Args:
+        connexion: Connexion de lecture
+        requete (str): SELECT_MOUVEMENTS suivi de ses conditions
+        valeurs (list): Parametres des conditions
+        bornes (tuple): Bornes de dates (borne_inf, borne_sup) des conditions
+        limite (int): Nombre maximal de lignes retournees (None = toutes)
+
+    Returns:
+        list: Mouvements des plus recents aux plus anciens
+    """
+    suffixe = ORDRE_MOUVEMENTS if limite is None else f"{ORDRE_MOUVEMENTS} LIMIT ?"
+    extra = [] if limite is None else [limite]
+    resultats = []
+    for composee, parametres in requetes_mouvements(
+        connexion, requete, valeurs, *bornes
+    ):
+        cur = connexion.execute(f"{composee} {suffixe}", parametres + extra)
+        resultats.append([dict(row) for row in cur.fetchall()])
+    if len(resultats) == 1:
+        return resultats[0]
+    fusion = heapq.merge(*resultats, key=CLE_ORDRE_MOUVEMENTS, reverse=True)
+    return list(fusion if limite is None else itertools.islice(fusion, limite))
+
+
+def _bornes_dates(
+    date_debut: str | None, date_fin: str | None
+) -> tuple[str | None, str | None]:
+    """
+    Convertit une plage de dates incluses en bornes semi-ouvertes [debut, fin)
+    comparables directement a date_mouvement ('YYYY-MM-DD HH:MM:SS'), ce qui
+    permet a SQLite d'utiliser les index sur cette colonne
+
+    Args:
+        date_debut (str): Date de debut incluse (format: YYYY-MM-DD) ou None
+        date_fin (str): Date de fin incluse (format: YYYY-MM-DD) ou None
+
+    Returns:
+        tuple: (borne inferieure incluse, borne superieure exclue)
+
+    Raises:
+        ValueError: Si une date n'est pas au format YYYY-MM-DD
+    """
+    borne_inf = borne_sup = None
+    if date_debut:
+        borne_inf = datetime.strptime(date_debut, "%Y-%m-%d").strftime("%Y-%m-%d")
+    if date_fin:
+        lendemain = datetime.strptime(date_fin, "%Y-%m-%d") + timedelta(days=1)
+        borne_sup = lendemain.strftime("%Y-%m-%d")
+    return borne_inf, borne_sup
+
+
+class StockInsuffisant(sqlite3.IntegrityError):
+    """Une SORTIE depasse le stock du produit (traitee comme une contrainte)"""
+
+
+def _inserer_mouvement(cur: sqlite3.Cursor, ligne: tuple) -> int:
+    """
+    Insere un mouvement et applique sa quantite au stock du produit, dans la
+    transaction en cours (partage par creer_mouvement et la file de groupage)
+    Une SORTIE n'est appliquee que si le stock suffit, verifie par l'UPDATE
+    lui-meme : deux sorties concurrentes ne peuvent pas rendre le stock negatif.
+
+    Args:
+        cur (sqlite3.Cursor): Curseur de la connexion d'ecriture
+        ligne (tuple): (produit_id, type_mouvement, quantite, motif,
+                        utilisateur, date_mouvement, remarques)
+
+    Returns:
+        int: ID du mouvement cree
+
+    Raises:
+        StockInsuffisant: Si le stock est inferieur a la quantite sortie
+        sqlite3.Error: Produit inexistant, quantite invalide, ...
+    """
+    cur.execute(
+        """
+        INSERT INTO mouvements_stock (produit_id, type_mouvement, quantite,
+                                      motif, utilisateur, date_mouvement,
+                                      remarques)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """,
+        ligne,
+    )
+    mouvement_id = cur.lastrowid
+
+    produit_id, type_mouvement, quantite = ligne[:3]
+    if type_mouvement == "ENTREE":
+        cur.execute(
+            """
+            UPDATE produits
+            SET stock_actuel = stock_actuel + ?, version = version + 1
+            WHERE produit_id = ?
+        """,
+            (quantite, produit_id),
+        )
+    else:  # SORTIE
+        cur.execute(
+            """
+            UPDATE produits
+            SET stock_actuel = stock_actuel - ?, version = version + 1
+            WHERE produit_id = ? AND stock_actuel >= ?
+        """,
+            (quantite, produit_id, quantite),
+        )
+        # Le produit existe (cle etrangere de l'INSERT) : le stock manque
+        if cur.rowcount == 0:
+            raise StockInsuffisant(
+                f"Stock insuffisant pour le produit {produit_id}"
+                f" (sortie de {quantite})"
+            )
+    return mouvement_id
 
 
 def creer_mouvement(
@@ -14,6 +165,9 @@ def creer_mouvement(
 ) -> int | None:
     """
     Enregistre un mouvement de stock et met a jour le stock du produit
+    Une SORTIE superieure au stock est refusee (None).
+    Note: une transaction par appel ; pour de nombreux appels concurrents,
+    soumettre_mouvement() regroupe les ecritures
 
     Args:
         produit_id (int): ID du produit concerne
@@ -26,27 +180,18 @@ def creer_mouvement(
     Returns:
         int: ID du mouvement cree ou None si erreur
     """
-    connexion = obtenir_connexion()
-    try:
-        cur = connexion.cursor()
-        date_actuelle = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-        # Verifier que le type est valide
-        if type_mouvement not in ["ENTREE", "SORTIE"]:
-            print("Erreur: Type de mouvement invalide (doit etre 'ENTREE' ou 'SORTIE')")
-            return None
+    with connexion_ecriture() as connexion:
+        try:
+            date_actuelle = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-        # Commencer une transaction
-        cur.execute("BEGIN TRANSACTION")
+            # Verifier que le type est valide
+            if type_mouvement not in ["ENTREE", "SORTIE"]:
+                print(
+                    "Erreur: Type de mouvement invalide (doit etre 'ENTREE' ou 'SORTIE')"
+                )
+                return None
 
-        # Inserer le mouvement
-        cur.execute(
-            """
-            INSERT INTO mouvements_stock (produit_id, type_mouvement, quantite,
-                                         motif, utilisateur, date_mouvement, remarques)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """,
-            (
+            ligne = (
                 produit_id,
                 type_mouvement,
                 quantite,
@@ -54,62 +199,244 @@ def creer_mouvement(
                 utilisateur,
                 date_actuelle,
                 remarques,
-            ),
+            )
+            mouvement_id = executer_transaction(
+                connexion, lambda cur: _inserer_mouvement(cur, ligne)
+            )
+            publier(MOUVEMENT, CREATION, [mouvement_id])
+            publier(PRODUIT, MODIFICATION, [produit_id], ["stock_actuel"])
+            return mouvement_id
+
+        except sqlite3.Error as e:
+            print(f"Erreur lors de la creation du mouvement: {e}")
+            connexion.rollback()
+            return None
+
+
+def est_entier(valeur) -> bool:
+    """Vrai pour un int (JSON 3) ; faux pour 1.5, "3" ou True"""
+    return isinstance(valeur, int) and not isinstance(valeur, bool)
+
+
+def _valider_mouvement_lot(mouvement: dict, date_actuelle: str) -> tuple:
+    """
+    Valide un mouvement d'un lot et le convertit en ligne d'insertion
+
+    Args:
+        mouvement (dict): {produit_id, type_mouvement, quantite, motif,
+                           utilisateur, remarques, date_mouvement} ; seuls les
+                           trois premiers champs sont obligatoires
+        date_actuelle (str): Date utilisee si date_mouvement est absente
+
+    Returns:
+        tuple: Valeurs dans l'ordre des colonnes de l'INSERT
+
+    Raises:
+        ValueError: Si le mouvement est invalide
+    """
+    if not isinstance(mouvement, dict):
+        raise ValueError("le mouvement doit etre un objet")
+    try:
+        produit_id = mouvement["produit_id"]
+        quantite = mouvement["quantite"]
+        type_mouvement = mouvement["type_mouvement"]
+    except KeyError as e:
+        raise ValueError(f"champ manquant: {e.args[0]}") from None
+    # Pas de conversion : 1.5 serait tronque et "3" accepte en silence
+    if not est_entier(produit_id) or not est_entier(quantite):
+        raise ValueError("produit_id et quantite doivent etre des entiers")
+
+    if type_mouvement not in ["ENTREE", "SORTIE"]:
+        raise ValueError(
+            "type de mouvement invalide (doit etre 'ENTREE' ou 'SORTIE')"
+        )
+    if quantite <= 0:
+        raise ValueError("la quantite doit etre positive")
+    for champ in ("motif", "utilisateur", "remarques"):
+        valeur = mouvement.get(champ)
+        if valeur is not None and not isinstance(valeur, str):
+            raise ValueError(f"{champ} doit etre une chaine")
+
+    date_mouvement = mouvement.get("date_mouvement") or date_actuelle
+    if date_mouvement is not date_actuelle:
+        try:
+            # fromisoformat est bien plus rapide que strptime sur de gros lots
+            if len(date_mouvement) != 19:
+                raise ValueError
+            datetime.fromisoformat(date_mouvement)
+        except (TypeError, ValueError):
+            raise ValueError(
+                "date_mouvement doit etre au format YYYY-MM-DD HH:MM:SS"
+            ) from None
+
+    return (
+        produit_id,
+        type_mouvement,
+        quantite,
+        mouvement.get("motif", ""),
+        mouvement.get("utilisateur", ""),
+        date_mouvement,
+        mouvement.get("remarques", ""),
+    )
+
+
+def _stocks_produits(cur: sqlite3.Cursor, produit_ids: set[int]) -> dict[int, int]:
+    """Retourne {produit_id: stock_actuel} des produit_ids presents dans la table"""
+    ids = list(produit_ids)
+    stocks = {}
+    # Par tranches pour rester sous la limite de parametres de SQLite
+    for i in range(0, len(ids), 500):
+        tranche = ids[i : i + 500]
+        marques = ", ".join("?" * len(tranche))
+        cur.execute(
+            f"""
+            SELECT produit_id, stock_actuel FROM produits
+            WHERE produit_id IN ({marques})
+        """,
+            tranche,
+        )
+        stocks.update(
+            (row["produit_id"], row["stock_actuel"] or 0) for row in cur.fetchall()
         )
+    return stocks
+
 
-        mouvement_id = cur.lastrowid
-
-        # Mettre a jour le stock du produit
-        if type_mouvement == "ENTREE":
-            cur.execute(
-                """
-                UPDATE produits
-                SET stock_actuel = stock_actuel + ?
-                WHERE produit_id = ?
-            """,
-                (quantite, produit_id),
+def creer_mouvements_lot(mouvements: Iterable[dict]) -> dict:
+    """
+    Enregistre un lot de mouvements en une seule transaction
+    Les lignes invalides sont ecartees et signalees sans interrompre le lot,
+    de meme que les SORTIE superieures au stock a ce point du lot ; le stock
+    de chaque produit est mis a jour une seule fois (delta agrege).
+
+    Args:
+        mouvements (Iterable[dict]): Mouvements au format accepte par
+                                     creer_mouvement (cles du meme nom),
+                                     date_mouvement optionnelle
+
+    Returns:
+        dict: {inseres, mouvement_ids, erreurs} ou erreurs est une liste de
+              {index, erreur} (index = position dans le lot)
+    """
+    date_actuelle = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    lignes = []
+    indices = []
+    erreurs = []
+
+    for index, mouvement in enumerate(mouvements):
+        try:
+            lignes.append(_valider_mouvement_lot(mouvement, date_actuelle))
+            indices.append(index)
+        except ValueError as e:
+            erreurs.append({"index": index, "erreur": str(e)})
+
+    resultat = {"inseres": 0, "mouvement_ids": [], "erreurs": erreurs}
+    if not lignes:
+        return resultat
+
+    def ecrire(cur: sqlite3.Cursor) -> tuple:
+        # Stocks lus sous le verrou d'ecriture (BEGIN IMMEDIATE) : les
+        # mouvements sont verifies dans l'ordre du lot, comme des appels
+        # successifs a creer_mouvement
+        stocks = _stocks_produits(cur, {ligne[0] for ligne in lignes})
+        valides = []
+        refus = []
+        for index, ligne in zip(indices, lignes):
+            produit_id, type_mouvement, quantite = ligne[:3]
+            if produit_id not in stocks:
+                refus.append({"index": index, "erreur": "produit inexistant"})
+                continue
+            if type_mouvement == "ENTREE":
+                stocks[produit_id] += quantite
+            elif stocks[produit_id] >= quantite:
+                stocks[produit_id] -= quantite
+            else:
+                refus.append({"index": index, "erreur": "stock insuffisant"})
+                continue
+            valides.append(ligne)
+
+        cur.executemany(
+            """
+            INSERT INTO mouvements_stock (produit_id, type_mouvement, quantite,
+                                          motif, utilisateur, date_mouvement,
+                                          remarques)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+            valides,
+        )
+
+        # Un seul UPDATE par produit avec la somme des entrees et sorties ; un
+        # delta negatif reste conditionne au stock dans l'UPDATE lui-meme. Un
+        # delta nul met aussi a jour la version : le produit a des mouvements
+        # que la version lue avant le lot ne connait pas
+        deltas = defaultdict(int)
+        for produit_id, type_mouvement, quantite, *_ in valides:
+            if type_mouvement == "ENTREE":
+                deltas[produit_id] += quantite
+            else:  # SORTIE
+                deltas[produit_id] -= quantite
+        mises_a_jour = [
+            (delta, produit_id, delta, delta)
+            for produit_id, delta in deltas.items()
+        ]
+        cur.executemany(
+            """
+            UPDATE produits
+            SET stock_actuel = stock_actuel + ?, version = version + 1
+            WHERE produit_id = ? AND (? >= 0 OR stock_actuel + ? >= 0)
+        """,
+            mises_a_jour,
+        )
+        if cur.rowcount != len(mises_a_jour):
+            raise StockInsuffisant("Stock modifie pendant l'ecriture du lot")
+
+        # AUTOINCREMENT sous verrou d'ecriture : les ids du lot sont contigus
+        cur.execute("SELECT seq FROM sqlite_sequence WHERE name = 'mouvements_stock'")
+        sequence = cur.fetchone()
+        dernier_id = sequence["seq"] if sequence else 0
+        return valides, refus, deltas, dernier_id
+
+    with connexion_ecriture() as connexion:
+        try:
+            valides, refus, deltas, dernier_id = executer_transaction(
+                connexion, ecrire
             )
-        else:  # SORTIE
-            cur.execute(
-                """
-                UPDATE produits
-                SET stock_actuel = stock_actuel - ?
-                WHERE produit_id = ?
-            """,
-                (quantite, produit_id),
+            publier(
+                MOUVEMENT,
+                CREATION,
+                range(dernier_id - len(valides) + 1, dernier_id + 1),
             )
+            publier(PRODUIT, MODIFICATION, deltas, ["stock_actuel"])
 
-        connexion.commit()
-        return mouvement_id
+        except sqlite3.Error as e:
+            print(f"Erreur lors de la creation du lot de mouvements: {e}")
+            connexion.rollback()
+            erreurs.extend({"index": index, "erreur": str(e)} for index in indices)
+            erreurs.sort(key=lambda erreur: erreur["index"])
+            return resultat
 
-    except sqlite3.Error as e:
-        print(f"Erreur lors de la creation du mouvement: {e}")
-        connexion.rollback()
-        return None
+    erreurs.extend(refus)
+    erreurs.sort(key=lambda erreur: erreur["index"])
+    resultat["inseres"] = len(valides)
+    resultat["mouvement_ids"] = list(
+        range(dernier_id - len(valides) + 1, dernier_id + 1)
+    )
+    return resultat
 
 
 def obtenir_tous_mouvements() -> list[dict]:
     """
     Recupere tous les mouvements de stock
+    Note: charge tout l'historique en memoire, preferer obtenir_page_mouvements()
 
     Returns:
         list: Liste de tous les mouvements avec noms des produits
     """
-    connexion = obtenir_connexion()
-    try:
-        cur = connexion.cursor()
-        cur.execute(
-            """
-            SELECT m.*, p.nom as nom_produit
-            FROM mouvements_stock m
-            JOIN produits p ON m.produit_id = p.produit_id
-            ORDER BY m.date_mouvement DESC
-        """
-        )
-        return [dict(row) for row in cur.fetchall()]
-    except sqlite3.Error as e:
-        print(f"Erreur lors de la recuperation des mouvements: {e}")
-        return []
+    with connexion_lecture() as connexion:
+        try:
+            return _lire_mouvements(connexion, SELECT_MOUVEMENTS, [])
+        except sqlite3.Error as e:
+            print(f"Erreur lors de la recuperation des mouvements: {e}")
+            return []
 
 
 def obtenir_mouvements_produit(produit_id: int) -> list[dict]:
@@ -122,23 +449,14 @@ def obtenir_mouvements_produit(produit_id: int) -> list[dict]:
     Returns:
         list: Historique des mouvements du produit
     """
-    connexion = obtenir_connexion()
-    try:
-        cur = connexion.cursor()
-        cur.execute(
-            """
-            SELECT m.*, p.nom as nom_produit
-            FROM mouvements_stock m
-            JOIN produits p ON m.produit_id = p.produit_id
-            WHERE m.produit_id = ?
-            ORDER BY date_mouvement DESC
-        """,
-            (produit_id,),
-        )
-        return [dict(row) for row in cur.fetchall()]
-    except sqlite3.Error as e:
-        print(f"Erreur lors de la recuperation des mouvements: {e}")
-        return []
+    with connexion_lecture() as connexion:
+        try:
+            return _lire_mouvements(
+                connexion, SELECT_MOUVEMENTS + "WHERE m.produit_id = ?", [produit_id]
+            )
+        except sqlite3.Error as e:
+            print(f"Erreur lors de la recuperation des mouvements: {e}")
+            return []
 
 
 def obtenir_mouvements_par_date(date_debut: str, date_fin: str) -> list[dict]:
@@ -152,23 +470,19 @@ def obtenir_mouvements_par_date(date_debut: str, date_fin: str) -> list[dict]:
     Returns:
         list: Mouvements dans la plage specifiee
     """
-    connexion = obtenir_connexion()
-    try:
-        cur = connexion.cursor()
-        cur.execute(
-            """
-            SELECT m.*, p.nom as nom_produit
-            FROM mouvements_stock m
-            JOIN produits p ON m.produit_id = p.produit_id
-            WHERE DATE(m.date_mouvement) BETWEEN ? AND ?
-            ORDER BY m.date_mouvement DESC
-        """,
-            (date_debut, date_fin),
-        )
-        return [dict(row) for row in cur.fetchall()]
-    except sqlite3.Error as e:
-        print(f"Erreur lors de la recuperation des mouvements: {e}")
-        return []
+    borne_inf, borne_sup = _bornes_dates(date_debut, date_fin)
+    with connexion_lecture() as connexion:
+        try:
+            return _lire_mouvements(
+                connexion,
+                SELECT_MOUVEMENTS
+                + "WHERE m.date_mouvement >= ? AND m.date_mouvement < ?",
+                [borne_inf, borne_sup],
+                (borne_inf, borne_sup),
+            )
+        except sqlite3.Error as e:
+            print(f"Erreur lors de la recuperation des mouvements: {e}")
+            return []
 
 
 def obtenir_mouvements_par_type(type_mouvement: str) -> list[dict]:
@@ -181,20 +495,256 @@ def obtenir_mouvements_par_type(type_mouvement: str) -> list[dict]:
     Returns:
         list: Mouvements du type specifie
     """
-    connexion = obtenir_connexion()
-    try:
-        cur = connexion.cursor()
-        cur.execute(
-            """
-            SELECT m.*, p.nom as nom_produit
-            FROM mouvements_stock m
-            JOIN produits p ON m.produit_id = p.produit_id
-            WHERE m.type_mouvement = ?
-            ORDER BY m.date_mouvement DESC
-        """,
-            (type_mouvement,),
-        )
-        return [dict(row) for row in cur.fetchall()]
-    except sqlite3.Error as e:
-        print(f"Erreur lors de la recuperation des mouvements: {e}")
-        return []
+    with connexion_lecture() as connexion:
+        try:
+            return _lire_mouvements(
+                connexion,
+                SELECT_MOUVEMENTS + "WHERE m.type_mouvement = ?",
+                [type_mouvement],
+            )
+        except sqlite3.Error as e:
+            print(f"Erreur lors de la recuperation des mouvements: {e}")
+            return []
+
+
+def _filtres_mouvements(
+    produit_id: int | None,
+    type_mouvement: str | None,
+    date_debut: str | None,
+    date_fin: str | None,
+) -> tuple[list[str], list, tuple]:
+    """
+    Construit les conditions SQL (combinees par AND) des filtres fournis
+
+    Returns:
+        tuple: (conditions, valeurs des parametres, bornes de dates) ; les
+               bornes servent a choisir les archives a consulter
+    """
+    conditions = []
+    valeurs = []
+
+    if produit_id is not None:
+        conditions.append("m.produit_id = ?")
+        valeurs.append(produit_id)
+
+    if type_mouvement:
+        conditions.append("m.type_mouvement = ?")
+        valeurs.append(type_mouvement)
+
+    borne_inf, borne_sup = _bornes_dates(date_debut, date_fin)
+    if borne_inf:
+        conditions.append("m.date_mouvement >= ?")
+        valeurs.append(borne_inf)
+
+    if borne_sup:
+        conditions.append("m.date_mouvement < ?")
+        valeurs.append(borne_sup)
+
+    return conditions, valeurs, (borne_inf, borne_sup)
+
+
+def _page_mouvements(
+    conditions: list[str],
+    valeurs: list,
+    bornes: tuple,
+    limite: int,
+    curseur: str | None,
+) -> dict:
+    """
+    Execute une requete de mouvements paginee par cle (date_mouvement, mouvement_id)
+
+    Args:
+        conditions (list): Conditions SQL combinees par AND
+        valeurs (list): Parametres des conditions
+        bornes (tuple): Bornes de dates (borne_inf, borne_sup) des conditions
+        limite (int): Nombre maximal de mouvements dans la page
+        curseur (str): Jeton de la page precedente (None pour la premiere)
+
+    Returns:
+        dict: {mouvements, curseur_suivant} ; curseur_suivant vaut None
+              sur la derniere page
+    """
+    conditions = list(conditions)
+    valeurs = list(valeurs)
+
+    if curseur:
+        date_curseur, id_curseur = decoder_curseur(curseur, 2)
+        conditions.append("(m.date_mouvement, m.mouvement_id) < (?, ?)")
+        valeurs.extend([date_curseur, id_curseur])
+
+    clause_where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    with connexion_lecture() as connexion:
+        try:
+            # Une ligne de plus que demande indique s'il existe une page suivante
+            mouvements = _lire_mouvements(
+                connexion, SELECT_MOUVEMENTS + clause_where, valeurs, bornes, limite + 1
+            )
+        except sqlite3.Error as e:
+            print(f"Erreur lors de la recuperation des mouvements: {e}")
+            return {"mouvements": [], "curseur_suivant": None}
+
+    mouvements, curseur_suivant = paginer(
+        mouvements, limite, "date_mouvement", "mouvement_id"
+    )
+    return {"mouvements": mouvements, "curseur_suivant": curseur_suivant}
+
+
+def rechercher_mouvements(
+    produit_id: int | None = None,
+    type_mouvement: str | None = None,
+    date_debut: str | None = None,
+    date_fin: str | None = None,
+    limite: int = TAILLE_PAGE,
+    curseur: str | None = None,
+) -> dict:
+    """
+    Recherche paginee des mouvements combinant tous les filtres fournis
+    en une seule requete
+
+    Args:
+        produit_id (int): ID du produit (optionnel)
+        type_mouvement (str): 'ENTREE' ou 'SORTIE' (optionnel)
+        date_debut (str): Date de debut incluse, format YYYY-MM-DD (optionnel)
+        date_fin (str): Date de fin incluse, format YYYY-MM-DD (optionnel)
+        limite (int): Nombre de mouvements par page
+        curseur (str): Jeton retourne par la page precedente
+
+    Returns:
+        dict: {mouvements, curseur_suivant}
+
+    Raises:
+        ValueError: Si limite est inferieure a 1 ou le curseur invalide
+    """
+    verifier_limite(limite)
+    conditions, valeurs, bornes = _filtres_mouvements(
+        produit_id, type_mouvement, date_debut, date_fin
+    )
+    return _page_mouvements(conditions, valeurs, bornes, limite, curseur)
+
+
+def iterer_mouvements(
+    produit_id: int | None = None,
+    type_mouvement: str | None = None,
+    date_debut: str | None = None,
+    date_fin: str | None = None,
+    taille_lot: int = TAILLE_PAGE,
+) -> Iterator[dict]:
+    """
+    Parcourt les mouvements filtres (plus recents d'abord) sans tout charger
+    Les lignes sont lues par lots avec fetchmany ; la connexion de lecture
+    reste empruntee jusqu'a la fin (ou l'abandon) du parcours.
+
+    Args:
+        produit_id (int): ID du produit (optionnel)
+        type_mouvement (str): 'ENTREE' ou 'SORTIE' (optionnel)
+        date_debut (str): Date de debut incluse, format YYYY-MM-DD (optionnel)
+        date_fin (str): Date de fin incluse, format YYYY-MM-DD (optionnel)
+        taille_lot (int): Nombre de lignes lues a la fois
+
+    Yields:
+        dict: Un mouvement avec le nom du produit
+    """
+    verifier_limite(taille_lot, "taille_lot")
+    conditions, valeurs, bornes = _filtres_mouvements(
+        produit_id, type_mouvement, date_debut, date_fin
+    )
+    clause_where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    with connexion_lecture() as connexion:
+        groupes = groupes_archives(connexion, *bornes)
+        if len(groupes) == 1:
+            cur = connexion.cursor()
+            requete, valeurs = requete_groupe(
+                connexion, groupes[0], SELECT_MOUVEMENTS + clause_where, valeurs
+            )
+            cur.execute(f"{requete} {ORDRE_MOUVEMENTS}", valeurs)
+            while lignes := cur.fetchmany(taille_lot):
+                for row in lignes:
+                    yield dict(row)
+            return
+
+    # Trop d'archives pour une seule requete : parcours page par page (cle),
+    # chaque page fusionnant les groupes d'archives
+    curseur = None
+    while True:
+        page = _page_mouvements(conditions, valeurs, bornes, taille_lot, curseur)
+        yield from page["mouvements"]
+        curseur = page["curseur_suivant"]
+        if curseur is None:
+            return
+
+
+def obtenir_page_mouvements(
+    limite: int = TAILLE_PAGE, curseur: str | None = None
+) -> dict:
+    """
+    Recupere une page de l'historique des mouvements (plus recents d'abord)
+
+    Args:
+        limite (int): Nombre de mouvements par page
+        curseur (str): Jeton retourne par la page precedente
+
+    Returns:
+        dict: {mouvements, curseur_suivant}
+    """
+    return rechercher_mouvements(limite=limite, curseur=curseur)
+
+
+def obtenir_page_mouvements_produit(
+    produit_id: int, limite: int = TAILLE_PAGE, curseur: str | None = None
+) -> dict:
+    """
+    Recupere une page de l'historique des mouvements d'un produit
+
+    Args:
+        produit_id (int): ID du produit
+        limite (int): Nombre de mouvements par page
+        curseur (str): Jeton retourne par la page precedente
+
+    Returns:
+        dict: {mouvements, curseur_suivant}
+    """
+    return rechercher_mouvements(produit_id=produit_id, limite=limite, curseur=curseur)
+
+
+def obtenir_page_mouvements_par_date(
+    date_debut: str,
+    date_fin: str,
+    limite: int = TAILLE_PAGE,
+    curseur: str | None = None,
+) -> dict:
+    """
+    Recupere une page des mouvements dans une plage de dates
+
+    Args:
+        date_debut (str): Date de debut (format: YYYY-MM-DD)
+        date_fin (str): Date de fin (format: YYYY-MM-DD)
+        limite (int): Nombre de mouvements par page
+        curseur (str): Jeton retourne par la page precedente
+
+    Returns:
+        dict: {mouvements, curseur_suivant}
+    """
+    return rechercher_mouvements(
+        date_debut=date_debut, date_fin=date_fin, limite=limite, curseur=curseur
+    )
+
+
+def obtenir_page_mouvements_par_type(
+    type_mouvement: str, limite: int = TAILLE_PAGE, curseur: str | None = None
+) -> dict:
+    """
+    Recupere une page des mouvements d'un type specifique
+
+    Args:
+        type_mouvement (str): 'ENTREE' ou 'SORTIE'
+        limite (int): Nombre de mouvements par page
+        curseur (str): Jeton retourne par la page precedente
+
+    Returns:
+        dict: {mouvements, curseur_suivant}
+    """
+    return rechercher_mouvements(
+        type_mouvement=type_mouvement, limite=limite, curseur=curseur
+    )
@@ -1,7 +1,45 @@
+import re
 import sqlite3
+from collections.abc import Iterable, Iterator, Mapping
 from datetime import datetime
+from types import MappingProxyType
+
+from config.parametres import TAILLE_PAGE
+from database.evenements import (
+    CREATION,
+    MODIFICATION,
+    MOUVEMENT,
+    PRODUIT,
+    SUPPRESSION,
+    publier,
+)
+from database.gestionnaire_bd import (
+    connexion_ecriture,
+    connexion_lecture,
+    executer_transaction,
+)
+from database.pagination import decoder_curseur, paginer, verifier_limite
+from database.requetes.cache import ABSENT, cache_liste_produits, cache_produits
+
+# Champs texte d'un produit de lot (None accepte pour les optionnels)
+CHAMPS_TEXTE_PRODUIT = ("nom", "code_barre", "fournisseur", "description")
+
+
+def _expression_fts(terme_recherche: str) -> str | None:
+    """
+    Construit une expression MATCH FTS5 : chaque mot du terme devient un
+    prefixe entre guillemets ("mot"*), tous les mots doivent etre presents
+
+    Args:
+        terme_recherche (str): Terme saisi par l'utilisateur
 
-from database.gestionnaire_bd import obtenir_connexion
+    Returns:
+        str: Expression MATCH, ou None si le terme ne contient aucun mot
+    """
+    mots = re.findall(r"\w+", terme_recherche)
+    if not mots:
+        return None
+    return " ".join(f'"{mot}"*' for mot in mots)
 
 
 def creer_produit(
@@ -30,41 +68,232 @@ def creer_produit(
     Returns:
         int: ID du produit cree ou None si erreur
     """
-    connexion = obtenir_connexion()
-    try:
-        cur = connexion.cursor()
-        date_actuelle = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with connexion_ecriture() as connexion:
+        try:
+            cur = connexion.cursor()
+            date_actuelle = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+            cur.execute(
+                """
+                INSERT INTO produits (nom, categorie_id, code_barre, prix_unitaire,
+                                     stock_actuel, stock_minimum, fournisseur,
+                                     description, date_ajout)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+                (
+                    nom,
+                    categorie_id,
+                    code_barre,
+                    prix_unitaire,
+                    stock_actuel,
+                    stock_minimum,
+                    fournisseur,
+                    description,
+                    date_actuelle,
+                ),
+            )
+
+            connexion.commit()
+            publier(PRODUIT, CREATION, [cur.lastrowid])
+            return cur.lastrowid
+
+        except sqlite3.IntegrityError:
+            print("Erreur: Code barre deja utilise ou categorie invalide")
+            return None
+        except sqlite3.Error as e:
+            print(f"Erreur lors de la creation du produit: {e}")
+            connexion.rollback()
+            return None
+
+
+def _valider_produit_lot(produit: dict, date_actuelle: str) -> tuple:
+    """
+    Valide un produit d'un lot et le convertit en ligne d'insertion
+
+    Args:
+        produit (dict): Champs acceptes par creer_produit (nom et
+                        prix_unitaire obligatoires)
+        date_actuelle (str): Date d'ajout
+
+    Returns:
+        tuple: Valeurs dans l'ordre des colonnes de l'INSERT
+
+    Raises:
+        ValueError: Si le produit est invalide
+    """
+    if not isinstance(produit, dict):
+        raise ValueError("le produit doit etre un objet")
+    for champ in CHAMPS_TEXTE_PRODUIT:
+        valeur = produit.get(champ)
+        if valeur is not None and not isinstance(valeur, str):
+            raise ValueError(f"{champ} doit etre une chaine")
+
+    nom = (produit.get("nom") or "").strip()
+    if not nom:
+        raise ValueError("nom obligatoire")
 
+    try:
+        prix_unitaire = float(produit["prix_unitaire"])
+        stock_actuel = int(produit.get("stock_actuel") or 0)
+        stock_minimum = int(produit.get("stock_minimum") or 0)
+        categorie_id = produit.get("categorie_id")
+        categorie_id = int(categorie_id) if categorie_id not in (None, "") else None
+    except KeyError:
+        raise ValueError("champ manquant: prix_unitaire") from None
+    except (TypeError, ValueError):
+        raise ValueError("prix, stocks ou categorie_id non numeriques") from None
+
+    if prix_unitaire < 0:
+        raise ValueError("le prix unitaire doit etre positif")
+
+    return (
+        nom,
+        categorie_id,
+        produit.get("code_barre") or None,
+        prix_unitaire,
+        stock_actuel,
+        stock_minimum,
+        produit.get("fournisseur") or "",
+        produit.get("description") or "",
+        date_actuelle,
+    )
+
+
+def _valeurs_existantes(
+    cur: sqlite3.Cursor, table: str, colonne: str, valeurs: set
+) -> set:
+    """Retourne le sous-ensemble des valeurs deja presentes dans table.colonne"""
+    valeurs = list(valeurs)
+    existantes = set()
+    # Par tranches pour rester sous la limite de parametres de SQLite
+    for i in range(0, len(valeurs), 500):
+        tranche = valeurs[i : i + 500]
+        marques = ", ".join("?" * len(tranche))
         cur.execute(
+            f"SELECT {colonne} FROM {table} WHERE {colonne} IN ({marques})",
+            tranche,
+        )
+        existantes.update(row[0] for row in cur.fetchall())
+    return existantes
+
+
+def creer_produits_lot(produits: Iterable[dict]) -> dict:
+    """
+    Ajoute un lot de produits en une seule transaction
+    Les lignes invalides (champs, code barre deja utilise, categorie
+    inexistante) sont ecartees et signalees sans interrompre le lot.
+
+    Args:
+        produits (Iterable[dict]): Produits au format accepte par creer_produit
+
+    Returns:
+        dict: {inseres, produit_ids, erreurs} ou erreurs est une liste de
+              {index, erreur} (index = position dans le lot)
+    """
+    date_actuelle = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    lignes = []
+    indices = []
+    erreurs = []
+
+    for index, produit in enumerate(produits):
+        try:
+            lignes.append(_valider_produit_lot(produit, date_actuelle))
+            indices.append(index)
+        except ValueError as e:
+            erreurs.append({"index": index, "erreur": str(e)})
+
+    resultat = {"inseres": 0, "produit_ids": [], "erreurs": erreurs}
+    if not lignes:
+        return resultat
+
+    def ecrire(cur: sqlite3.Cursor) -> tuple:
+        codes = {ligne[2] for ligne in lignes if ligne[2]}
+        codes_pris = _valeurs_existantes(cur, "produits", "code_barre", codes)
+        categories = {ligne[1] for ligne in lignes if ligne[1] is not None}
+        categories_existantes = _valeurs_existantes(
+            cur, "categories", "categorie_id", categories
+        )
+
+        valides = []
+        refus = []
+        for index, ligne in zip(indices, lignes):
+            if ligne[2] and ligne[2] in codes_pris:
+                refus.append({"index": index, "erreur": "code barre deja utilise"})
+            elif ligne[1] is not None and ligne[1] not in categories_existantes:
+                refus.append({"index": index, "erreur": "categorie invalide"})
+            else:
+                valides.append(ligne)
+                if ligne[2]:
+                    codes_pris.add(ligne[2])  # doublon dans le lot lui-meme
+
+        cur.executemany(
             """
             INSERT INTO produits (nom, categorie_id, code_barre, prix_unitaire,
                                  stock_actuel, stock_minimum, fournisseur,
                                  description, date_ajout)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
         """,
-            (
-                nom,
-                categorie_id,
-                code_barre,
-                prix_unitaire,
-                stock_actuel,
-                stock_minimum,
-                fournisseur,
-                description,
-                date_actuelle,
-            ),
+            valides,
         )
 
-        connexion.commit()
-        return cur.lastrowid
+        # AUTOINCREMENT sous verrou d'ecriture : les ids du lot sont contigus
+        cur.execute("SELECT seq FROM sqlite_sequence WHERE name = 'produits'")
+        sequence = cur.fetchone()
+        dernier_id = sequence["seq"] if sequence else 0
+        return valides, refus, dernier_id
+
+    with connexion_ecriture() as connexion:
+        try:
+            valides, refus, dernier_id = executer_transaction(connexion, ecrire)
+            publier(
+                PRODUIT, CREATION, range(dernier_id - len(valides) + 1, dernier_id + 1)
+            )
+
+        except sqlite3.Error as e:
+            print(f"Erreur lors de la creation du lot de produits: {e}")
+            connexion.rollback()
+            erreurs.extend({"index": index, "erreur": str(e)} for index in indices)
+            erreurs.sort(key=lambda erreur: erreur["index"])
+            return resultat
+
+    erreurs.extend(refus)
+    erreurs.sort(key=lambda erreur: erreur["index"])
+    resultat["inseres"] = len(valides)
+    resultat["produit_ids"] = list(range(dernier_id - len(valides) + 1, dernier_id + 1))
+    return resultat
+
+
+def obtenir_ids_par_code_barre(codes_barre: Iterable[str]) -> dict:
+    """
+    Resout des codes barre en produit_id via l'index UNIQUE
 
-    except sqlite3.IntegrityError:
-        print("Erreur: Code barre deja utilise ou categorie invalide")
-        return None
-    except sqlite3.Error as e:
-        print(f"Erreur lors de la creation du produit: {e}")
-        connexion.rollback()
-        return None
+    Args:
+        codes_barre (Iterable[str]): Codes barre a resoudre
+
+    Returns:
+        dict: {code_barre: produit_id} pour les codes connus
+    """
+    codes = list(set(codes_barre))
+    resultat = {}
+    with connexion_lecture() as connexion:
+        try:
+            cur = connexion.cursor()
+            for i in range(0, len(codes), 500):
+                tranche = codes[i : i + 500]
+                marques = ", ".join("?" * len(tranche))
+                cur.execute(
+                    f"""
+                    SELECT code_barre, produit_id FROM produits
+                    WHERE code_barre IN ({marques})
+                """,
+                    tranche,
+                )
+                resultat.update(
+                    (row["code_barre"], row["produit_id"]) for row in cur.fetchall()
+                )
+        except sqlite3.Error as e:
+            print(f"Erreur lors de la resolution des codes barre: {e}")
+    return resultat
 
 
 def obtenir_tous_produits() -> list[dict]:
@@ -74,81 +303,247 @@ def obtenir_tous_produits() -> list[dict]:
     Returns:
         list: Liste de tous les produits
     """
-    connexion = obtenir_connexion()
-    try:
+    with connexion_lecture() as connexion:
+        try:
+            cur = connexion.cursor()
+            cur.execute(
+                """
+                SELECT p.*, c.nom as nom_categorie
+                FROM produits p
+                LEFT JOIN categories c ON p.categorie_id = c.categorie_id
+                ORDER BY p.nom
+            """
+            )
+            produits = [dict(row) for row in cur.fetchall()]
+            return produits
+        except sqlite3.Error as e:
+            print(f"Erreur lors de la recuperation des produits: {e}")
+            return []
+
+
+def obtenir_liste_produits() -> tuple[Mapping, ...]:
+    """
+    Recupere la liste legere des produits (listes deroulantes), mise en cache
+    Partagee avec le cache sans copie, d'ou des lignes en lecture seule.
+
+    Returns:
+        tuple: ({produit_id, nom, code_barre}, ...) tries par nom
+    """
+    produits = cache_liste_produits.obtenir("tous")
+    if produits is not ABSENT:
+        return produits
+
+    generation = cache_liste_produits.generation
+    with connexion_lecture() as connexion:
+        try:
+            cur = connexion.cursor()
+            cur.execute(
+                "SELECT produit_id, nom, code_barre FROM produits ORDER BY nom"
+            )
+            produits = tuple(MappingProxyType(dict(row)) for row in cur.fetchall())
+            cache_liste_produits.placer("tous", produits, generation)
+            return produits
+        except sqlite3.Error as e:
+            print(f"Erreur lors de la recuperation des produits: {e}")
+            return ()
+
+
+def iterer_produits(
+    stock_faible: bool = False, taille_lot: int = TAILLE_PAGE
+) -> Iterator[dict]:
+    """
+    Parcourt les produits (tries par nom) sans tout charger en memoire
+    Les lignes sont lues par lots avec fetchmany ; la connexion de lecture
+    reste empruntee jusqu'a la fin (ou l'abandon) du parcours.
+
+    Args:
+        stock_faible (bool): Seulement les produits sous leur stock minimum,
+                             dans l'ordre de obtenir_produits_stock_faible()
+        taille_lot (int): Nombre de lignes lues a la fois
+
+    Yields:
+        dict: Un produit avec le nom de sa categorie
+    """
+    verifier_limite(taille_lot, "taille_lot")
+    if stock_faible:
+        filtre = """
+            WHERE p.stock_actuel < p.stock_minimum
+            ORDER BY (p.stock_actuel - p.stock_minimum)
+        """
+    else:
+        filtre = "ORDER BY p.nom"
+
+    with connexion_lecture() as connexion:
         cur = connexion.cursor()
         cur.execute(
-            """
+            f"""
             SELECT p.*, c.nom as nom_categorie
             FROM produits p
             LEFT JOIN categories c ON p.categorie_id = c.categorie_id
-            ORDER BY p.nom
+            {filtre}
         """
         )
-        produits = [dict(row) for row in cur.fetchall()]
-        return produits
-    except sqlite3.Error as e:
-        print(f"Erreur lors de la recuperation des produits: {e}")
-        return []
+        while lignes := cur.fetchmany(taille_lot):
+            for row in lignes:
+                yield dict(row)
 
 
-def obtenir_produit(produit_id: int) -> dict | None:
+def obtenir_page_produits(
+    recherche: str | None = None,
+    limite: int = TAILLE_PAGE,
+    curseur: str | None = None,
+) -> dict:
     """
-    Recupere un produit par son ID
+    Recupere une page de produits triee par nom, paginee par cle (nom, produit_id)
 
     Args:
-        produit_id (int): ID du produit
+        recherche (str): Terme a rechercher dans le nom ou le code barre
+        limite (int): Nombre de produits par page
+        curseur (str): Jeton retourne par la page precedente
 
     Returns:
-        dict: Donnees du produit ou None
+        dict: {produits, curseur_suivant} ; curseur_suivant vaut None
+              sur la derniere page
+
+    Raises:
+        ValueError: Si limite est inferieure a 1 ou le curseur invalide
     """
-    connexion = obtenir_connexion()
-    try:
-        cur = connexion.cursor()
-        cur.execute(
-            """
-            SELECT p.*, c.nom as nom_categorie
-            FROM produits p
-            LEFT JOIN categories c ON p.categorie_id = c.categorie_id
-            WHERE p.produit_id = ?
-        """,
-            (produit_id,),
+    verifier_limite(limite)
+    conditions = []
+    valeurs = []
+
+    if recherche:
+        expression = _expression_fts(recherche)
+        if expression is None:
+            return {"produits": [], "curseur_suivant": None}
+        conditions.append(
+            """p.produit_id IN (
+                SELECT rowid FROM produits_fts WHERE produits_fts MATCH ?
+            )"""
         )
-        row = cur.fetchone()
-        return dict(row) if row else None
-    except sqlite3.Error as e:
-        print(f"Erreur lors de la recuperation du produit: {e}")
-        return None
+        valeurs.append(expression)
+
+    if curseur:
+        nom_curseur, id_curseur = decoder_curseur(curseur, 2)
+        conditions.append("(p.nom, p.produit_id) > (?, ?)")
+        valeurs.extend([nom_curseur, id_curseur])
+
+    clause_where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    valeurs.append(limite + 1)
+
+    with connexion_lecture() as connexion:
+        try:
+            cur = connexion.cursor()
+            cur.execute(
+                f"""
+                SELECT p.*, c.nom as nom_categorie
+                FROM produits p
+                LEFT JOIN categories c ON p.categorie_id = c.categorie_id
+                {clause_where}
+                ORDER BY p.nom, p.produit_id
+                LIMIT ?
+            """,
+                valeurs,
+            )
+            produits = [dict(row) for row in cur.fetchall()]
+        except sqlite3.Error as e:
+            print(f"Erreur lors de la recuperation des produits: {e}")
+            return {"produits": [], "curseur_suivant": None}
+
+    produits, curseur_suivant = paginer(produits, limite, "nom", "produit_id")
+    return {"produits": produits, "curseur_suivant": curseur_suivant}
+
+
+def obtenir_produit(produit_id: int) -> dict | None:
+    """
+    Recupere un produit par son ID (mis en cache)
 
+    Args:
+        produit_id (int): ID du produit
 
-def rechercher_produits(terme_recherche: str) -> list[dict]:
+    Returns:
+        dict: Donnees du produit ou None
+    """
+    produit = cache_produits.obtenir(produit_id)
+    if produit is not ABSENT:
+        return produit
+
+    generation = cache_produits.generation
+    with connexion_lecture() as connexion:
+        try:
+            cur = connexion.cursor()
+            cur.execute(
+                """
+                SELECT p.*, c.nom as nom_categorie
+                FROM produits p
+                LEFT JOIN categories c ON p.categorie_id = c.categorie_id
+                WHERE p.produit_id = ?
+            """,
+                (produit_id,),
+            )
+            row = cur.fetchone()
+            if row is None:
+                return None
+            produit = dict(row)
+            cache_produits.placer(produit_id, produit, generation)
+            return produit
+        except sqlite3.Error as e:
+            print(f"Erreur lors de la recuperation du produit: {e}")
+            return None
+
+
+def rechercher_produits(
+    terme_recherche: str, limite: int = TAILLE_PAGE
+) -> list[dict]:
     """
-    Recherche des produits par nom ou code barre
+    Recherche des produits par nom, description, fournisseur ou code barre
+    Un code barre exact est resolu directement par l'index UNIQUE, sinon la
+    recherche plein texte (prefixes) classe les resultats par pertinence.
 
     Args:
         terme_recherche (str): Terme a rechercher
+        limite (int): Nombre maximal de resultats
 
     Returns:
-        list: Produits correspondants
+        list: Produits correspondants, les plus pertinents d'abord
     """
-    connexion = obtenir_connexion()
-    try:
-        cur = connexion.cursor()
-        terme = f"%{terme_recherche}%"
-        cur.execute(
-            """
-            SELECT p.*, c.nom as nom_categorie
-            FROM produits p
-            LEFT JOIN categories c ON p.categorie_id = c.categorie_id
-            WHERE p.nom LIKE ? OR p.code_barre LIKE ?
-            ORDER BY p.nom
-        """,
-            (terme, terme),
-        )
-        return [dict(row) for row in cur.fetchall()]
-    except sqlite3.Error as e:
-        print(f"Erreur lors de la recherche: {e}")
-        return []
+    verifier_limite(limite)
+    with connexion_lecture() as connexion:
+        try:
+            cur = connexion.cursor()
+            cur.execute(
+                """
+                SELECT p.*, c.nom as nom_categorie
+                FROM produits p
+                LEFT JOIN categories c ON p.categorie_id = c.categorie_id
+                WHERE p.code_barre = ?
+            """,
+                (terme_recherche.strip(),),
+            )
+            row = cur.fetchone()
+            if row:
+                return [dict(row)]
+
+            expression = _expression_fts(terme_recherche)
+            if expression is None:
+                return []
+
+            cur.execute(
+                """
+                SELECT p.*, c.nom as nom_categorie
+                FROM produits_fts f
+                JOIN produits p ON p.produit_id = f.rowid
+                LEFT JOIN categories c ON p.categorie_id = c.categorie_id
+                WHERE produits_fts MATCH ?
+                ORDER BY f.rank
+                LIMIT ?
+            """,
+                (expression, limite),
+            )
+            return [dict(row) for row in cur.fetchall()]
+        except sqlite3.Error as e:
+            print(f"Erreur lors de la recherche: {e}")
+            return []
 
 
 def obtenir_produits_par_categorie(categorie_id):
@@ -161,74 +556,107 @@ def obtenir_produits_par_categorie(categorie_id):
     Returns:
         list: Produits de la categorie
     """
-    connexion = obtenir_connexion()
-    try:
-        cur = connexion.cursor()
-        cur.execute(
-            """
-            SELECT * FROM produits
-            WHERE categorie_id = ?
-            ORDER BY nom
-        """,
-            (categorie_id,),
-        )
-        return [dict(row) for row in cur.fetchall()]
-    except sqlite3.Error as e:
-        print(f"Erreur lors de la recuperation des produits: {e}")
-        return []
-
-
-def modifier_produit(produit_id: int, **kwargs) -> bool:
+    with connexion_lecture() as connexion:
+        try:
+            cur = connexion.cursor()
+            cur.execute(
+                """
+                SELECT * FROM produits
+                WHERE categorie_id = ?
+                ORDER BY nom
+            """,
+                (categorie_id,),
+            )
+            return [dict(row) for row in cur.fetchall()]
+        except sqlite3.Error as e:
+            print(f"Erreur lors de la recuperation des produits: {e}")
+            return []
+
+
+def modifier_produit(
+    produit_id: int, version_attendue: int | None = None, **kwargs
+) -> bool:
     """
     Modifie un produit existant
 
+    Concurrence optimiste : avec version_attendue (colonne version lue avec le
+    produit), la modification est refusee si le produit a change depuis, par
+    exemple si un mouvement a modifie son stock. L'appelant relit alors le
+    produit et decide a nouveau. Elle est obligatoire pour modifier
+    stock_actuel : un stock ecrit a l'aveugle effacerait les mouvements
+    enregistres depuis la lecture.
+
     Args:
         produit_id (int): ID du produit a modifier
+        version_attendue (int): Version du produit lue avant la modification
+                                (sans verification si None, sauf pour
+                                stock_actuel)
         **kwargs: Champs a modifier (nom, prix_unitaire, stock_actuel, etc.)
 
     Returns:
-        bool: True si modification reussie, False sinon
+        bool: True si modification reussie, False sinon (produit introuvable
+              ou modifie depuis la lecture, stock_actuel sans version_attendue)
     """
-    connexion = obtenir_connexion()
-    try:
-        cur = connexion.cursor()
-
-        # Champs modifiables
-        champs_autorises = [
-            "nom",
-            "categorie_id",
-            "code_barre",
-            "prix_unitaire",
-            "stock_actuel",
-            "stock_minimum",
-            "fournisseur",
-            "description",
-        ]
-
-        champs_a_modifier = []
-        valeurs = []
-
-        for champ, valeur in kwargs.items():
-            if champ in champs_autorises:
-                champs_a_modifier.append(f"{champ} = ?")
-                valeurs.append(valeur)
-
-        if not champs_a_modifier:
-            return False
-
-        valeurs.append(produit_id)
-        requete = (
-            f"UPDATE produits SET {', '.join(champs_a_modifier)} WHERE produit_id = ?"
-        )
+    if "stock_actuel" in kwargs and version_attendue is None:
+        print("Erreur: version_attendue est obligatoire pour modifier stock_actuel")
+        return False
 
-        cur.execute(requete, valeurs)
-        connexion.commit()
-        return cur.rowcount > 0
+    with connexion_ecriture() as connexion:
+        try:
+            # Champs modifiables
+            champs_autorises = [
+                "nom",
+                "categorie_id",
+                "code_barre",
+                "prix_unitaire",
+                "stock_actuel",
+                "stock_minimum",
+                "fournisseur",
+                "description",
+            ]
+
+            champs_a_modifier = []
+            valeurs = []
+
+            for champ, valeur in kwargs.items():
+                if champ in champs_autorises:
+                    champs_a_modifier.append(f"{champ} = ?")
+                    valeurs.append(valeur)
+
+            if not champs_a_modifier:
+                return False
+
+            champs_a_modifier.append("version = version + 1")
+            valeurs.append(produit_id)
+            condition = "produit_id = ?"
+            if version_attendue is not None:
+                condition += " AND version = ?"
+                valeurs.append(version_attendue)
+            requete = f"""
+                UPDATE produits SET {', '.join(champs_a_modifier)}
+                WHERE {condition}
+            """
 
-    except sqlite3.Error as e:
-        print(f"Erreur lors de la modification du produit: {e}")
-        connexion.rollback()
-        return False
+            modifies = executer_transaction(
+                connexion, lambda cur: cur.execute(requete, valeurs).rowcount
+            )
+            if modifies > 0:
+                champs = [champ for champ in kwargs if champ in champs_autorises]
+                publier(PRODUIT, MODIFICATION, [produit_id], champs)
+            elif version_attendue is not None:
+                print(
+                    f"Erreur: Produit {produit_id} introuvable ou modifie depuis"
+                    f" sa lecture (version {version_attendue})"
+                )
+                # Une version en cache perimee (ecriture d'un autre processus)
+                # ne doit pas refaire echouer la prochaine tentative
+                cache_produits.invalider(produit_id)
+            return modifies > 0
+
+        except sqlite3.Error as e:
+            print(f"Erreur lors de la modification du produit: {e}")
+            connexion.rollback()
+            return False
 
 
 def supprimer_produit(produit_id: int) -> bool:
@@ -242,38 +670,73 @@ def supprimer_produit(produit_id: int) -> bool:
     Returns:
         bool: True si suppression reussie, False sinon
     """
-    connexion = obtenir_connexion()
-    try:
-        cur = connexion.cursor()
-        cur.execute("DELETE FROM produits WHERE produit_id = ?", (produit_id,))
-        connexion.commit()
-        return cur.rowcount > 0
-    except sqlite3.Error as e:
-        print(f"Erreur lors de la suppression du produit: {e}")
-        connexion.rollback()
-        return False
+    with connexion_ecriture() as connexion:
+        try:
+            cur = connexion.cursor()
+            # Mouvements supprimes en cascade (hors archives)
+            cur.execute(
+                "SELECT mouvement_id FROM mouvements_stock WHERE produit_id = ?",
+                (produit_id,),
+            )
+            mouvements = [row["mouvement_id"] for row in cur.fetchall()]
+            cur.execute("DELETE FROM produits WHERE produit_id = ?", (produit_id,))
+            connexion.commit()
+            if cur.rowcount > 0:
+                publier(PRODUIT, SUPPRESSION, [produit_id])
+                publier(MOUVEMENT, SUPPRESSION, mouvements)
+            return cur.rowcount > 0
+        except sqlite3.Error as e:
+            print(f"Erreur lors de la suppression du produit: {e}")
+            connexion.rollback()
+            return False
 
 
 def obtenir_produits_stock_faible() -> list[dict]:
     """
     Recupere tous les produits dont le stock est inferieur au minimum
+    Parcourt l'index partiel idx_produits_alerte : seuls les produits en alerte
+    sont lus, deja tries par ecart au seuil.
 
     Returns:
         list: Produits necessitant un reapprovisionnement
     """
-    connexion = obtenir_connexion()
-    try:
-        cur = connexion.cursor()
-        cur.execute(
+    with connexion_lecture() as connexion:
+        try:
+            cur = connexion.cursor()
+            cur.execute(
+                """
+                SELECT p.*, c.nom as nom_categorie
+                FROM produits p
+                LEFT JOIN categories c ON p.categorie_id = c.categorie_id
+                WHERE p.stock_actuel < p.stock_minimum
+                ORDER BY (p.stock_actuel - p.stock_minimum)
             """
-            SELECT p.*, c.nom as nom_categorie
-            FROM produits p
-            LEFT JOIN categories c ON p.categorie_id = c.categorie_id
-            WHERE p.stock_actuel < p.stock_minimum
-            ORDER BY (p.stock_actuel - p.stock_minimum)
-        """
-        )
-        return [dict(row) for row in cur.fetchall()]
-    except sqlite3.Error as e:
-        print(f"Erreur lors de la recuperation des produits a faible stock: {e}")
-        return []
+            )
+            return [dict(row) for row in cur.fetchall()]
+        except sqlite3.Error as e:
+            print(f"Erreur lors de la recuperation des produits a faible stock: {e}")
+            return []
+
+
+def compter_produits_stock_faible() -> int:
+    """
+    Compte les produits dont le stock est inferieur au minimum
+    (parcours de l'index partiel idx_produits_alerte uniquement)
+
+    Returns:
+        int: Nombre de produits en alerte
+    """
+    with connexion_lecture() as connexion:
+        try:
+            cur = connexion.cursor()
+            cur.execute(
+                """
+                SELECT COUNT(*) as alerte
+                FROM produits
+                WHERE stock_actuel < stock_minimum
+            """
+            )
+            return cur.fetchone()["alerte"]
+        except sqlite3.Error as e:
+            print(f"Erreur lors du comptage des produits a faible stock: {e}")
+            return 0
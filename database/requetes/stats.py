@@ -1,6 +1,13 @@
+import math
 import sqlite3
 
-from database.gestionnaire_bd import obtenir_connexion
+from database.gestionnaire_bd import connexion_ecriture, connexion_lecture
+from database.pagination import verifier_limite
+from database.schema import REQUETES_CALCUL_STATISTIQUES
+
+STATISTIQUES_VIDES = {"nombre_produits": 0, "valeur_totale": 0.0, "produits_alerte": 0}
+# Tolerance sur valeur_totale, cumulee en virgule flottante par les declencheurs
+TOLERANCE_VALEUR = 1e-6
 
 
 def obtenir_valeur_inventaire() -> float:
@@ -10,64 +17,177 @@ def obtenir_valeur_inventaire() -> float:
     Returns:
         float: Valeur totale (stock_actuel * prix_unitaire pour tous les produits)
     """
-    connexion = obtenir_connexion()
-    try:
-        cur = connexion.cursor()
-        cur.execute(
-            """
-            SELECT SUM(stock_actuel * prix_unitaire) as valeur_totale
-            FROM produits
-        """
-        )
-        resultat = cur.fetchone()
-        return resultat["valeur_totale"] if resultat["valeur_totale"] else 0.0
-    except sqlite3.Error as e:
-        print(f"Erreur lors du calcul de la valeur de l'inventaire: {e}")
-        return 0.0
+    return obtenir_statistiques_inventaire()["valeur_totale"]
 
 
 def obtenir_statistiques_inventaire() -> dict:
     """
     Recupere des statistiques generales sur l'inventaire
+    Lecture d'une seule ligne : les compteurs sont tenus a jour par les
+    declencheurs sur produits (voir la migration 4).
 
     Returns:
         dict: Dictionnaire avec nombre_produits, valeur_totale, produits_alerte
     """
-    connexion = obtenir_connexion()
-    try:
-        cur = connexion.cursor()
+    with connexion_lecture() as connexion:
+        try:
+            cur = connexion.cursor()
+            cur.execute(
+                """
+                SELECT nombre_produits, valeur_totale, produits_alerte
+                FROM statistiques_inventaire
+                WHERE statistique_id = 1
+            """
+            )
+            resultat = cur.fetchone()
+            if resultat is None:
+                return dict(STATISTIQUES_VIDES)
+            return dict(resultat)
+
+        except sqlite3.Error as e:
+            print(f"Erreur lors du calcul des statistiques: {e}")
+            return dict(STATISTIQUES_VIDES)
 
-        # Nombre total de produits
-        cur.execute("SELECT COUNT(*) as total FROM produits")
-        nombre_produits = cur.fetchone()["total"]
 
-        # Valeur totale
-        valeur_totale = obtenir_valeur_inventaire()
+def obtenir_statistiques_par_categorie() -> list[dict]:
+    """
+    Recupere les statistiques de l'inventaire ventilees par categorie
 
-        # Nombre de produits en alerte
-        cur.execute(
+    Returns:
+        list: [{categorie_id, nom_categorie, nombre_produits, valeur_totale,
+               produits_alerte}] ; categorie_id None = produits sans categorie
+    """
+    with connexion_lecture() as connexion:
+        try:
+            cur = connexion.cursor()
+            cur.execute(
+                """
+                SELECT NULLIF(s.categorie_id, 0) as categorie_id,
+                       c.nom as nom_categorie,
+                       s.nombre_produits, s.valeur_totale, s.produits_alerte
+                FROM statistiques_categories s
+                LEFT JOIN categories c ON s.categorie_id = c.categorie_id
+                WHERE s.nombre_produits > 0
+                ORDER BY c.nom
             """
-            SELECT COUNT(*) as alerte
-            FROM produits
-            WHERE stock_actuel < stock_minimum
+            )
+            return [dict(row) for row in cur.fetchall()]
+        except sqlite3.Error as e:
+            print(f"Erreur lors du calcul des statistiques par categorie: {e}")
+            return []
+
+
+def _statistiques_calculees(cur) -> tuple[dict, dict]:
+    """Recalcule les statistiques par parcours complet de produits"""
+    cur.execute(
         """
+        SELECT COALESCE(categorie_id, 0) as categorie_id, COUNT(*) as nombre_produits,
+               COALESCE(SUM(stock_actuel * prix_unitaire), 0) as valeur_totale,
+               COALESCE(SUM(stock_actuel < stock_minimum), 0) as produits_alerte
+        FROM produits
+        GROUP BY COALESCE(categorie_id, 0)
+    """
+    )
+    par_categorie = {row["categorie_id"]: dict(row) for row in cur.fetchall()}
+    globales = dict(STATISTIQUES_VIDES)
+    for ligne in par_categorie.values():
+        for cle in globales:
+            globales[cle] += ligne[cle]
+    return globales, par_categorie
+
+
+def _ecart(attendu: dict, materialise: dict | None) -> bool:
+    materialise = materialise or STATISTIQUES_VIDES
+    return (
+        attendu["nombre_produits"] != materialise["nombre_produits"]
+        or attendu["produits_alerte"] != materialise["produits_alerte"]
+        or not math.isclose(
+            attendu["valeur_totale"],
+            materialise["valeur_totale"],
+            rel_tol=TOLERANCE_VALEUR,
+            abs_tol=TOLERANCE_VALEUR,
         )
-        produits_alerte = cur.fetchone()["alerte"]
+    )
 
-        return {
-            "nombre_produits": nombre_produits,
-            "valeur_totale": valeur_totale,
-            "produits_alerte": produits_alerte,
-        }
 
-    except sqlite3.Error as e:
-        print(f"Erreur lors du calcul des statistiques: {e}")
-        return {"nombre_produits": 0, "valeur_totale": 0.0, "produits_alerte": 0}
+def verifier_statistiques() -> dict:
+    """
+    Compare les statistiques materialisees a un recalcul complet
+    Les valeurs sont cumulees en virgule flottante : une petite difference
+    d'arrondi sur valeur_totale (TOLERANCE_VALEUR) n'est pas une derive.
+
+    Returns:
+        dict: {"coherent": bool, "ecarts": [{categorie_id, attendu, materialise}]}
+              ; categorie_id None pour la ligne globale, 0 = sans categorie
+    """
+    with connexion_lecture() as connexion:
+        try:
+            cur = connexion.cursor()
+            globales, par_categorie = _statistiques_calculees(cur)
+
+            cur.execute(
+                """
+                SELECT nombre_produits, valeur_totale, produits_alerte
+                FROM statistiques_inventaire
+                WHERE statistique_id = 1
+            """
+            )
+            ligne = cur.fetchone()
+            materialisees = dict(ligne) if ligne else None
+
+            cur.execute("SELECT * FROM statistiques_categories")
+            categories = {row["categorie_id"]: dict(row) for row in cur.fetchall()}
+        except sqlite3.Error as e:
+            print(f"Erreur lors de la verification des statistiques: {e}")
+            return {"coherent": False, "ecarts": []}
+
+    ecarts = []
+    if _ecart(globales, materialisees):
+        ecarts.append(
+            {"categorie_id": None, "attendu": globales, "materialise": materialisees}
+        )
+    for categorie_id in sorted(par_categorie.keys() | categories.keys()):
+        attendu = par_categorie.get(categorie_id, {"categorie_id": categorie_id})
+        attendu = {**STATISTIQUES_VIDES, **attendu}
+        if _ecart(attendu, categories.get(categorie_id)):
+            ecarts.append(
+                {
+                    "categorie_id": categorie_id,
+                    "attendu": attendu,
+                    "materialise": categories.get(categorie_id),
+                }
+            )
+    return {"coherent": not ecarts, "ecarts": ecarts}
+
+
+def recalculer_statistiques() -> dict | None:
+    """
+    Reconstruit les statistiques materialisees a partir de la table produits
+    (reparation d'une derive signalee par verifier_statistiques())
+
+    Returns:
+        dict: Statistiques recalculees, None en cas d'erreur
+    """
+    with connexion_ecriture() as connexion:
+        try:
+            cur = connexion.cursor()
+            cur.execute("BEGIN TRANSACTION")
+            cur.execute("DELETE FROM statistiques_categories")
+            for requete in REQUETES_CALCUL_STATISTIQUES:
+                cur.execute(requete)
+            connexion.commit()
+        except sqlite3.Error as e:
+            print(f"Erreur lors du recalcul des statistiques: {e}")
+            connexion.rollback()
+            return None
+    return obtenir_statistiques_inventaire()
 
 
 def obtenir_mouvements_recents(limite: int = 10) -> list[dict]:
     """
     Recupere les mouvements les plus recents
+    Lit uniquement la base principale : les archives ne contiennent que des
+    mouvements plus anciens que les mois conserves.
 
     Args:
         limite (int): Nombre de mouvements a recuperer
@@ -75,20 +195,21 @@ def obtenir_mouvements_recents(limite: int = 10) -> list[dict]:
     Returns:
         list: Derniers mouvements
     """
-    connexion = obtenir_connexion()
-    try:
-        cur = connexion.cursor()
-        cur.execute(
-            """
-            SELECT m.*, p.nom as nom_produit
-            FROM mouvements_stock m
-            JOIN produits p ON m.produit_id = p.produit_id
-            ORDER BY m.date_mouvement DESC
-            LIMIT ?
-        """,
-            (limite,),
-        )
-        return [dict(row) for row in cur.fetchall()]
-    except sqlite3.Error as e:
-        print(f"Erreur lors de la recuperation des mouvements recents: {e}")
-        return []
+    verifier_limite(limite)
+    with connexion_lecture() as connexion:
+        try:
+            cur = connexion.cursor()
+            cur.execute(
+                """
+                SELECT m.*, p.nom as nom_produit
+                FROM mouvements_stock m
+                JOIN produits p ON m.produit_id = p.produit_id
+                ORDER BY m.date_mouvement DESC
+                LIMIT ?
+            """,
+                (limite,),
+            )
+            return [dict(row) for row in cur.fetchall()]
+        except sqlite3.Error as e:
+            print(f"Erreur lors de la recuperation des mouvements recents: {e}")
+            return []
@@ -37,3 +37,322 @@ TOUTES_LES_TABLES = {
     """,
 }
 
+
+# Tables d'un fichier d'archive de mouvements ({schema} = nom d'attache) :
+# memes colonnes que mouvements_stock, sans cle etrangere vers produits
+TABLES_ARCHIVE = [
+    """
+    CREATE TABLE IF NOT EXISTS {schema}.mouvements_stock (
+        mouvement_id INTEGER PRIMARY KEY,
+        produit_id INTEGER NOT NULL,
+        type_mouvement TEXT NOT NULL,
+        quantite INTEGER NOT NULL,
+        motif TEXT,
+        utilisateur TEXT,
+        date_mouvement TEXT NOT NULL,
+        remarques TEXT
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS {schema}.idx_mouvements_date
+    ON mouvements_stock(date_mouvement)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS {schema}.idx_mouvements_produit_date
+    ON mouvements_stock(produit_id, date_mouvement)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS {schema}.idx_mouvements_type_date
+    ON mouvements_stock(type_mouvement, date_mouvement)
+    """,
+]
+
+
+# Recalcul complet des statistiques materialisees a partir de produits
+# (remplissage initial par la migration 4 et reparation d'une derive)
+REQUETES_CALCUL_STATISTIQUES = [
+    """
+    INSERT OR REPLACE INTO statistiques_inventaire
+        (statistique_id, nombre_produits, valeur_totale, produits_alerte)
+    SELECT 1, COUNT(*),
+           COALESCE(SUM(stock_actuel * prix_unitaire), 0),
+           COALESCE(SUM(stock_actuel < stock_minimum), 0)
+    FROM produits
+    """,
+    """
+    INSERT OR REPLACE INTO statistiques_categories
+        (categorie_id, nombre_produits, valeur_totale, produits_alerte)
+    SELECT COALESCE(categorie_id, 0), COUNT(*),
+           COALESCE(SUM(stock_actuel * prix_unitaire), 0),
+           COALESCE(SUM(stock_actuel < stock_minimum), 0)
+    FROM produits
+    GROUP BY COALESCE(categorie_id, 0)
+    """,
+]
+
+
+# Migrations versionnees, suivies par PRAGMA user_version.
+# Chaque entree (version, description, requetes) est appliquee une seule fois,
+# dans l'ordre, par GestionnaireBD.initialiser_tables().
+# Note: SQLite ajoute implicitement le rowid en fin de chaque index, les index
+# sur date_mouvement sont donc aussi tries par mouvement_id.
+MIGRATIONS = [
+    (
+        1,
+        "index de l'historique des mouvements",
+        [
+            # obtenir_tous_mouvements / obtenir_mouvements_recents / par date
+            """
+            CREATE INDEX IF NOT EXISTS idx_mouvements_date
+            ON mouvements_stock(date_mouvement)
+            """,
+            # obtenir_mouvements_produit (filtre + tri)
+            """
+            CREATE INDEX IF NOT EXISTS idx_mouvements_produit_date
+            ON mouvements_stock(produit_id, date_mouvement)
+            """,
+            # obtenir_mouvements_par_type (filtre + tri)
+            """
+            CREATE INDEX IF NOT EXISTS idx_mouvements_type_date
+            ON mouvements_stock(type_mouvement, date_mouvement)
+            """,
+        ],
+    ),
+    (
+        2,
+        "index des produits par nom et par categorie",
+        [
+            # obtenir_tous_produits / rechercher_produits (ORDER BY nom)
+            """
+            CREATE INDEX IF NOT EXISTS idx_produits_nom
+            ON produits(nom)
+            """,
+            # obtenir_produits_par_categorie (filtre + tri)
+            """
+            CREATE INDEX IF NOT EXISTS idx_produits_categorie_nom
+            ON produits(categorie_id, nom)
+            """,
+        ],
+    ),
+    (
+        3,
+        "recherche plein texte des produits (FTS5)",
+        [
+            # Index externe : le texte reste dans produits, seul l'index est stocke
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS produits_fts USING fts5(
+                nom, description, fournisseur, code_barre,
+                content='produits', content_rowid='produit_id', prefix='2 3',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS produits_fts_insertion
+            AFTER INSERT ON produits BEGIN
+                INSERT INTO produits_fts(rowid, nom, description, fournisseur,
+                                         code_barre)
+                VALUES (new.produit_id, new.nom, new.description, new.fournisseur,
+                        new.code_barre);
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS produits_fts_suppression
+            AFTER DELETE ON produits BEGIN
+                INSERT INTO produits_fts(produits_fts, rowid, nom, description,
+                                         fournisseur, code_barre)
+                VALUES ('delete', old.produit_id, old.nom, old.description,
+                        old.fournisseur, old.code_barre);
+            END
+            """,
+            # Seules les colonnes indexees declenchent la mise a jour (pas le stock)
+            """
+            CREATE TRIGGER IF NOT EXISTS produits_fts_modification
+            AFTER UPDATE OF nom, description, fournisseur, code_barre
+            ON produits BEGIN
+                INSERT INTO produits_fts(produits_fts, rowid, nom, description,
+                                         fournisseur, code_barre)
+                VALUES ('delete', old.produit_id, old.nom, old.description,
+                        old.fournisseur, old.code_barre);
+                INSERT INTO produits_fts(rowid, nom, description, fournisseur,
+                                         code_barre)
+                VALUES (new.produit_id, new.nom, new.description, new.fournisseur,
+                        new.code_barre);
+            END
+            """,
+            # Indexe les produits deja presents
+            "INSERT INTO produits_fts(produits_fts) VALUES ('rebuild')",
+        ],
+    ),
+    (
+        4,
+        "statistiques d'inventaire materialisees (globales et par categorie)",
+        [
+            """
+            CREATE TABLE IF NOT EXISTS statistiques_inventaire (
+                statistique_id INTEGER PRIMARY KEY CHECK(statistique_id = 1),
+                nombre_produits INTEGER NOT NULL DEFAULT 0,
+                valeur_totale REAL NOT NULL DEFAULT 0,
+                produits_alerte INTEGER NOT NULL DEFAULT 0
+            )
+            """,
+            # categorie_id = 0 regroupe les produits sans categorie
+            """
+            CREATE TABLE IF NOT EXISTS statistiques_categories (
+                categorie_id INTEGER PRIMARY KEY,
+                nombre_produits INTEGER NOT NULL DEFAULT 0,
+                valeur_totale REAL NOT NULL DEFAULT 0,
+                produits_alerte INTEGER NOT NULL DEFAULT 0
+            )
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS statistiques_produit_insertion
+            AFTER INSERT ON produits BEGIN
+                UPDATE statistiques_inventaire SET
+                    nombre_produits = nombre_produits + 1,
+                    valeur_totale = valeur_totale
+                        + COALESCE(new.stock_actuel * new.prix_unitaire, 0),
+                    produits_alerte = produits_alerte
+                        + COALESCE(new.stock_actuel < new.stock_minimum, 0)
+                WHERE statistique_id = 1;
+                INSERT INTO statistiques_categories
+                    (categorie_id, nombre_produits, valeur_totale, produits_alerte)
+                VALUES (
+                    COALESCE(new.categorie_id, 0), 1,
+                    COALESCE(new.stock_actuel * new.prix_unitaire, 0),
+                    COALESCE(new.stock_actuel < new.stock_minimum, 0)
+                )
+                ON CONFLICT(categorie_id) DO UPDATE SET
+                    nombre_produits = nombre_produits + 1,
+                    valeur_totale = valeur_totale + excluded.valeur_totale,
+                    produits_alerte = produits_alerte + excluded.produits_alerte;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS statistiques_produit_suppression
+            AFTER DELETE ON produits BEGIN
+                UPDATE statistiques_inventaire SET
+                    nombre_produits = nombre_produits - 1,
+                    valeur_totale = valeur_totale
+                        - COALESCE(old.stock_actuel * old.prix_unitaire, 0),
+                    produits_alerte = produits_alerte
+                        - COALESCE(old.stock_actuel < old.stock_minimum, 0)
+                WHERE statistique_id = 1;
+                UPDATE statistiques_categories SET
+                    nombre_produits = nombre_produits - 1,
+                    valeur_totale = valeur_totale
+                        - COALESCE(old.stock_actuel * old.prix_unitaire, 0),
+                    produits_alerte = produits_alerte
+                        - COALESCE(old.stock_actuel < old.stock_minimum, 0)
+                WHERE categorie_id = COALESCE(old.categorie_id, 0);
+            END
+            """,
+            # Retire l'ancienne contribution du produit puis ajoute la nouvelle
+            """
+            CREATE TRIGGER IF NOT EXISTS statistiques_produit_modification
+            AFTER UPDATE OF stock_actuel, prix_unitaire, stock_minimum, categorie_id
+            ON produits BEGIN
+                UPDATE statistiques_inventaire SET
+                    valeur_totale = valeur_totale
+                        - COALESCE(old.stock_actuel * old.prix_unitaire, 0)
+                        + COALESCE(new.stock_actuel * new.prix_unitaire, 0),
+                    produits_alerte = produits_alerte
+                        - COALESCE(old.stock_actuel < old.stock_minimum, 0)
+                        + COALESCE(new.stock_actuel < new.stock_minimum, 0)
+                WHERE statistique_id = 1;
+                UPDATE statistiques_categories SET
+                    nombre_produits = nombre_produits - 1,
+                    valeur_totale = valeur_totale
+                        - COALESCE(old.stock_actuel * old.prix_unitaire, 0),
+                    produits_alerte = produits_alerte
+                        - COALESCE(old.stock_actuel < old.stock_minimum, 0)
+                WHERE categorie_id = COALESCE(old.categorie_id, 0);
+                INSERT INTO statistiques_categories
+                    (categorie_id, nombre_produits, valeur_totale, produits_alerte)
+                VALUES (
+                    COALESCE(new.categorie_id, 0), 1,
+                    COALESCE(new.stock_actuel * new.prix_unitaire, 0),
+                    COALESCE(new.stock_actuel < new.stock_minimum, 0)
+                )
+                ON CONFLICT(categorie_id) DO UPDATE SET
+                    nombre_produits = nombre_produits + 1,
+                    valeur_totale = valeur_totale + excluded.valeur_totale,
+                    produits_alerte = produits_alerte + excluded.produits_alerte;
+            END
+            """,
+            REQUETES_CALCUL_STATISTIQUES[0],
+            REQUETES_CALCUL_STATISTIQUES[1],
+        ],
+    ),
+    (
+        5,
+        "index partiel des produits en alerte de stock",
+        [
+            # Ne contient que les produits sous leur seuil, deja tries par ecart
+            """
+            CREATE INDEX IF NOT EXISTS idx_produits_alerte
+            ON produits(stock_actuel - stock_minimum)
+            WHERE stock_actuel < stock_minimum
+            """,
+        ],
+    ),
+    (
+        6,
+        "instantanes periodiques du stock par produit",
+        [
+            # stock = stock du produit a la fin de la journee date_instantane
+            """
+            CREATE TABLE IF NOT EXISTS instantanes_stock (
+                produit_id INTEGER NOT NULL,
+                date_instantane TEXT NOT NULL,
+                stock INTEGER NOT NULL,
+                PRIMARY KEY (produit_id, date_instantane),
+                FOREIGN KEY (produit_id) REFERENCES produits(produit_id)
+                    ON DELETE CASCADE
+            ) WITHOUT ROWID
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_instantanes_date
+            ON instantanes_stock(date_instantane)
+            """,
+            # Un mouvement saisi a posteriori corrige les instantanes deja pris
+            # a partir de sa date (aucun pour un mouvement du jour)
+            """
+            CREATE TRIGGER IF NOT EXISTS instantanes_mouvement_insertion
+            AFTER INSERT ON mouvements_stock BEGIN
+                UPDATE instantanes_stock
+                SET stock = stock + CASE new.type_mouvement
+                    WHEN 'ENTREE' THEN new.quantite ELSE -new.quantite END
+                WHERE produit_id = new.produit_id
+                  AND date_instantane >= substr(new.date_mouvement, 1, 10);
+            END
+            """,
+        ],
+    ),
+    (
+        7,
+        "registre des archives de mouvements",
+        [
+            # Une ligne par fichier d'archive (une annee de mouvements)
+            """
+            CREATE TABLE IF NOT EXISTS archives_mouvements (
+                nom TEXT PRIMARY KEY,
+                chemin TEXT NOT NULL,
+                date_debut TEXT NOT NULL,
+                date_fin TEXT NOT NULL,
+                nombre_mouvements INTEGER NOT NULL,
+                date_archivage TEXT NOT NULL
+            )
+            """,
+        ],
+    ),
+    (
+        8,
+        "version des produits (concurrence optimiste)",
+        [
+            # Incrementee par chaque UPDATE de produits (mouvements, modifications)
+            """
+            ALTER TABLE produits ADD COLUMN version INTEGER NOT NULL DEFAULT 0
+            """,
+        ],
+    ),
+]
@@ -1,6 +1,7 @@
 import tkinter as tk
 
 from database.gestionnaire_bd import obtenir_gestionnaire
+from database.requetes.instantanes import prendre_instantane_si_necessaire
 from ui.fenetre_principale import FenetrePrincipale
 
 
@@ -8,6 +9,13 @@ def main():
     # Initialise la base de donnees (creation des tables si necessaire)
     gestionnaire = obtenir_gestionnaire()
     print("Base de données initialisée avec succes")
+    for pragma, valeur in gestionnaire.rapport_pragmas().items():
+        print(f"  PRAGMA {pragma} = {valeur}")
+
+    # Instantane du stock de la derniere periode terminee, s'il manque
+    date_instantane = prendre_instantane_si_necessaire()
+    if date_instantane:
+        print(f"Instantane du stock enregistre pour le {date_instantane}")
 
     # Lancement de l'interface
     root = tk.Tk()
@@ -0,0 +1,16 @@
+import pytest
+
+from database import gestionnaire_bd
+from database.gestionnaire_bd import changer_base
+from database.requetes import activer_caches
+
+
+@pytest.fixture
+def base(tmp_path):
+    """Base vide et migree, installee comme base globale le temps du test"""
+    gestionnaire = changer_base(tmp_path / "test.db")
+    activer_caches(True)
+    yield gestionnaire
+    gestionnaire.fermer()
+    gestionnaire_bd._gestionnaire = None
+    activer_caches(True)
@@ -0,0 +1,99 @@
+import http.client
+import json
+import sqlite3
+import threading
+
+import pytest
+
+from api.serveur import creer_serveur
+from database.requetes import creer_categorie, creer_produit
+
+
+@pytest.fixture
+def client(base):
+    serveur = creer_serveur("127.0.0.1", 0, threads=2)
+    threading.Thread(target=serveur.serve_forever, daemon=True).start()
+    connexion = http.client.HTTPConnection(*serveur.server_address[:2], timeout=10)
+
+    def requete(methode: str, chemin: str, corps=None) -> tuple[int, object]:
+        contenu = None if corps is None else json.dumps(corps)
+        connexion.request(methode, chemin, body=contenu)
+        reponse = connexion.getresponse()
+        return reponse.status, json.loads(reponse.read())
+
+    yield requete
+    connexion.close()
+    serveur.shutdown()
+    serveur.server_close()
+
+
+def test_stock_voit_les_ecritures_des_autres_processus(base, client):
+    categorie_id = creer_categorie("API")
+    produit_id = creer_produit("Produit", 1.0, categorie_id, "4000", stock_actuel=10)
+    assert client("GET", f"/produits/{produit_id}/stock")[1]["stock"] == 10
+    assert client("GET", "/produits/code-barre/4000")[1]["stock_actuel"] == 10
+
+    # Sortie enregistree par un autre processus (application, CLI)
+    externe = sqlite3.connect(base.db_path)
+    with externe:
+        externe.execute(
+            "UPDATE produits SET stock_actuel = stock_actuel - 7 WHERE produit_id = ?",
+            (produit_id,),
+        )
+    externe.close()
+
+    assert client("GET", f"/produits/{produit_id}/stock")[1]["stock"] == 3
+    assert client("GET", "/produits/code-barre/4000")[1]["stock_actuel"] == 3
+
+
+@pytest.mark.parametrize(
+    "corps",
+    [
+        [{"code_barre": ["x"], "type_mouvement": "ENTREE", "quantite": 1}],
+        {"code_barre": {"a": 1}, "type_mouvement": "ENTREE", "quantite": 1},
+        [{"produit_id": 1, "type_mouvement": ["ENTREE"], "quantite": 1}],
+        [{"produit_id": 1, "type_mouvement": "ENTREE", "quantite": 1, "motif": {}}],
+    ],
+)
+def test_types_invalides_refuses_en_400(client, corps):
+    statut, reponse = client("POST", "/mouvements", corps)
+    assert statut == 400
+    assert "chaine" in reponse["erreur"]
+    # La connexion keep-alive reste utilisable
+    assert client("GET", "/sante") == (200, {"statut": "ok"})
+
+
+def test_erreur_inattendue_renvoie_500(client, monkeypatch):
+    def echec(chemin, requete, corps):
+        raise KeyError("bug")
+
+    monkeypatch.setattr("api.serveur.trouver_route", lambda m, c: (echec, {}))
+    statut, reponse = client("GET", "/sante")
+    assert statut == 500
+    assert "erreur" in reponse
+
+
+@pytest.mark.parametrize(
+    "methode, chemin",
+    [("POST", "/inconnu"), ("POST", "/sante"), ("GET", "/mouvements?limite=0")],
+)
+def test_connexion_reutilisable_apres_une_erreur(client, methode, chemin):
+    # Corps envoye sur une requete en erreur (404, 405, 400) de la meme connexion
+    statut, _ = client(methode, chemin, {"x": 1})
+    assert statut >= 400
+    assert client("GET", "/sante")[0] == 200
+
+
+@pytest.mark.parametrize("quantite", [1.5, "3", True, None])
+def test_quantite_non_entiere_refusee(client, quantite):
+    produit_id = creer_produit("Produit", 1.0, stock_actuel=10)
+    mouvement = {"produit_id": produit_id, "type_mouvement": "ENTREE"}
+
+    statut, _ = client("POST", "/mouvements", {**mouvement, "quantite": quantite})
+    assert statut == 400
+    lot = [{**mouvement, "quantite": 2}, {**mouvement, "quantite": quantite}]
+    statut, reponse = client("POST", "/mouvements", lot)
+    assert statut == 201
+    assert reponse["inseres"] == 1
+    assert [erreur["index"] for erreur in reponse["erreurs"]] == [1]
+    assert client("GET", f"/produits/{produit_id}/stock")[1]["stock"] == 12
@@ -0,0 +1,82 @@
+from datetime import date
+
+from database.archivage import archiver_mouvements
+from database.requetes import (
+    creer_categorie,
+    creer_mouvements_lot,
+    creer_produit,
+    obtenir_archives,
+    obtenir_page_mouvements,
+    obtenir_tous_mouvements,
+    prendre_instantane,
+    rechercher_mouvements,
+    stock_a_la_date,
+)
+from database.requetes.archives import MAX_ARCHIVES_ATTACHEES
+from database.requetes.mouvements import iterer_mouvements
+
+ANNEES = 12
+
+
+def _base_archivee(tmp_path) -> tuple[int, list[int]]:
+    """Un produit, une ENTREE de 1 le 15 janvier de chacune des ANNEES annees
+    passees et une aujourd'hui, puis archivage (un fichier par annee)"""
+    categorie_id = creer_categorie("Archives")
+    produit_id = creer_produit("Produit", 1.0, categorie_id)
+    annees = [date.today().year - ANNEES + i for i in range(ANNEES)]
+    resultat = creer_mouvements_lot(
+        [
+            {
+                "produit_id": produit_id,
+                "type_mouvement": "ENTREE",
+                "quantite": 1,
+                "date_mouvement": f"{annee}-01-15 10:00:00",
+            }
+            for annee in annees
+        ]
+        + [{"produit_id": produit_id, "type_mouvement": "ENTREE", "quantite": 1}]
+    )
+    assert resultat["inseres"] == ANNEES + 1
+    assert archiver_mouvements(mois_conserves=1, dossier=tmp_path / "archives")
+    assert len(obtenir_archives()) == ANNEES > MAX_ARCHIVES_ATTACHEES
+    return produit_id, annees
+
+
+def test_historique_complet_au_dela_des_bases_attachables(base, tmp_path):
+    _base_archivee(tmp_path)
+
+    tous = obtenir_tous_mouvements()
+    assert len(tous) == ANNEES + 1
+    cles = [(m["date_mouvement"], m["mouvement_id"]) for m in tous]
+    assert cles == sorted(cles, reverse=True)
+
+    assert len(obtenir_page_mouvements(limite=5)["mouvements"]) == 5
+    assert [m["mouvement_id"] for m in iterer_mouvements(taille_lot=4)] == [
+        m["mouvement_id"] for m in tous
+    ]
+
+
+def test_pagination_traverse_tous_les_groupes(base, tmp_path):
+    _base_archivee(tmp_path)
+
+    vus = []
+    curseur = None
+    while True:
+        page = rechercher_mouvements(limite=5, curseur=curseur)
+        vus.extend(m["mouvement_id"] for m in page["mouvements"])
+        curseur = page["curseur_suivant"]
+        if curseur is None:
+            break
+    assert len(vus) == ANNEES + 1
+    assert vus == [m["mouvement_id"] for m in obtenir_tous_mouvements()]
+
+
+def test_stock_a_la_date_dans_les_anciennes_archives(base, tmp_path):
+    produit_id, annees = _base_archivee(tmp_path)
+
+    for rang, annee in enumerate(annees):
+        assert stock_a_la_date(produit_id, f"{annee}-06-30") == rang + 1
+    assert stock_a_la_date(produit_id, f"{annees[0] - 1}-12-31") == 0
+
+    assert prendre_instantane(f"{annees[0]}-01-15") == 1
+    assert stock_a_la_date(produit_id, f"{annees[0]}-01-15") == 1
@@ -0,0 +1,18 @@
+import pytest
+
+from database.requetes import creer_produit, obtenir_liste_produits
+
+
+def test_liste_produits_partagee_sans_copie(base):
+    creer_produit("B", 1.0, code_barre="7001")
+    creer_produit("A", 1.0, code_barre="7000")
+
+    produits = obtenir_liste_produits()
+    assert [p["nom"] for p in produits] == ["A", "B"]
+    # Succes du cache : meme objet, en lecture seule
+    assert obtenir_liste_produits() is produits
+    with pytest.raises(TypeError):
+        produits[0]["nom"] = "Z"
+
+    creer_produit("C", 1.0)
+    assert [p["nom"] for p in obtenir_liste_produits()] == ["A", "B", "C"]
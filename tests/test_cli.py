@@ -0,0 +1,73 @@
+import io
+import json
+import sqlite3
+
+import pytest
+
+import cli
+from database.requetes import creer_categorie, creer_produit, obtenir_produit
+
+
+@pytest.fixture
+def executer(base, monkeypatch):
+    """Lance cli.main et retourne (code de sortie, lignes JSON ecrites)"""
+
+    def executer(*arguments: str) -> tuple[int, list]:
+        sortie = io.StringIO()
+        monkeypatch.setattr(cli, "_sortie", sortie)
+        code = cli.main(list(arguments))
+        return code, [json.loads(ligne) for ligne in sortie.getvalue().splitlines()]
+
+    return executer
+
+
+def test_categories_obtenir_ecrit_un_objet(executer):
+    categorie_id = creer_categorie("Boissons", "Froides")
+
+    code, lignes = executer("categories", "obtenir", str(categorie_id))
+    assert code == 0
+    assert len(lignes) == 1
+    assert lignes[0]["categorie_id"] == categorie_id
+    assert lignes[0]["nom"] == "Boissons"
+    assert lignes[0]["description"] == "Froides"
+
+
+def test_categories_obtenir_inconnue(executer):
+    assert executer("categories", "obtenir", "999") == (1, [])
+
+
+@pytest.mark.parametrize(
+    "arguments",
+    [
+        ("produits", "lister", "--recherche", "x", "--limite", "0"),
+        ("mouvements", "lister", "--recents", "-1"),
+    ],
+)
+def test_limite_invalide_refusee(executer, arguments):
+    with pytest.raises(SystemExit) as erreur:
+        executer(*arguments)
+    assert erreur.value.code == 2
+
+
+def test_erreur_sqlite_pendant_le_parcours(executer, monkeypatch, capsys):
+    def iterer_produits(stock_faible=False):
+        yield {"produit_id": 1}
+        raise sqlite3.OperationalError("database disk image is malformed")
+
+    monkeypatch.setattr(cli, "iterer_produits", iterer_produits)
+
+    assert executer("produits", "lister") == (1, [{"produit_id": 1}])
+    assert "malformed" in capsys.readouterr().err
+
+
+def test_stock_modifie_sans_version_refuse(executer):
+    produit_id = creer_produit("A", 1.0, stock_actuel=5)
+
+    assert executer("produits", "modifier", str(produit_id), "--stock", "9") == (1, [])
+    assert obtenir_produit(produit_id)["stock_actuel"] == 5
+    version = str(obtenir_produit(produit_id)["version"])
+    code, _ = executer(
+        "produits", "modifier", str(produit_id), "--stock", "9", "--version", version
+    )
+    assert code == 0
+    assert obtenir_produit(produit_id)["stock_actuel"] == 9
@@ -0,0 +1,36 @@
+import sqlite3
+
+from database.evenements import PRODUIT, SuiviChangements
+from database.requetes import (
+    creer_categorie,
+    creer_produit,
+    obtenir_produit,
+    verifier_ecritures_externes,
+)
+
+
+def test_ecritures_externes_forcent_un_rechargement(base):
+    categorie_id = creer_categorie("Vues")
+    produit_id = creer_produit("Produit", 1.0, categorie_id, "5000", stock_actuel=10)
+    verifier_ecritures_externes()
+    suivi = SuiviChangements(PRODUIT)
+    assert obtenir_produit(produit_id)["stock_actuel"] == 10
+
+    # Les ecritures de ce processus passent par le flux de changements
+    creer_produit("Autre", 2.0, categorie_id, "5001")
+    assert not verifier_ecritures_externes()
+    assert len(suivi.recuperer()) == 1
+
+    # Sortie enregistree par un autre processus (API, CLI)
+    externe = sqlite3.connect(base.db_path)
+    with externe:
+        externe.execute(
+            "UPDATE produits SET stock_actuel = 3 WHERE produit_id = ?", (produit_id,)
+        )
+    externe.close()
+
+    assert verifier_ecritures_externes()
+    assert suivi.recuperer() is None
+    assert obtenir_produit(produit_id)["stock_actuel"] == 3
+    assert not verifier_ecritures_externes()
+    assert suivi.recuperer() == []
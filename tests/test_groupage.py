@@ -0,0 +1,53 @@
+import pytest
+
+from database.requetes import FileMouvements, creer_produit, obtenir_produit
+
+
+@pytest.fixture
+def file_mouvements(base):
+    # Delai long : toutes les demandes du test tombent dans le meme groupe
+    file_mouvements = FileMouvements(delai_ms=300, taille_max=10)
+    yield file_mouvements
+    file_mouvements.arreter()
+
+
+def test_demandes_simultanees_en_une_transaction(file_mouvements):
+    produit_id = creer_produit("A", 1.0, stock_actuel=0)
+
+    futures = [file_mouvements.soumettre(produit_id, "ENTREE", 2) for _ in range(5)]
+    ids = [future.result(timeout=5) for future in futures]
+
+    assert None not in ids
+    assert len(set(ids)) == 5
+    assert file_mouvements.transactions == 1
+    assert file_mouvements.mouvements == 5
+    assert obtenir_produit(produit_id)["stock_actuel"] == 10
+
+
+def test_mouvement_en_erreur_annule_seul(file_mouvements):
+    produit_id = creer_produit("A", 1.0, stock_actuel=3)
+
+    futures = [
+        file_mouvements.soumettre(produit_id, "SORTIE", 2),
+        file_mouvements.soumettre(produit_id, "SORTIE", 2),  # stock insuffisant
+        file_mouvements.soumettre(999, "ENTREE", 1),  # produit inexistant
+        file_mouvements.soumettre(produit_id, "ENTREE", 5),
+    ]
+    ids = [future.result(timeout=5) for future in futures]
+
+    assert ids[1] is None and ids[2] is None
+    assert ids[0] is not None and ids[3] is not None
+    assert file_mouvements.transactions == 1
+    assert obtenir_produit(produit_id)["stock_actuel"] == 6
+
+
+def test_groupes_limites_a_taille_max(base):
+    produit_id = creer_produit("A", 1.0)
+    file_mouvements = FileMouvements(delai_ms=300, taille_max=2)
+    try:
+        futures = [file_mouvements.soumettre(produit_id, "ENTREE", 1) for _ in range(5)]
+        assert None not in [future.result(timeout=5) for future in futures]
+    finally:
+        file_mouvements.arreter()
+    assert file_mouvements.transactions == 3
+    assert obtenir_produit(produit_id)["stock_actuel"] == 5
@@ -0,0 +1,79 @@
+from database import importation
+from database.requetes import creer_produit, obtenir_produit
+
+
+def test_categorie_non_creee_refuse_ses_lignes(base, tmp_path, monkeypatch):
+    fichier = tmp_path / "produits.csv"
+    fichier.write_text(
+        "nom,prix_unitaire,categorie\n"
+        "A,1.0,Boissons\n"
+        "B,abc,\n"
+        "C,2.0,\n"
+        "D,3.0,Boissons\n",
+        encoding="utf-8",
+    )
+    # Creation refusee (ex: categorie creee entre-temps par un autre processus)
+    monkeypatch.setattr(importation, "creer_categorie", lambda nom: None)
+
+    rapport = importation.importer_produits(fichier)
+    assert rapport["lignes"] == 4
+    assert rapport["importees"] == 1
+    assert rapport["nombre_erreurs"] == 3
+    assert [erreur["ligne"] for erreur in rapport["erreurs"]] == [1, 2, 4]
+    assert "Boissons" in rapport["erreurs"][0]["erreur"]
+    assert obtenir_produit(1)["nom"] == "C"
+
+
+def test_lignes_jsonl_invalides_signalees(base, tmp_path):
+    fichier = tmp_path / "produits.jsonl"
+    fichier.write_text(
+        '{"nom": "A", "prix_unitaire": 1.0}\n'
+        "[1, 2]\n"
+        '{"nom": 5, "prix_unitaire": 1.0}\n'
+        "{pas du json\n"
+        '{"nom": "B", "prix_unitaire": 1.0, "categorie": ["x"]}\n'
+        '{"nom": "C", "prix_unitaire": 2.0, "code_barre": 42}\n'
+        '{"nom": "D", "prix_unitaire": 3.0, "categorie": "Neuve"}\n',
+        encoding="utf-8",
+    )
+
+    rapport = importation.importer_produits(fichier)
+    assert rapport["lignes"] == 7
+    assert rapport["importees"] == 2
+    assert [erreur["ligne"] for erreur in rapport["erreurs"]] == [2, 3, 4, 5, 6]
+    assert "JSON invalide" in rapport["erreurs"][2]["erreur"]
+
+
+def test_mouvements_jsonl_invalides_signales(base, tmp_path):
+    produit_id = creer_produit("A", 1.0, code_barre="8000")
+    fichier = tmp_path / "mouvements.jsonl"
+    fichier.write_text(
+        '{"code_barre": "8000", "type_mouvement": "ENTREE", "quantite": 4}\n'
+        '"texte"\n'
+        '{"code_barre": [8000], "type_mouvement": "ENTREE", "quantite": 1}\n'
+        "{\n"
+        f'{{"produit_id": {produit_id}, "type_mouvement": "SORTIE", "quantite": 1}}\n',
+        encoding="utf-8",
+    )
+
+    rapport = importation.importer_mouvements(fichier)
+    assert rapport["importees"] == 2
+    assert [erreur["ligne"] for erreur in rapport["erreurs"]] == [2, 3, 4]
+    assert obtenir_produit(produit_id)["stock_actuel"] == 3
+
+
+def test_mouvements_csv_entiers_convertis(base, tmp_path):
+    produit_id = creer_produit("A", 1.0, code_barre="8100")
+    fichier = tmp_path / "mouvements.csv"
+    fichier.write_text(
+        "produit_id,code_barre,type_mouvement,quantite\n"
+        f"{produit_id},,ENTREE,5\n"
+        ",8100,SORTIE,2\n"
+        f"{produit_id},,ENTREE,1.5\n",
+        encoding="utf-8",
+    )
+
+    rapport = importation.importer_mouvements(fichier)
+    assert rapport["importees"] == 2
+    assert [erreur["ligne"] for erreur in rapport["erreurs"]] == [3]
+    assert obtenir_produit(produit_id)["stock_actuel"] == 3
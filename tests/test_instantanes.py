@@ -0,0 +1,85 @@
+import random
+from datetime import date, timedelta
+
+from database.requetes import (
+    creer_mouvements_lot,
+    creer_produit,
+    prendre_instantane,
+    stock_a_la_date,
+)
+
+STOCK_INITIAL = 50
+PREMIER_JOUR = date(2024, 1, 1)
+JOURS = 120
+# Journees verifiees : deux jours avant et apres la periode des mouvements
+JOURS_VERIFIES = [
+    (PREMIER_JOUR + timedelta(days=i)).isoformat() for i in range(-2, JOURS + 2)
+]
+
+
+def _generer_mouvements(produit_id: int) -> list[dict]:
+    """Mouvements aleatoires dans l'ordre chronologique, jamais sous zero"""
+    alea = random.Random(15)
+    stock = STOCK_INITIAL
+    mouvements = []
+    for i in range(JOURS):
+        jour = PREMIER_JOUR + timedelta(days=i)
+        for heure in sorted(alea.sample(range(24), alea.randint(0, 3))):
+            if alea.random() < 0.5 and stock:
+                type_mouvement, quantite = "SORTIE", alea.randint(1, stock)
+                stock -= quantite
+            else:
+                type_mouvement, quantite = "ENTREE", alea.randint(1, 30)
+                stock += quantite
+            mouvements.append(
+                {
+                    "produit_id": produit_id,
+                    "type_mouvement": type_mouvement,
+                    "quantite": quantite,
+                    "date_mouvement": f"{jour.isoformat()} {heure:02d}:30:00",
+                }
+            )
+    return mouvements
+
+
+def _grand_livre(mouvements: list[dict]) -> dict[str, int]:
+    """Stock en fin de journee, recalcule directement a partir des mouvements"""
+    stocks = {}
+    for jour in JOURS_VERIFIES:
+        stocks[jour] = STOCK_INITIAL + sum(
+            m["quantite"] if m["type_mouvement"] == "ENTREE" else -m["quantite"]
+            for m in mouvements
+            if m["date_mouvement"][:10] <= jour
+        )
+    return stocks
+
+
+def _verifier(produit_id: int, mouvements: list[dict]):
+    attendu = _grand_livre(mouvements)
+    obtenu = {jour: stock_a_la_date(produit_id, jour) for jour in attendu}
+    assert obtenu == attendu
+
+
+def test_stock_a_la_date_contre_grand_livre(base):
+    produit_id = creer_produit("A", 1.0, stock_actuel=STOCK_INITIAL)
+    mouvements = _generer_mouvements(produit_id)
+    resultat = creer_mouvements_lot(mouvements)
+    assert resultat["inseres"] == len(mouvements)
+
+    # Sans instantane : rejeu vers l'arriere depuis le stock actuel
+    _verifier(produit_id, mouvements)
+
+    # Rejeu depuis l'instantane precedent ou vers l'arriere depuis le suivant
+    assert prendre_instantane("2024-02-15") == 1
+    assert prendre_instantane("2024-03-31") == 1
+    _verifier(produit_id, mouvements)
+
+    # Mouvement saisi a posteriori : les instantanes suivants sont corriges
+    retard = {
+        "produit_id": produit_id,
+        "type_mouvement": "ENTREE",
+        "quantite": 9,
+        "date_mouvement": "2024-02-01 08:00:00",
+    }
+    assert creer_mouvements_lot([dict(retard)])["inseres"] == 1
+    _verifier(produit_id, mouvements + [retard])
@@ -0,0 +1,113 @@
+import sqlite3
+import threading
+
+import pytest
+
+from database.gestionnaire_bd import connexion_ecriture, executer_transaction
+from database.requetes import (
+    StockInsuffisant,
+    creer_mouvement,
+    creer_mouvements_lot,
+    creer_produit,
+    modifier_produit,
+    obtenir_mouvements_produit,
+    obtenir_produit,
+)
+from database.requetes.mouvements import _inserer_mouvement
+
+
+def test_sortie_superieure_au_stock_refusee(base):
+    produit_id = creer_produit("A", 1.0, stock_actuel=4)
+
+    assert creer_mouvement(produit_id, "SORTIE", 5) is None
+    assert creer_mouvement(produit_id, "SORTIE", 4) is not None
+    produit = obtenir_produit(produit_id)
+    assert produit["stock_actuel"] == 0
+    # Le mouvement refuse est annule avec sa transaction
+    assert [m["quantite"] for m in obtenir_mouvements_produit(produit_id)] == [4]
+
+
+def test_sortie_verifiee_contre_le_stock_de_la_base(base):
+    produit_id = creer_produit("A", 1.0, stock_actuel=10)
+    assert obtenir_produit(produit_id)["stock_actuel"] == 10  # mis en cache
+
+    # Sortie d'un autre processus entre la lecture et l'ecriture
+    externe = sqlite3.connect(base.db_path)
+    with externe:
+        externe.execute(
+            "UPDATE produits SET stock_actuel = 2 WHERE produit_id = ?", (produit_id,)
+        )
+    externe.close()
+
+    ligne = (produit_id, "SORTIE", 5, "", "", "2024-01-01 00:00:00", "")
+    with connexion_ecriture() as connexion:
+        with pytest.raises(StockInsuffisant):
+            executer_transaction(
+                connexion, lambda cur: _inserer_mouvement(cur, ligne), tentatives=1
+            )
+    assert creer_mouvement(produit_id, "SORTIE", 5) is None
+
+
+def test_sorties_concurrentes_sans_stock_negatif(base):
+    produit_id = creer_produit("A", 1.0, stock_actuel=10)
+    resultats = []
+
+    def sortir():
+        resultats.append(creer_mouvement(produit_id, "SORTIE", 3))
+
+    threads = [threading.Thread(target=sortir) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(resultat is not None for resultat in resultats) == 3
+    assert obtenir_produit(produit_id)["stock_actuel"] == 1
+
+
+def test_lot_de_delta_nul_change_la_version(base):
+    produit_id = creer_produit("A", 1.0, stock_actuel=5)
+    version = obtenir_produit(produit_id)["version"]
+
+    resultat = creer_mouvements_lot(
+        [
+            {"produit_id": produit_id, "type_mouvement": "ENTREE", "quantite": 3},
+            {"produit_id": produit_id, "type_mouvement": "SORTIE", "quantite": 3},
+        ]
+    )
+    assert resultat["inseres"] == 2
+    produit = obtenir_produit(produit_id)
+    assert produit["stock_actuel"] == 5
+    assert produit["version"] > version
+    # Version lue avant le lot : perimee
+    assert not modifier_produit(produit_id, version, stock_actuel=0)
+
+
+def test_lot_refus_par_ligne_et_deltas_agreges(base):
+    a = creer_produit("A", 1.0, stock_actuel=5)
+    b = creer_produit("B", 1.0, stock_actuel=1)
+
+    resultat = creer_mouvements_lot(
+        [
+            {"produit_id": a, "type_mouvement": "SORTIE", "quantite": 4},
+            {"produit_id": a, "type_mouvement": "SORTIE", "quantite": 2},
+            {"produit_id": a, "type_mouvement": "ENTREE", "quantite": 10},
+            {"produit_id": a, "type_mouvement": "SORTIE", "quantite": 2},
+            {"produit_id": b, "type_mouvement": "ENTREE", "quantite": 3},
+            {"produit_id": 999, "type_mouvement": "ENTREE", "quantite": 1},
+            {"produit_id": b, "type_mouvement": "RETOUR", "quantite": 1},
+            {"produit_id": b, "type_mouvement": "SORTIE", "quantite": 0},
+            {"produit_id": b, "type_mouvement": "SORTIE"},
+        ]
+    )
+
+    erreurs = {erreur["index"]: erreur["erreur"] for erreur in resultat["erreurs"]}
+    assert sorted(erreurs) == [1, 5, 6, 7, 8]
+    assert erreurs[1] == "stock insuffisant"  # 1 restant apres la premiere sortie
+    assert erreurs[5] == "produit inexistant"
+    assert resultat["inseres"] == 4
+    assert len(resultat["mouvement_ids"]) == 4
+    # 5 - 4 + 10 - 2 et 1 + 3
+    assert obtenir_produit(a)["stock_actuel"] == 9
+    assert obtenir_produit(b)["stock_actuel"] == 4
+    assert len(obtenir_mouvements_produit(a)) == 3
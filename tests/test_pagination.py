@@ -0,0 +1,30 @@
+import pytest
+
+from database.requetes import (
+    obtenir_mouvements_recents,
+    obtenir_page_produits,
+    rechercher_mouvements,
+    rechercher_produits,
+)
+
+
+@pytest.mark.parametrize(
+    "fonction",
+    [
+        rechercher_mouvements,
+        obtenir_page_produits,
+        obtenir_mouvements_recents,
+        lambda limite: rechercher_produits("x", limite),
+    ],
+)
+@pytest.mark.parametrize("limite", [0, -5])
+def test_limite_inferieure_a_un_refusee(base, fonction, limite):
+    with pytest.raises(ValueError, match="limite"):
+        fonction(limite=limite)
+
+
+def test_limite_un(base):
+    assert rechercher_mouvements(limite=1) == {
+        "mouvements": [],
+        "curseur_suivant": None,
+    }
@@ -0,0 +1,67 @@
+import sqlite3
+import threading
+
+from database.requetes import (
+    creer_categorie,
+    creer_mouvement,
+    creer_produit,
+    creer_produits_lot,
+    modifier_produit,
+    obtenir_produit,
+)
+
+
+def test_lot_ecarte_les_lignes_refusees(base):
+    categorie_id = creer_categorie("Lot")
+    creer_produit("Existant", 1.0, categorie_id, "6000")
+
+    resultat = creer_produits_lot(
+        [
+            {"nom": "A", "prix_unitaire": 1.0, "categorie_id": categorie_id},
+            {"nom": "B", "prix_unitaire": 1.0, "code_barre": "6000"},
+            {"nom": "C", "prix_unitaire": 1.0, "categorie_id": 999},
+            {"nom": "D", "prix_unitaire": 1.0, "code_barre": "6001"},
+            {"nom": "E", "prix_unitaire": 1.0, "code_barre": "6001"},
+        ]
+    )
+    assert resultat["inseres"] == 2
+    assert [erreur["index"] for erreur in resultat["erreurs"]] == [1, 2, 4]
+    assert len(resultat["produit_ids"]) == 2
+
+
+def test_lot_attend_un_autre_processus(base):
+    # Un autre processus tient le verrou d'ecriture un court instant
+    externe = sqlite3.connect(base.db_path, check_same_thread=False)
+    externe.execute("BEGIN IMMEDIATE")
+    threading.Timer(0.2, externe.commit).start()
+
+    resultat = creer_produits_lot([{"nom": "A", "prix_unitaire": 1.0}])
+    externe.close()
+    assert resultat["inseres"] == 1
+    assert resultat["erreurs"] == []
+
+
+def test_stock_modifiable_seulement_avec_version(base):
+    produit_id = creer_produit("A", 1.0, stock_actuel=5)
+    version = obtenir_produit(produit_id)["version"]
+
+    assert not modifier_produit(produit_id, stock_actuel=50)
+    assert obtenir_produit(produit_id)["stock_actuel"] == 5
+    assert modifier_produit(produit_id, version, stock_actuel=50)
+    assert obtenir_produit(produit_id)["stock_actuel"] == 50
+    # Les autres champs restent modifiables sans version
+    assert modifier_produit(produit_id, nom="B")
+
+
+def test_modification_refusee_si_version_perimee(base):
+    produit_id = creer_produit("A", 1.0, stock_actuel=5)
+    version = obtenir_produit(produit_id)["version"]
+
+    # Un mouvement modifie le produit apres sa lecture
+    creer_mouvement(produit_id, "SORTIE", 2)
+    assert not modifier_produit(produit_id, version, nom="B", stock_actuel=5)
+    produit = obtenir_produit(produit_id)
+    assert (produit["nom"], produit["stock_actuel"]) == ("A", 3)
+
+    assert modifier_produit(produit_id, produit["version"], nom="B")
+    assert obtenir_produit(produit_id)["version"] == produit["version"] + 1
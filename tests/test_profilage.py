@@ -0,0 +1,52 @@
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+
+from database.profilage import Profileur
+
+
+def test_inactif_par_defaut():
+    environnement = {
+        cle: valeur
+        for cle, valeur in os.environ.items()
+        if not cle.startswith("INVENTAIRE_PROFILAGE")
+    }
+    code = (
+        "from database.profilage import profileur as p;"
+        " print(p.actif, p.journaliser_parametres)"
+    )
+    sortie = subprocess.run(
+        [sys.executable, "-c", code],
+        env=environnement,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    assert sortie.split() == ["False", "False"]
+
+
+def _journal(tmp_path, **options) -> dict:
+    fichier = tmp_path / "lentes.jsonl"
+    profileur = Profileur(actif=True, seuil_ms=0, fichier=fichier, **options)
+    connexion = sqlite3.connect(":memory:")
+    connexion.execute("CREATE TABLE clients (nom TEXT, code TEXT)")
+    sql = "SELECT * FROM clients WHERE nom = ? AND code = ?"
+    profileur.enregistrer(connexion, sql, ("Dupont", "secret"), 5.0)
+    connexion.close()
+    return json.loads(fichier.read_text(encoding="utf-8"))
+
+
+def test_parametres_masques_dans_le_journal(tmp_path):
+    entree = _journal(tmp_path, journaliser_parametres=False)
+    assert entree["parametres"] == ["?", "?"]
+    assert "Dupont" not in json.dumps(entree)
+    assert entree["plan"]
+
+
+def test_parametres_journalises_sur_demande(tmp_path):
+    assert _journal(tmp_path, journaliser_parametres=True)["parametres"] == [
+        "Dupont",
+        "secret",
+    ]
@@ -0,0 +1,54 @@
+from database.gestionnaire_bd import connexion_lecture
+from database.requetes import (
+    creer_produit,
+    modifier_produit,
+    obtenir_page_produits,
+    rechercher_produits,
+    supprimer_produit,
+)
+
+
+def _trouves(terme: str) -> set[int]:
+    with connexion_lecture() as connexion:
+        cur = connexion.execute(
+            "SELECT rowid FROM produits_fts WHERE produits_fts MATCH ?",
+            (f'"{terme}"*',),
+        )
+        return {row[0] for row in cur.fetchall()}
+
+
+def _verifier_index():
+    """Compare l'index externe au contenu de produits (leve si desynchronise)"""
+    with connexion_lecture() as connexion:
+        connexion.execute(
+            "INSERT INTO produits_fts(produits_fts, rank) VALUES ('integrity-check', 1)"
+        )
+
+
+def test_index_suit_insertions_modifications_suppressions(base):
+    cafe = creer_produit(
+        "Café moulu", 4.5, code_barre="9001", fournisseur="Torrefacteur"
+    )
+    the = creer_produit("Thé vert", 3.0, description="Sachets")
+    assert _trouves("cafe") == {cafe}  # accents ignores
+    assert _trouves("sach") == {the}
+    assert _trouves("9001") == {cafe}
+    assert [p["produit_id"] for p in rechercher_produits("torref")] == [cafe]
+
+    modifier_produit(cafe, nom="Chocolat", code_barre="9002")
+    assert _trouves("cafe") == set()
+    assert _trouves("9001") == set()
+    assert _trouves("choc") == {cafe}
+    assert _trouves("torref") == {cafe}  # colonne inchangee toujours indexee
+    page = obtenir_page_produits(recherche="choc")
+    assert [p["produit_id"] for p in page["produits"]] == [cafe]
+
+    # Le stock ne fait pas partie de l'index
+    modifier_produit(the, stock_minimum=10)
+    assert _trouves("vert") == {the}
+
+    supprimer_produit(the)
+    assert _trouves("vert") == set()
+    assert _trouves("sach") == set()
+    assert rechercher_produits("vert") == []
+    _verifier_index()
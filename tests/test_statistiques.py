@@ -0,0 +1,85 @@
+import pytest
+
+from database.gestionnaire_bd import connexion_lecture
+from database.requetes import (
+    creer_categorie,
+    creer_mouvement,
+    creer_mouvements_lot,
+    creer_produit,
+    creer_produits_lot,
+    modifier_produit,
+    obtenir_produit,
+    recalculer_statistiques,
+    supprimer_categorie,
+    supprimer_produit,
+    verifier_statistiques,
+)
+
+
+def _materialisees() -> dict:
+    """Tables statistiques_* ; None = globales, lignes vides ignorees"""
+    with connexion_lecture() as connexion:
+        lignes = {
+            row["categorie_id"]: dict(row)
+            for row in connexion.execute("SELECT * FROM statistiques_categories")
+            if row["nombre_produits"]
+        }
+        row = connexion.execute(
+            "SELECT * FROM statistiques_inventaire WHERE statistique_id = 1"
+        ).fetchone()
+    lignes[None] = {**dict(row), "categorie_id": None, "statistique_id": None}
+    return lignes
+
+
+def _verifier_contre_recalcul():
+    assert verifier_statistiques() == {"coherent": True, "ecarts": []}
+    avant = _materialisees()
+    recalculer_statistiques()
+    apres = _materialisees()
+    assert avant.keys() == apres.keys()
+    for categorie_id, ligne in apres.items():
+        assert avant[categorie_id]["nombre_produits"] == ligne["nombre_produits"]
+        assert avant[categorie_id]["produits_alerte"] == ligne["produits_alerte"]
+        assert avant[categorie_id]["valeur_totale"] == pytest.approx(
+            ligne["valeur_totale"]
+        )
+
+
+def test_triggers_suivent_le_recalcul_complet(base):
+    fruits = creer_categorie("Fruits")
+    outils = creer_categorie("Outils")
+    _verifier_contre_recalcul()
+
+    pomme = creer_produit("Pomme", 0.5, fruits, stock_actuel=100, stock_minimum=20)
+    poire = creer_produit("Poire", 0.75, fruits, stock_actuel=5, stock_minimum=10)
+    marteau = creer_produit("Marteau", 12.9, outils, stock_actuel=3)
+    vrac = creer_produit("Vrac", 2.0, stock_actuel=7, stock_minimum=8)
+    creer_produits_lot(
+        [
+            {"nom": f"Vis {i}", "prix_unitaire": 0.1, "categorie_id": outils}
+            for i in range(5)
+        ]
+    )
+    _verifier_contre_recalcul()
+
+    # Stock (mouvements seuls et en lot), prix, seuil, categorie
+    creer_mouvement(pomme, "SORTIE", 90)
+    creer_mouvements_lot(
+        [
+            {"produit_id": poire, "type_mouvement": "ENTREE", "quantite": 20},
+            {"produit_id": vrac, "type_mouvement": "SORTIE", "quantite": 7},
+        ]
+    )
+    modifier_produit(marteau, prix_unitaire=15.0, stock_minimum=5)
+    modifier_produit(vrac, categorie_id=fruits)
+    version = obtenir_produit(poire)["version"]
+    modifier_produit(poire, version, stock_actuel=1, categorie_id=None)
+    # Modification sans effet sur les statistiques
+    modifier_produit(pomme, nom="Pomme rouge")
+    _verifier_contre_recalcul()
+
+    # Suppressions : produit, puis categorie (produits passes sans categorie)
+    supprimer_produit(marteau)
+    supprimer_categorie(fruits)
+    _verifier_contre_recalcul()
+    assert _materialisees()[0]["nombre_produits"] == 3
@@ -0,0 +1,134 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config.parametres import TAILLE_POOL_LECTURE
+
+# ---------- Paramètres ----------
+INTERVALLE_SONDAGE_MS = 30  # fréquence de relève des résultats par Tk
+
+# Pool de threads partagé par tous les écrans (une connexion de lecture par thread)
+_pool = None
+_verrou_pool = threading.Lock()
+
+
+def _obtenir_pool() -> ThreadPoolExecutor:
+    global _pool
+    with _verrou_pool:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(
+                max_workers=TAILLE_POOL_LECTURE, thread_name_prefix="requetes"
+            )
+        return _pool
+
+
+class ExecuteurRequetes:
+    """
+    Exécute les fonctions de database.requetes hors du thread Tk.
+
+    Les résultats sont remis au thread principal via after() : seul ce thread
+    touche aux widgets. Une nouvelle demande portant la même clé rend obsolète
+    la précédente, dont le résultat est ignoré (et l'exécution annulée si elle
+    n'a pas encore commencé).
+    """
+
+    def __init__(self, widget, sur_chargement=None):
+        """
+        Args:
+            widget: Widget propriétaire (résultats ignorés une fois détruit)
+            sur_chargement: Appelé avec True/False selon qu'une requête est en cours
+        """
+        self.widget = widget
+        self.sur_chargement = sur_chargement
+        self._resultats = queue.Queue()
+        self._generations = {}
+        self._futures = {}
+        self._sondage_actif = False
+
+    def soumettre(self, cle, fonction, *args, sur_resultat=None, sur_erreur=None):
+        """
+        Lance fonction(*args) dans le pool de threads.
+
+        Args:
+            cle: Identifiant de la demande (une seule demande active par clé)
+            fonction: Fonction à exécuter hors du thread Tk
+            sur_resultat: Appelé dans le thread Tk avec le résultat
+            sur_erreur: Appelé dans le thread Tk avec l'exception levée
+        """
+        generation = self._generations.get(cle, 0) + 1
+        self._generations[cle] = generation
+
+        precedente = self._futures.get(cle)
+        if precedente is not None:
+            precedente.cancel()
+
+        future = _obtenir_pool().submit(fonction, *args)
+        self._futures[cle] = future
+        future.add_done_callback(
+            lambda f: self._resultats.put(
+                (cle, generation, f, sur_resultat, sur_erreur)
+            )
+        )
+        self._signaler_chargement()
+        self._demarrer_sondage()
+
+    def annuler(self, cle=None):
+        """Rend obsolètes la demande de clé donnée, ou toutes les demandes."""
+        cles = [cle] if cle is not None else list(self._futures)
+        for c in cles:
+            future = self._futures.pop(c, None)
+            if future is not None:
+                future.cancel()
+            self._generations[c] = self._generations.get(c, 0) + 1
+        self._signaler_chargement()
+
+    def en_cours(self) -> bool:
+        return bool(self._futures)
+
+    # ---------- Remise des résultats dans le thread Tk ----------
+    def _demarrer_sondage(self):
+        if not self._sondage_actif:
+            self._sondage_actif = True
+            self.widget.after(INTERVALLE_SONDAGE_MS, self._sonder)
+
+    def _sonder(self):
+        if not self.widget.winfo_exists():
+            self.sur_chargement = None
+            self.annuler()
+            self._sondage_actif = False
+            return
+
+        try:
+            self._remettre_resultats()
+        finally:
+            self._signaler_chargement()
+            if self._futures:
+                self.widget.after(INTERVALLE_SONDAGE_MS, self._sonder)
+            else:
+                self._sondage_actif = False
+
+    def _remettre_resultats(self):
+        while True:
+            try:
+                cle, generation, future, sur_resultat, sur_erreur = (
+                    self._resultats.get_nowait()
+                )
+            except queue.Empty:
+                return
+
+            if future.cancelled() or self._generations.get(cle) != generation:
+                continue  # demande obsolète
+            self._futures.pop(cle, None)
+
+            erreur = future.exception()
+            if erreur is not None:
+                if sur_erreur:
+                    sur_erreur(erreur)
+                else:
+                    print(f"Erreur lors de la requete '{cle}': {erreur}")
+            elif sur_resultat:
+                sur_resultat(future.result())
+
+    def _signaler_chargement(self):
+        if self.sur_chargement:
+            self.sur_chargement(self.en_cours())
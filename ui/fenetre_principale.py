@@ -3,6 +3,8 @@ from ui.gestion_categories import GestionCategoriesFrame
 from ui.gestion_produits import GestionProduitsFrame
 from ui.gestion_Mouvement import GestionMouvementsFrame
 from ui.gestion_dashboard import DashboardFrame
+from ui.fenetre_profilage import FenetreProfilage
+from database.requetes.cache import verifier_ecritures_externes
 
 # ----------------- Variables Globales du Thème -----------------
 COULEUR_FOND_FENETRE = "#caf084"  #  Variable pour le fond général de la fenêtre
@@ -92,8 +94,11 @@ class FenetrePrincipale(tk.Frame):
 
         # Initialisation des composants
         self.vue_actuelle = None
+        self.vues = {}  # vues déjà construites, réutilisées à chaque affichage
         self.barre_navigation = self._creer_barre_navigation()
         self.conteneur_contenu = self._creer_conteneur_contenu()
+        self.fenetre_profilage = None
+        self.master.bind("<F12>", lambda e: self.afficher_profilage())
 
         # Affiche la vue par défaut
         self.afficher_vue("CATEGORIES")
@@ -110,13 +115,19 @@ class FenetrePrincipale(tk.Frame):
 
     # ---- Affiche la vue sélectionnée ----
     def afficher_vue(self, nom_vue):
-        self._detruire_vue_actuelle()
-        self._charger_nouvelle_vue(nom_vue)
-
-    # ---- Détruit la vue précédente ----
-    def _detruire_vue_actuelle(self):
+        vue = self.vues.get(nom_vue)
+        if vue is not None and vue is self.vue_actuelle:
+            return
+        self._masquer_vue_actuelle()
+        if vue is None:
+            self._charger_nouvelle_vue(nom_vue)
+        else:
+            self._reafficher_vue(vue)
+
+    # ---- Masque la vue précédente (gardée en mémoire) ----
+    def _masquer_vue_actuelle(self):
         if self.vue_actuelle:
-            self.vue_actuelle.destroy()
+            self.vue_actuelle.pack_forget()
 
     # ---- Charge la nouvelle vue ----
     def _charger_nouvelle_vue(self, nom_vue):
@@ -126,8 +137,27 @@ class FenetrePrincipale(tk.Frame):
             if classe_vue != tk.Frame
             else self._creer_vue_vide(nom_vue)
         )
+        vue.pack(fill="both", expand=True)
+        self.vues[nom_vue] = vue
+        self.vue_actuelle = vue
+
+    # ---- Réaffiche une vue existante, mise à jour des seuls changements ----
+    def _reafficher_vue(self, vue):
         vue.pack(fill="both", expand=True)
         self.vue_actuelle = vue
+        if hasattr(vue, "sur_affichage"):
+            # Ecritures d'un autre processus : les vues rechargent tout
+            verifier_ecritures_externes()
+            vue.sur_affichage()
+
+    # ---- Résumé du profilage des requêtes (F12) ----
+    def afficher_profilage(self):
+        fenetre = self.fenetre_profilage
+        if fenetre is not None and fenetre.winfo_exists():
+            fenetre.actualiser()
+            fenetre.lift()
+            return
+        self.fenetre_profilage = FenetreProfilage(self)
 
     # ---- Vue par défaut si non implémentée ----
     def _creer_vue_vide(self, nom_vue):
@@ -0,0 +1,68 @@
+import tkinter as tk
+from database.profilage import profileur
+
+# ---------- Thème ----------
+COULEUR_FOND = "#f7ffee"
+COULEUR_BOUTON = "#23B866"
+COULEUR_TEXTE_BOUTON = "white"
+COULEUR_BOUTON_ACTIVE = "#19A25C"
+
+POLICE_TEXTE = ("Consolas", 10)
+POLICE_BOUTON = ("Bahnschrift", 11, "bold")
+
+
+# ---------- Fenêtre du résumé de profilage ----------
+class FenetreProfilage(tk.Toplevel):
+    """Résumé des requêtes SQL profilées (ouverte par F12, sans redémarrage)."""
+
+    def __init__(self, master=None):
+        super().__init__(master, bg=COULEUR_FOND)
+        self.title("Profilage des requêtes")
+        self.geometry("1100x600")
+        self._creer_interface()
+        self.actualiser()
+
+    def _creer_interface(self):
+        barre = tk.Frame(self, bg=COULEUR_FOND)
+        barre.pack(fill="x", padx=10, pady=(10, 0))
+        for texte, commande in (
+            ("🔄 Actualiser", self.actualiser),
+            ("🗑 Réinitialiser", self.reinitialiser),
+        ):
+            tk.Button(
+                barre,
+                text=texte,
+                font=POLICE_BOUTON,
+                bg=COULEUR_BOUTON,
+                fg=COULEUR_TEXTE_BOUTON,
+                activebackground=COULEUR_BOUTON_ACTIVE,
+                relief="flat",
+                cursor="hand2",
+                command=commande,
+            ).pack(side="left", padx=(0, 10))
+
+        cadre = tk.Frame(self, bg=COULEUR_FOND)
+        cadre.pack(fill="both", expand=True, padx=10, pady=10)
+        self.texte = tk.Text(cadre, wrap="none", font=POLICE_TEXTE)
+        defilement_y = tk.Scrollbar(cadre, orient="vertical", command=self.texte.yview)
+        defilement_x = tk.Scrollbar(
+            cadre, orient="horizontal", command=self.texte.xview
+        )
+        self.texte.configure(
+            yscrollcommand=defilement_y.set, xscrollcommand=defilement_x.set
+        )
+        defilement_y.pack(side="right", fill="y")
+        defilement_x.pack(side="bottom", fill="x")
+        self.texte.pack(fill="both", expand=True)
+
+    def actualiser(self):
+        """Réaffiche les agrégats courants du profileur."""
+        self.texte.configure(state="normal")
+        self.texte.delete("1.0", "end")
+        self.texte.insert("1.0", profileur.formater_resume(limite=50))
+        self.texte.configure(state="disabled")
+
+    def reinitialiser(self):
+        """Repart de zéro (le journal des requêtes lentes est conservé)."""
+        profileur.reinitialiser()
+        self.actualiser()
@@ -1,13 +1,16 @@
 import tkinter as tk
+from datetime import datetime
+from functools import partial
 from tkinter import messagebox, ttk
+from database.evenements import MOUVEMENT, PRODUIT, SuiviChangements
 from database.requetes import (
     creer_mouvement,
-    obtenir_tous_mouvements,
-    obtenir_mouvements_produit,
-    obtenir_mouvements_par_date,
-    obtenir_mouvements_par_type,
-    obtenir_tous_produits,
+    obtenir_liste_produits,
+    obtenir_page_mouvements,
+    rechercher_mouvements,
 )
+from ui.executeur import ExecuteurRequetes
+from ui.table_virtuelle import TableVirtuelle
 
 # ---------- Variables Thématiques ----------
 COULEUR_FOND_FENETRE = "#f8ffe8"
@@ -27,8 +30,23 @@ class GestionMouvementsFrame(tk.Frame):
     def __init__(self, master=None):
         super().__init__(master, bg=COULEUR_FOND_FENETRE)
         self.pack(fill="both", expand=True)
+        self.executeur = ExecuteurRequetes(
+            self, sur_chargement=self._afficher_chargement
+        )
+        self.suivi = SuiviChangements(MOUVEMENT, PRODUIT)
         self.creer_interface()
-        self.charger_mouvements(obtenir_tous_mouvements())
+        self.recharger_mouvements()
+
+    def sur_affichage(self):
+        """Recharge les pages affichées seulement si elles ont pu changer."""
+        changements = self.suivi.recuperer()
+        if changements is None or any(c.entite == MOUVEMENT for c in changements):
+            self.table_virtuelle.rafraichir()
+            return
+        # Stock ou nom d'un produit affiché dans les pages en mémoire
+        produits = {c.id for c in changements}
+        if self.table_virtuelle.ids_en_memoire("produit_id", produits):
+            self.table_virtuelle.rafraichir()
 
     # ---------- Interface principale ----------
     def creer_interface(self):
@@ -42,7 +60,13 @@ class GestionMouvementsFrame(tk.Frame):
             text="Gestion des Mouvements",
             font=("Bahnschrift", 16, "bold"),
             bg=COULEUR_FOND_FENETRE,
-        ).pack(pady=15)
+        ).pack(pady=(15, 0))
+        self.label_chargement = tk.Label(self, text="", bg=COULEUR_FOND_FENETRE)
+        self.label_chargement.pack()
+
+    def _afficher_chargement(self, actif):
+        self.label_chargement.config(text="Chargement…" if actif else "")
+        self.config(cursor="watch" if actif else "")
 
     def creer_filtres(self):
         cadre_filtre = tk.Frame(self, bg=COULEUR_FOND_FENETRE)
@@ -127,7 +151,15 @@ class GestionMouvementsFrame(tk.Frame):
         )
         cadre_tableau = tk.Frame(self, bg=COULEUR_FOND_FENETRE)
         cadre_tableau.pack(fill="both", expand=True)
-        self.tree = ttk.Treeview(cadre_tableau, columns=colonnes, show="headings")
+        self.table_virtuelle = TableVirtuelle(
+            cadre_tableau,
+            colonnes,
+            convertir_ligne=self._convertir_mouvement,
+            cle_lignes="mouvements",
+            executeur=self.executeur,
+            bg=COULEUR_FOND_FENETRE,
+        )
+        self.tree = self.table_virtuelle.tree
 
         for col in colonnes:
             self.tree.heading(col, text=col)
@@ -135,28 +167,24 @@ class GestionMouvementsFrame(tk.Frame):
             ancrage = "center" if col in ("ID", "Quantité") else "w"
             self.tree.column(col, width=largeur, anchor=ancrage)
 
-        self.tree.pack(fill="both", expand=True, padx=20, pady=10)
+        self.table_virtuelle.pack(fill="both", expand=True, padx=20, pady=10)
 
     # ---------- Chargement des données ----------
-    def charger_mouvements(self, mouvements):
-        self.tree.delete(*self.tree.get_children())
-        mouvements_dict = [dict(m) for m in mouvements]
-
-        for m in mouvements_dict:
-            self.tree.insert(
-                "",
-                tk.END,
-                values=(
-                    m["mouvement_id"],
-                    m.get("nom_produit", "N/A"),
-                    m["type_mouvement"],
-                    m["quantite"],
-                    m.get("motif", ""),
-                    m.get("utilisateur", ""),
-                    m["date_mouvement"],
-                    m.get("remarques", ""),
-                ),
-            )
+    def recharger_mouvements(self, source_page=obtenir_page_mouvements):
+        """Affiche les mouvements de la source paginée donnée."""
+        self.table_virtuelle.definir_source(source_page)
+
+    def _convertir_mouvement(self, m):
+        return (
+            m["mouvement_id"],
+            m.get("nom_produit", "N/A"),
+            m["type_mouvement"],
+            m["quantite"],
+            m.get("motif", ""),
+            m.get("utilisateur", ""),
+            m["date_mouvement"],
+            m.get("remarques", ""),
+        )
 
     # ---------- Gestion des filtres ----------
     def appliquer_filtres(self):
@@ -165,23 +193,32 @@ class GestionMouvementsFrame(tk.Frame):
         date_fin = self.date_fin.get().strip()
         produit_id = self.produit_var.get().strip()
 
-        mouvements = obtenir_tous_mouvements()
-
+        pid = None
         if produit_id:
             try:
                 pid = int(produit_id)
-                mouvements = obtenir_mouvements_produit(pid)
             except ValueError:
                 messagebox.showwarning("Erreur", "L’ID du produit doit être un nombre.")
                 return
 
-        if type_filtre in ["ENTREE", "SORTIE"]:
-            mouvements = obtenir_mouvements_par_type(type_filtre)
-
-        if date_debut and date_fin:
-            mouvements = obtenir_mouvements_par_date(date_debut, date_fin)
-
-        self.charger_mouvements(mouvements)
+        for date in (date_debut, date_fin):
+            if date:
+                try:
+                    datetime.strptime(date, "%Y-%m-%d")
+                except ValueError:
+                    messagebox.showwarning(
+                        "Erreur", "Les dates doivent être au format AAAA-MM-JJ."
+                    )
+                    return
+
+        source = partial(
+            rechercher_mouvements,
+            produit_id=pid,
+            type_mouvement=type_filtre if type_filtre in ["ENTREE", "SORTIE"] else None,
+            date_debut=date_debut or None,
+            date_fin=date_fin or None,
+        )
+        self.recharger_mouvements(source)
 
     # ---------- Dialogue d’ajout ----------
     def ouvrir_dialogue_ajout(self):
@@ -197,7 +234,7 @@ class GestionMouvementsFrame(tk.Frame):
 
     def _remplir_dialogue(self, cadre, dialogue):
         try:
-            produits = obtenir_tous_produits()
+            produits = obtenir_liste_produits()
         except Exception:
             produits = []
 
@@ -263,7 +300,7 @@ class GestionMouvementsFrame(tk.Frame):
             return
 
         try:
-            creer_mouvement(
+            mouvement_id = creer_mouvement(
                 produit_id,
                 type_mouv,
                 quantite,
@@ -271,8 +308,15 @@ class GestionMouvementsFrame(tk.Frame):
                 vars_mouv["utilisateur"].get(),
                 vars_mouv["remarques"].get(),
             )
+            if mouvement_id is None:
+                # Refusé par la base, le plus souvent une sortie supérieure au stock
+                messagebox.showwarning(
+                    "Mouvement refusé",
+                    "Le mouvement n'a pas été enregistré (stock insuffisant ?).",
+                )
+                return
             messagebox.showinfo("Succès", "Mouvement ajouté avec succès.")
-            self.charger_mouvements(obtenir_tous_mouvements())
+            self.table_virtuelle.rafraichir()
             dialogue.destroy()
         except Exception as e:
             messagebox.showerror("Erreur Base de Données", f"Erreur : {e}")
@@ -1,5 +1,6 @@
 import tkinter as tk
 from tkinter import messagebox, ttk
+from database.evenements import CATEGORIE, SuiviChangements
 from database.requetes import (
     creer_categorie,
     modifier_categorie,
@@ -24,9 +25,15 @@ class GestionCategoriesFrame(tk.Frame):
     def __init__(self, master=None):
         super().__init__(master, bg=COULEUR_FOND)
         self.pack(fill="both", expand=True)
+        self.suivi = SuiviChangements(CATEGORIE)
         self._creer_interface()
         self._charger_categories()
 
+    def sur_affichage(self):
+        """Recharge la liste seulement si une catégorie a changé."""
+        if self.suivi.recuperer() != []:
+            self._charger_categories()
+
     # ---------- Construction de l’interface ----------
     def _creer_interface(self):
         """Crée tous les éléments graphiques de la fenêtre."""
@@ -1,9 +1,11 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
+from database.evenements import CATEGORIE, MOUVEMENT, PRODUIT, SuiviChangements
 from database.requetes import (
     obtenir_statistiques_inventaire,
     obtenir_mouvements_recents,
 )
+from ui.executeur import ExecuteurRequetes
 
 # ---------- Thème ----------
 COULEUR_FOND = "#f7ffee"
@@ -32,9 +34,18 @@ class DashboardFrame(tk.Frame):
     def __init__(self, master=None):
         super().__init__(master, bg=COULEUR_FOND)
         self.pack(fill="both", expand=True)
+        self.executeur = ExecuteurRequetes(
+            self, sur_chargement=self._afficher_chargement
+        )
+        self.suivi = SuiviChangements(PRODUIT, MOUVEMENT, CATEGORIE)
         self.creer_interface()
         self.charger_donnees()
 
+    def sur_affichage(self):
+        """Relit les données seulement si quelque chose a changé."""
+        if self.suivi.recuperer() != []:
+            self.charger_donnees()
+
     # ---------- Interface ----------
     def creer_interface(self):
         self.creer_titre()
@@ -48,7 +59,13 @@ class DashboardFrame(tk.Frame):
             text="Tableau de Bord - Inventaire",
             font=POLICE_TITRE,
             bg=COULEUR_FOND,
-        ).pack(pady=20)
+        ).pack(pady=(20, 0))
+        self.label_chargement = tk.Label(self, text="", bg=COULEUR_FOND)
+        self.label_chargement.pack(pady=(0, 10))
+
+    def _afficher_chargement(self, actif):
+        self.label_chargement.config(text="Chargement…" if actif else "")
+        self.config(cursor="watch" if actif else "")
 
     # ---------- Cartes statistiques ----------
     def creer_cartes_stats(self):
@@ -150,8 +167,24 @@ class DashboardFrame(tk.Frame):
 
     # ---------- Données ----------
     def charger_donnees(self):
+        """Lance la lecture des données hors du thread Tk."""
+        self.executeur.soumettre(
+            "donnees",
+            self._lire_donnees,
+            sur_resultat=self._afficher_donnees,
+            sur_erreur=self._afficher_erreur,
+        )
+
+    @staticmethod
+    def _lire_donnees():
+        return obtenir_statistiques_inventaire(), obtenir_mouvements_recents(10)
+
+    def _afficher_erreur(self, e):
+        messagebox.showerror("Erreur", f"Impossible de charger le dashboard :\n{e}")
+
+    def _afficher_donnees(self, donnees):
+        stats, mouvements = donnees
         try:
-            stats = obtenir_statistiques_inventaire()
             if not stats:
                 raise Exception("Aucune donnée reçue depuis la base.")
 
@@ -165,13 +198,12 @@ class DashboardFrame(tk.Frame):
                 text=str(stats["produits_alerte"])
             )
 
-            self.charger_mouvements_recents()
+            self.charger_mouvements_recents(mouvements)
         except Exception as e:
-            messagebox.showerror("Erreur", f"Impossible de charger le dashboard :\n{e}")
+            self._afficher_erreur(e)
 
-    def charger_mouvements_recents(self):
+    def charger_mouvements_recents(self, mouvements):
         self.tree.delete(*self.tree.get_children())
-        mouvements = obtenir_mouvements_recents(10)
 
         for i, mvt in enumerate(mouvements):
             tag = "pair" if i % 2 == 0 else "impair"
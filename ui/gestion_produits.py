@@ -1,14 +1,17 @@
 import tkinter as tk
+from functools import partial
 from tkinter import messagebox, ttk
+from database.evenements import MODIFICATION, PRODUIT, SuiviChangements
 from database.requetes import (
     creer_produit,
     modifier_produit,
+    obtenir_page_produits,
     obtenir_produit,
-    obtenir_tous_produits,
     obtenir_toutes_categories,
-    rechercher_produits,
     supprimer_produit,
 )
+from ui.executeur import ExecuteurRequetes
+from ui.table_virtuelle import TableVirtuelle
 
 # -------------------- Thème Global --------------------
 COULEUR_FOND = "#f8ffe8"
@@ -29,6 +32,10 @@ class GestionProduitsFrame(tk.Frame):
     def __init__(self, parent=None):
         super().__init__(parent, bg=COULEUR_FOND)
         self.pack(fill="both", expand=True)
+        self.executeur = ExecuteurRequetes(
+            self, sur_chargement=self._afficher_chargement
+        )
+        self.suivi = SuiviChangements(PRODUIT)
         self._creer_interface()
         self._charger_produits()
 
@@ -43,7 +50,13 @@ class GestionProduitsFrame(tk.Frame):
     def _creer_titre(self, texte):
         tk.Label(
             self, text=texte, font=("Bahnschrift", 16, "bold"), bg=COULEUR_FOND
-        ).pack(pady=15)
+        ).pack(pady=(15, 0))
+        self.label_chargement = tk.Label(self, text="", bg=COULEUR_FOND)
+        self.label_chargement.pack()
+
+    def _afficher_chargement(self, actif):
+        self.label_chargement.config(text="Chargement…" if actif else "")
+        self.config(cursor="watch" if actif else "")
 
     def _creer_cadre_superieur(self):
         cadre = tk.Frame(self, bg=COULEUR_FOND)
@@ -77,8 +90,8 @@ class GestionProduitsFrame(tk.Frame):
 
     def _creer_liste_produits(self):
         colonnes = ("ID", "Nom", "Catégorie", "Code", "Prix", "Stock", "Stock Min")
-        self.table = self._configurer_table(colonnes)
-        self.table.pack(fill="both", expand=True, padx=20, pady=10)
+        self.table_virtuelle = self._configurer_table(colonnes)
+        self.table_virtuelle.pack(fill="both", expand=True, padx=20, pady=10)
 
     # -------------------- Composants réutilisables --------------------
     def _creer_bouton(self, parent, texte, commande, bg=None):
@@ -101,7 +114,15 @@ class GestionProduitsFrame(tk.Frame):
         cadre_table = tk.Frame(self, bg=COULEUR_FOND)
         cadre_table.pack(fill="both", expand=True)
 
-        table = ttk.Treeview(cadre_table, columns=colonnes, show="headings")
+        table_virtuelle = TableVirtuelle(
+            cadre_table,
+            colonnes,
+            convertir_ligne=self._convertir_produit,
+            cle_lignes="produits",
+            executeur=self.executeur,
+            bg=COULEUR_FOND,
+        )
+        table = table_virtuelle.tree
         for col in colonnes:
             table.heading(col, text=col)
             align = "center" if col in ("ID", "Stock", "Stock Min") else "w"
@@ -110,37 +131,55 @@ class GestionProduitsFrame(tk.Frame):
 
         table.tag_configure("pair", background=LIGNE_PAIRE)
         table.tag_configure("impair", background=LIGNE_IMPAIRE)
-        return table
+        return table_virtuelle
 
     # -------------------- Chargement des données --------------------
     def _charger_produits(self, recherche=None):
-        self.table.delete(*self.table.get_children())
         try:
-            produits = (
-                rechercher_produits(recherche) if recherche else obtenir_tous_produits()
+            self.table_virtuelle.definir_source(
+                partial(obtenir_page_produits, recherche or None)
             )
-            produits = [dict(p) for p in (produits or [])]
-
-            for i, prod in enumerate(produits):
-                etiquette = "pair" if i % 2 == 0 else "impair"
-                prix = self._formatter_prix(prod.get("prix_unitaire"))
-                self.table.insert(
-                    "",
-                    tk.END,
-                    values=(
-                        prod.get("produit_id"),
-                        prod.get("nom"),
-                        prod.get("nom_categorie", "N/A"),
-                        prod.get("code_barre", ""),
-                        prix,
-                        prod.get("stock_actuel", 0),
-                        prod.get("stock_minimum", 0),
-                    ),
-                    tags=(etiquette,),
-                )
         except Exception as e:
             messagebox.showerror("Erreur", f"Impossible de charger les produits : {e}")
 
+    def sur_affichage(self):
+        """Recharge uniquement les produits modifiés depuis le dernier affichage."""
+        changements = self.suivi.recuperer()
+        # Journal dépassé, création ou suppression : la liste elle-même change
+        if changements is None or any(
+            c.operation != MODIFICATION for c in changements
+        ):
+            self.table_virtuelle.rafraichir()
+            return
+        # Une catégorie renommée arrive comme modification de ses produits
+        ids = self.table_virtuelle.ids_en_memoire(
+            "produit_id", {c.id for c in changements}
+        )
+        if not ids:
+            return
+        self.executeur.soumettre(
+            "changements",
+            lambda: {produit_id: obtenir_produit(produit_id) for produit_id in ids},
+            sur_resultat=self._appliquer_changements,
+        )
+
+    def _appliquer_changements(self, produits):
+        if None in produits.values():  # produit supprimé entre-temps
+            self.table_virtuelle.rafraichir()
+        else:
+            self.table_virtuelle.remplacer_lignes("produit_id", produits)
+
+    def _convertir_produit(self, prod):
+        return (
+            prod.get("produit_id"),
+            prod.get("nom"),
+            prod.get("nom_categorie", "N/A"),
+            prod.get("code_barre", ""),
+            self._formatter_prix(prod.get("prix_unitaire")),
+            prod.get("stock_actuel", 0),
+            prod.get("stock_minimum", 0),
+        )
+
     def _formatter_prix(self, valeur):
         try:
             return f"{float(valeur or 0):.2f}"
@@ -149,12 +188,12 @@ class GestionProduitsFrame(tk.Frame):
 
     # -------------------- Gestion des produits --------------------
     def _get_id_selectionne(self):
-        element = self.table.focus()
-        if not element:
+        produit = self.table_virtuelle.ligne_selectionnee()
+        if not produit:
             messagebox.showwarning("Attention", "Veuillez sélectionner un produit.")
             return None
         try:
-            return int(self.table.item(element, "values")[0])
+            return int(produit["produit_id"])
         except Exception:
             messagebox.showwarning("Erreur", "ID produit invalide.")
             return None
@@ -163,14 +202,14 @@ class GestionProduitsFrame(tk.Frame):
         produit_id = self._get_id_selectionne()
         if produit_id is None:
             return
-        nom = self.table.item(self.table.focus(), "values")[1]
+        nom = self.table_virtuelle.ligne_selectionnee()["nom"]
         if messagebox.askyesno(
             "Confirmation", f"Supprimer '{nom}' (ID: {produit_id}) ?"
         ):
             try:
                 if supprimer_produit(produit_id):
                     messagebox.showinfo("Succès", "Produit supprimé avec succès.")
-                    self._charger_produits()
+                    self.table_virtuelle.rafraichir()
                 else:
                     messagebox.showerror("Erreur", "Suppression impossible.")
             except Exception as e:
@@ -225,6 +264,7 @@ class GestionProduitsFrame(tk.Frame):
             "description": tk.StringVar(),
             "categorie_nom": tk.StringVar(),
             "categorie_id": None,
+            "version": None,
         }
 
         if produit_id:
@@ -235,6 +275,8 @@ class GestionProduitsFrame(tk.Frame):
                     if cle in vars_prod and isinstance(vars_prod[cle], tk.StringVar):
                         vars_prod[cle].set(val if val is not None else "")
                 vars_prod["categorie_id"] = data.get("categorie_id")
+                # Version lue à l'ouverture : refus si le produit change entre-temps
+                vars_prod["version"] = data.get("version")
         return vars_prod
 
     def _creer_champs_formulaire(self, parent, vars_prod):
@@ -286,12 +328,21 @@ class GestionProduitsFrame(tk.Frame):
             donnees = self._extraire_donnees(vars_prod)
             try:
                 if produit_id:
-                    modifier_produit(produit_id, **donnees)
+                    if not modifier_produit(
+                        produit_id, vars_prod["version"], **donnees
+                    ):
+                        messagebox.showwarning(
+                            "Modification refusée",
+                            "Le produit a été modifié entre-temps (mouvement de "
+                            "stock ou autre poste). Rouvrez-le pour repartir des "
+                            "valeurs actuelles.",
+                        )
+                        return
                     messagebox.showinfo("Succès", "Produit mis à jour.")
                 else:
                     creer_produit(**donnees)
                     messagebox.showinfo("Succès", "Produit ajouté.")
-                self._charger_produits()
+                self.table_virtuelle.rafraichir()
                 fenetre.destroy()
             except Exception as e:
                 messagebox.showerror("Erreur", f"Erreur : {e}")
@@ -0,0 +1,272 @@
+import tkinter as tk
+from collections import OrderedDict
+from functools import partial
+from tkinter import ttk
+
+from config.parametres import TAILLE_PAGE
+
+# ---------- Paramètres ----------
+HAUTEUR_LIGNE = 20  # hauteur approximative d'une ligne du Treeview (pixels)
+HAUTEUR_ENTETE = 25
+PAGES_EN_MEMOIRE = 5  # tampon de pages gardées en mémoire (LRU)
+TEXTE_ATTENTE = "…"  # affiché dans les lignes dont la page est en chargement
+
+# Marqueur d'une ligne dont la page n'est pas encore arrivée
+EN_ATTENTE = object()
+
+
+class TableVirtuelle(tk.Frame):
+    """
+    Treeview virtualisé : seules les lignes visibles sont insérées dans le widget.
+
+    Les données sont demandées page par page à une source paginée
+    source(limite=..., curseur=...) -> {cle_lignes: [...], "curseur_suivant": ...}
+    (voir obtenir_page_produits / obtenir_page_mouvements). Seules quelques pages
+    sont gardées en mémoire, la mémoire et le temps d'affichage restent donc
+    constants quelle que soit la taille du résultat.
+
+    Avec un ExecuteurRequetes, les pages sont chargées hors du thread Tk et les
+    lignes concernées s'affichent en attente jusqu'à l'arrivée des données.
+    """
+
+    def __init__(
+        self,
+        parent,
+        colonnes,
+        convertir_ligne,
+        cle_lignes,
+        taille_page=TAILLE_PAGE,
+        pages_en_memoire=PAGES_EN_MEMOIRE,
+        executeur=None,
+        **options,
+    ):
+        super().__init__(parent, **options)
+        self.executeur = executeur
+        self.convertir_ligne = convertir_ligne
+        self.cle_lignes = cle_lignes
+        self.taille_page = taille_page
+        self.pages_en_memoire = max(2, pages_en_memoire)
+
+        self.tree = ttk.Treeview(self, columns=colonnes, show="headings")
+        self.barre = ttk.Scrollbar(self, orient="vertical", command=self._sur_barre)
+        self.barre.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+
+        self._source = None
+        self._en_attente = set()  # numéros des pages demandées à l'exécuteur
+        self._reinitialiser_etat()
+        self._lier_evenements()
+
+    # ---------- Source de données ----------
+    def definir_source(self, source):
+        """Remplace la source paginée et revient en haut de la table."""
+        self._source = source
+        self._reinitialiser_etat()
+        self._afficher()
+
+    def rafraichir(self):
+        """Recharge les données en conservant la position de défilement."""
+        debut, selection = self._debut, self._selection
+        self._reinitialiser_etat()
+        self._debut, self._selection = debut, selection
+        self._afficher()
+
+    def ligne_selectionnee(self):
+        """Retourne le dict de la ligne sélectionnée ou None."""
+        if self._selection is None:
+            return None
+        ligne = self._ligne(self._selection)
+        return None if ligne is EN_ATTENTE else ligne
+
+    def ids_en_memoire(self, cle_id, ids):
+        """Retourne les ids (valeurs de la colonne cle_id) des pages en mémoire."""
+        ids = set(ids)
+        return {
+            ligne[cle_id]
+            for lignes in self._pages.values()
+            for ligne in lignes
+            if ligne[cle_id] in ids
+        }
+
+    def remplacer_lignes(self, cle_id, lignes_par_id):
+        """
+        Remplace sur place les lignes en mémoire dont cle_id est dans
+        lignes_par_id ({id: nouvelle ligne}), sans recharger de page.
+        """
+        for lignes in self._pages.values():
+            for position, ligne in enumerate(lignes):
+                if ligne[cle_id] in lignes_par_id:
+                    lignes[position] = lignes_par_id[ligne[cle_id]]
+        self._afficher()
+
+    def _reinitialiser_etat(self):
+        # Curseur de départ de chaque page connue (la page 0 part de None)
+        self._curseurs = [None]
+        self._pages = OrderedDict()
+        self._total = None  # connu une fois la dernière page atteinte
+        self._debut = 0
+        self._selection = None
+        if self.executeur:
+            for numero in self._en_attente:
+                self.executeur.annuler(("page", numero))
+        self._en_attente = set()
+
+    def _memoriser(self, numero, page):
+        """Enregistre une page reçue de la source et retourne ses lignes."""
+        lignes = page[self.cle_lignes]
+        if page["curseur_suivant"] is None:
+            self._total = numero * self.taille_page + len(lignes)
+        elif numero + 1 == len(self._curseurs):
+            self._curseurs.append(page["curseur_suivant"])
+
+        self._pages[numero] = lignes
+        self._pages.move_to_end(numero)
+        while len(self._pages) > self.pages_en_memoire:
+            self._pages.popitem(last=False)
+        return lignes
+
+    def _page(self, numero):
+        """
+        Retourne les lignes d'une page, en la chargeant si nécessaire.
+        Retourne None si la page est en cours de chargement en arrière-plan.
+        """
+        if numero in self._pages:
+            self._pages.move_to_end(numero)
+            return self._pages[numero]
+
+        # La pagination par clé impose de découvrir les curseurs dans l'ordre
+        while numero >= len(self._curseurs) and self._total is None:
+            connu = len(self._curseurs) - 1
+            if self._demander_page(connu) is None:
+                return None
+        if numero >= len(self._curseurs):
+            return []
+        return self._demander_page(numero)
+
+    def _demander_page(self, numero):
+        curseur = self._curseurs[numero]
+        if self.executeur is None:
+            page = self._source(limite=self.taille_page, curseur=curseur)
+            return self._memoriser(numero, page)
+
+        if numero not in self._en_attente:
+            self._en_attente.add(numero)
+            source = self._source
+            self.executeur.soumettre(
+                ("page", numero),
+                partial(source, limite=self.taille_page, curseur=curseur),
+                sur_resultat=lambda page: self._recevoir_page(source, numero, page),
+                sur_erreur=lambda erreur: self._echec_page(numero, erreur),
+            )
+        return None
+
+    def _echec_page(self, numero, erreur):
+        self._en_attente.discard(numero)
+        print(f"Erreur lors du chargement de la page {numero}: {erreur}")
+
+    def _recevoir_page(self, source, numero, page):
+        if source is not self._source:
+            return  # page d'une ancienne source
+        self._en_attente.discard(numero)
+        self._memoriser(numero, page)
+        self._afficher()
+
+    def _ligne(self, index):
+        lignes = self._page(index // self.taille_page)
+        if lignes is None:
+            return EN_ATTENTE
+        position = index % self.taille_page
+        return lignes[position] if position < len(lignes) else None
+
+    def _nombre_lignes(self):
+        """Nombre de lignes exact, ou estimé tant que la fin n'est pas atteinte."""
+        if self._total is not None:
+            return self._total
+        return len(self._curseurs) * self.taille_page
+
+    # ---------- Affichage ----------
+    def _hauteur_visible(self):
+        hauteur = self.tree.winfo_height() - HAUTEUR_ENTETE
+        return max(1, hauteur // HAUTEUR_LIGNE)
+
+    def _afficher(self):
+        self.tree.delete(*self.tree.get_children())
+        if self._source is None:
+            self.barre.set(0, 1)
+            return
+
+        hauteur = self._hauteur_visible()
+        # Charger d'abord la fenêtre visible pour connaître le total si besoin
+        self._ligne(self._debut + hauteur)
+        self._debut = max(0, min(self._debut, self._nombre_lignes() - hauteur))
+
+        for index in range(self._debut, self._debut + hauteur):
+            ligne = self._ligne(index)
+            if ligne is None:
+                break
+            if ligne is EN_ATTENTE:
+                valeurs = (TEXTE_ATTENTE,)
+            else:
+                valeurs = self.convertir_ligne(ligne)
+            etiquette = "pair" if index % 2 == 0 else "impair"
+            self.tree.insert(
+                "", tk.END, iid=str(index), values=valeurs, tags=(etiquette,)
+            )
+
+        if self._selection is not None and self.tree.exists(str(self._selection)):
+            self.tree.selection_set(str(self._selection))
+            self.tree.focus(str(self._selection))
+
+        total = max(1, self._nombre_lignes())
+        self.barre.set(self._debut / total, min(1, (self._debut + hauteur) / total))
+
+    def _defiler(self, decalage):
+        nouveau_debut = max(0, self._debut + decalage)
+        if nouveau_debut != self._debut:
+            self._debut = nouveau_debut
+            self._afficher()
+
+    # ---------- Événements ----------
+    def _lier_evenements(self):
+        self.tree.bind("<Configure>", lambda e: self._afficher())
+        self.tree.bind("<MouseWheel>", self._sur_molette)
+        self.tree.bind("<Button-4>", lambda e: self._defiler(-3))
+        self.tree.bind("<Button-5>", lambda e: self._defiler(3))
+        self.tree.bind("<<TreeviewSelect>>", self._sur_selection)
+        self.tree.bind("<Up>", lambda e: self._deplacer_selection(-1))
+        self.tree.bind("<Down>", lambda e: self._deplacer_selection(1))
+        self.tree.bind("<Prior>", lambda e: self._deplacer_selection(-10))
+        self.tree.bind("<Next>", lambda e: self._deplacer_selection(10))
+
+    def _sur_molette(self, evenement):
+        self._defiler(-3 if evenement.delta > 0 else 3)
+
+    def _sur_barre(self, action, valeur, unite=None):
+        hauteur = self._hauteur_visible()
+        if action == "moveto":
+            self._debut = int(float(valeur) * self._nombre_lignes())
+            self._afficher()
+        elif action == "scroll":
+            pas = hauteur if unite == "pages" else 1
+            self._defiler(int(valeur) * pas)
+
+    def _sur_selection(self, _evenement=None):
+        selection = self.tree.selection()
+        if selection:
+            self._selection = int(selection[0])
+
+    def _deplacer_selection(self, decalage):
+        if self._selection is None:
+            self._selection = self._debut
+        cible = max(0, self._selection + decalage)
+        if self._ligne(cible) in (None, EN_ATTENTE):
+            return "break"
+        self._selection = cible
+
+        hauteur = self._hauteur_visible()
+        if cible < self._debut:
+            self._debut = cible
+        elif cible >= self._debut + hauteur:
+            self._debut = cible - hauteur + 1
+        self._afficher()
+        return "break"